@@ -0,0 +1,401 @@
+"""
+Offline bulk conversion CLI.
+
+Converts every PDF under a directory tree with a pool of worker processes.
+Each worker loads the reference data (mapping, toolchest, renderer, layer
+template) once and reuses it for every file it converts.
+
+Usage:
+    bluebeam-convert maps/ converted/ --workers 8
+    python -m app.cli maps/ converted/ --no-resume --summary report.csv
+
+Progress is appended to a state file in the output directory, so an
+interrupted run picks up where it stopped. Entries are invalidated when
+the source file, the reference data (mapping, toolchest, icon overrides,
+gear icons) or the output options (compact, linearize, suffix) change.
+An output directory inside the input directory is not searched for
+sources. Exit code is 1 if any file failed.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = ".bulk_convert_state.jsonl"
+SUMMARY_FIELDS = [
+    "source",
+    "output",
+    "status",
+    "annotations_converted",
+    "annotations_skipped",
+    "processing_time_ms",
+    "linearized",
+    "error",
+]
+
+# Per-process conversion context and output options, set by _init_worker
+_context = None
+_compact: bool | None = None
+_linearize: bool | None = None
+
+
+def _init_worker(compact: bool | None = None, linearize: bool | None = None) -> None:
+    """Process pool initializer: load reference data once per worker."""
+    global _context, _compact, _linearize
+    from app.services.conversion_context import ConversionContext
+
+    _context = ConversionContext.load()
+    _compact = compact
+    _linearize = linearize
+
+
+def _convert_file(source: str, output: str) -> dict:
+    """
+    Worker: convert one PDF, writing the output atomically.
+
+    Args:
+        source: Input PDF path
+        output: Final output PDF path
+
+    Returns:
+        Summary row for the file
+    """
+    start_time = time.time()
+    output_path = Path(output)
+    partial_path = output_path.with_name(output_path.name + ".partial")
+    row = {"source": source, "output": output}
+
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        converted_count, skipped_count, _, linearized = _context.convert(
+            Path(source), partial_path, compact=_compact, linearize=_linearize
+        )
+        if not partial_path.exists():
+            raise RuntimeError("conversion produced no output")
+        partial_path.replace(output_path)
+        row.update(
+            status="converted",
+            annotations_converted=converted_count,
+            annotations_skipped=skipped_count,
+            linearized=linearized,
+            error="",
+        )
+    except Exception as e:
+        partial_path.unlink(missing_ok=True)
+        row.update(
+            status="failed",
+            annotations_converted=0,
+            annotations_skipped=0,
+            linearized=None,
+            error=str(e),
+        )
+
+    row["processing_time_ms"] = int((time.time() - start_time) * 1000)
+    return row
+
+
+def reference_fingerprint(
+    compact: bool | None = None,
+    linearize: bool | None = None,
+    suffix: str = "_deployment",
+) -> str:
+    """
+    Fingerprint the reference data and options a conversion depends on.
+
+    Combines sizes and modification times of the mapping file, toolchest
+    BTX files, icon overrides and gear icon PNGs with the effective output
+    options, so resume state is discarded when any of them changes.
+
+    Args:
+        compact: Compact output option (None = settings.compact_output)
+        linearize: Linearize option (None = settings.linearize_output)
+        suffix: Output file stem suffix
+    """
+    paths = [settings.mapping_file, settings.icon_overrides_file]
+    if settings.toolchest_dir.exists():
+        paths.extend(sorted(settings.toolchest_dir.rglob("*.btx")))
+    if settings.gear_icons_dir.exists():
+        paths.extend(sorted(settings.gear_icons_dir.rglob("*.png")))
+
+    digest = hashlib.sha256()
+    options = {
+        "compact": settings.compact_output if compact is None else compact,
+        "linearize": settings.linearize_output if linearize is None else linearize,
+        "suffix": suffix,
+    }
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    for path in paths:
+        try:
+            stat = path.stat()
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        except OSError:
+            digest.update(f"{path}:missing\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def _source_key(path: Path) -> str:
+    """Identity of a source file version (size + mtime)."""
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_state(state_path: Path, fingerprint: str) -> dict[str, dict]:
+    """
+    Load completed entries from a previous run.
+
+    Args:
+        state_path: Path to the JSONL state file
+        fingerprint: Current reference data fingerprint
+
+    Returns:
+        Dict mapping source path -> last successful state record
+    """
+    completed: dict[str, dict] = {}
+    if not state_path.exists():
+        return completed
+
+    with open(state_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Truncated line from an interrupted run
+            if record.get("fingerprint") == fingerprint and record.get("status") == "converted":
+                completed[record["source"]] = record
+    return completed
+
+
+def discover_pdfs(input_dir: Path, exclude: Path | None = None) -> list[Path]:
+    """
+    Find all PDFs under a directory tree, sorted for stable ordering.
+
+    Args:
+        input_dir: Directory searched recursively
+        exclude: Directory whose contents are skipped (e.g. an output
+            directory inside input_dir)
+    """
+    excluded = exclude.resolve() if exclude is not None else None
+    return sorted(
+        p for p in input_dir.rglob("*")
+        if p.is_file() and p.suffix.lower() == ".pdf"
+        and not (excluded and p.resolve().is_relative_to(excluded))
+    )
+
+
+def output_path_for(source: Path, input_dir: Path, output_dir: Path, suffix: str) -> Path:
+    """Mirror a source file's relative location into the output directory."""
+    relative = source.relative_to(input_dir)
+    return output_dir / relative.parent / f"{relative.stem}{suffix}.pdf"
+
+
+def write_summary(rows: list[dict], totals: dict, summary_path: Path) -> None:
+    """Write the run summary as JSON or CSV depending on the file extension."""
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    if summary_path.suffix.lower() == ".csv":
+        with open(summary_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(summary_path, "w") as f:
+            json.dump({"totals": totals, "files": rows}, f, indent=2)
+
+
+def run(
+    input_dir: Path,
+    output_dir: Path,
+    workers: int,
+    resume: bool = True,
+    suffix: str = "_deployment",
+    summary_path: Path | None = None,
+    compact: bool | None = None,
+    linearize: bool | None = None,
+) -> int:
+    """
+    Convert a directory tree of PDFs.
+
+    Args:
+        input_dir: Directory searched recursively for PDFs
+        output_dir: Directory receiving converted PDFs (mirrors input layout)
+        workers: Number of worker processes
+        resume: Skip files already converted by a previous run
+        suffix: Suffix appended to output file stems
+        summary_path: Summary file (.json or .csv). Defaults to output_dir/summary.json
+        compact: Write compact output. Defaults to settings.compact_output
+        linearize: Write linearized output. Defaults to settings.linearize_output
+
+    Returns:
+        Process exit code (0 on success, 1 if any file failed)
+    """
+    start_time = time.time()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    state_path = output_dir / STATE_FILENAME
+    summary_path = summary_path or output_dir / "summary.json"
+
+    fingerprint = reference_fingerprint(compact, linearize, suffix)
+    completed = load_state(state_path, fingerprint) if resume else {}
+    if not resume:
+        state_path.unlink(missing_ok=True)
+
+    sources = discover_pdfs(input_dir, exclude=output_dir)
+    rows: list[dict] = []
+    jobs: list[tuple[Path, Path]] = []
+    # Taken before converting: a source moved away mid-run must not abort the run
+    source_keys = {source: _source_key(source) for source in sources}
+
+    for source in sources:
+        output = output_path_for(source, input_dir, output_dir, suffix)
+        record = completed.get(str(source))
+        if record and record.get("source_key") == source_keys[source] and output.exists():
+            rows.append({
+                "source": str(source),
+                "output": str(output),
+                "status": "resumed",
+                "annotations_converted": record.get("annotations_converted", 0),
+                "annotations_skipped": record.get("annotations_skipped", 0),
+                "processing_time_ms": 0,
+                "linearized": record.get("linearized"),
+                "error": "",
+            })
+            continue
+        jobs.append((source, output))
+
+    logger.info(
+        f"Found {len(sources)} PDF(s): {len(jobs)} to convert, "
+        f"{len(sources) - len(jobs)} already done (workers={workers})"
+    )
+
+    if jobs:
+        with open(state_path, "a") as state_file, ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(compact, linearize),
+        ) as executor:
+            futures = {
+                executor.submit(_convert_file, str(source), str(output)): source
+                for source, output in jobs
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                source = futures[future]
+                try:
+                    row = future.result()
+                except Exception as e:  # Worker crashed (e.g. killed process)
+                    row = {
+                        "source": str(source),
+                        "output": "",
+                        "status": "failed",
+                        "annotations_converted": 0,
+                        "annotations_skipped": 0,
+                        "processing_time_ms": 0,
+                        "linearized": None,
+                        "error": f"worker error: {e}",
+                    }
+                rows.append(row)
+
+                record = {**row, "fingerprint": fingerprint, "source_key": source_keys[source]}
+                state_file.write(json.dumps(record) + "\n")
+                state_file.flush()
+
+                logger.info(
+                    f"[{done}/{len(jobs)}] {row['status']}: {source.name} "
+                    f"({row['processing_time_ms']}ms){' - ' + row['error'] if row['error'] else ''}"
+                )
+
+    rows.sort(key=lambda r: r["source"])
+    totals = {
+        "files": len(rows),
+        "converted": sum(1 for r in rows if r["status"] == "converted"),
+        "resumed": sum(1 for r in rows if r["status"] == "resumed"),
+        "failed": sum(1 for r in rows if r["status"] == "failed"),
+        "annotations_converted": sum(r["annotations_converted"] for r in rows),
+        "annotations_skipped": sum(r["annotations_skipped"] for r in rows),
+        "not_linearized": sum(1 for r in rows if r["linearized"] is False),
+        "elapsed_ms": int((time.time() - start_time) * 1000),
+    }
+    write_summary(rows, totals, summary_path)
+
+    if totals["not_linearized"]:
+        logger.warning(
+            f"{totals['not_linearized']} file(s) were not linearized: "
+            f"install pikepdf to enable fast web view"
+        )
+
+    logger.info(
+        f"Done: {totals['converted']} converted, {totals['resumed']} resumed, "
+        f"{totals['failed']} failed in {totals['elapsed_ms']}ms. Summary: {summary_path}"
+    )
+    return 1 if totals["failed"] else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="bluebeam-convert",
+        description="Convert a directory tree of bid maps to deployment maps",
+    )
+    parser.add_argument("input_dir", type=Path, help="Directory searched recursively for PDFs")
+    parser.add_argument("output_dir", type=Path, help="Directory for converted PDFs")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count() or 1,
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--no-resume", dest="resume", action="store_false",
+        help="Reconvert everything, ignoring state from previous runs",
+    )
+    parser.add_argument(
+        "--suffix", default="_deployment",
+        help="Suffix appended to output filenames (default: _deployment)",
+    )
+    parser.add_argument(
+        "--summary", type=Path,
+        help="Summary file path, .json or .csv (default: OUTPUT_DIR/summary.json)",
+    )
+    parser.add_argument(
+        "--compact", action=argparse.BooleanOptionalAction, default=None,
+        help="Write compact output with object streams (default: server setting)",
+    )
+    parser.add_argument(
+        "--linearize", action=argparse.BooleanOptionalAction, default=None,
+        help="Write linearized (fast web view) output (default: server setting)",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Verbose logging")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    if not args.verbose:
+        # Per-annotation conversion logs are too noisy for bulk runs
+        logging.getLogger("app.services").setLevel(logging.WARNING)
+
+    if not args.input_dir.is_dir():
+        parser.error(f"input directory not found: {args.input_dir}")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    return run(
+        input_dir=args.input_dir,
+        output_dir=args.output_dir,
+        workers=args.workers,
+        resume=args.resume,
+        suffix=args.suffix,
+        summary_path=args.summary,
+        compact=args.compact,
+        linearize=args.linearize,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
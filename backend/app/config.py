@@ -33,6 +33,35 @@ class Settings(BaseSettings):
     max_file_size_mb: int = 50
     file_retention_hours: int = 1
     temp_dir: Path = _BACKEND_ROOT / "data" / "temp"
+    max_temp_disk_mb: int = 2048  # Oldest files are evicted beyond this (0 = no cap)
+
+    # Batch conversion settings
+    batch_max_files: int = 100
+    batch_max_workers: int = 4  # A batch's conversions queued on the CPU pool at once
+
+    # Executors for blocking work in request handlers
+    io_workers: int = 8  # Threads for file I/O, PDF inspection and image work
+    cpu_workers: int = 2  # Processes for conversions (0 = run them on the I/O threads)
+
+    # Admission control for uploads and conversions
+    admission_max_concurrent: int = 4  # Jobs processed at once
+    admission_memory_budget_mb: int = 1024  # Combined estimated memory of active jobs (0 = no limit)
+    admission_memory_factor: float = 8.0  # Estimated peak memory per byte of input PDF
+    admission_max_queue: int = 16  # Jobs waiting for capacity before requests get 429
+    admission_queue_timeout_seconds: float = 30.0  # Longest wait before a request gets 503
+
+    # Output settings
+    compact_output: bool = False  # Object streams + xref stream + deflated appearances
+    linearize_output: bool = False  # Fast web view (needs pikepdf)
+    gear_image_max_dpi: int = 600  # Effective DPI of embedded gear images (0 = native)
+    gear_image_alpha_mode: str = "smask"  # "smask" (shared across colors) or "flatten"
+    icon_image_cache_mb: int = 64  # In-memory gear image cache budget per process
+    image_cache_dir: Path | None = _BACKEND_ROOT / "data" / "cache" / "images"  # None = off
+
+    # Map preview settings
+    preview_tile_size: int = 256
+    preview_max_zoom: float = 4.0  # Pixels per PDF point at the deepest tile level
+    preview_overview_size: int = 1024  # Longest side of the per-page overview image
 
     # Mapping configuration
     mapping_file: Path = _BACKEND_ROOT / "data" / "mapping.md"
@@ -48,6 +77,10 @@ class Settings(BaseSettings):
     # Tuner settings
     icon_overrides_file: Path = _BACKEND_ROOT / "data" / "icon_overrides.json"
     gear_icons_dir: Path = _PROJECT_ROOT / "samples" / "icons" / "gearIcons"
+    gear_thumbnail_dir: Path = _BACKEND_ROOT / "data" / "cache" / "thumbnails"
+    gear_thumbnail_size: int = 64  # Longest side of image picker thumbnails in pixels
+    preview_cache_mb: int = 32  # In-memory cache of rendered tuner previews
+    icon_override_flush_seconds: float = 0.5  # Coalesce bursts of tuner saves (0 = write immediately)
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -2,7 +2,7 @@
 FastAPI application entry point for Bluebeam PDF Map Converter.
 
 This module initializes the FastAPI application, configures CORS,
-registers API routers, and sets up the health check endpoint.
+registers API routers, and sets up the health check and metrics endpoints.
 """
 
 import asyncio
@@ -10,14 +10,18 @@ import logging
 from contextlib import asynccontextmanager
 from datetime import datetime
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import upload, convert, download, tuner
+from app.routers import upload, convert, download, tuner, batch, preview
 from app.config import settings
+from app.services.admission import conversion_admission
 from app.services.file_manager import file_manager
 from app.services.mapping_parser import MappingParser
 from app.services.btx_loader import BTXReferenceLoader
+from app.utils.cache import cache_stats
+from app.utils.executors import executor_stats, run_io, shutdown_executors
+from app.utils.metrics import CONTENT_TYPE, render_metrics
 
 # Configure logging
 logging.basicConfig(
@@ -26,18 +30,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-CLEANUP_INTERVAL_SECONDS = 15 * 60
+# Upper bound on a single scheduler sleep (safety net against clock changes)
+MAX_CLEANUP_SLEEP_SECONDS = 15 * 60
 
 
-async def _periodic_cleanup() -> None:
+async def _expiry_scheduler() -> None:
+    """Sleep until the next tracked file expires, then remove everything due."""
     while True:
         try:
             count = file_manager.cleanup_expired()
             if count > 0:
                 logger.info(f"Background cleanup removed {count} expired file(s)")
+            delay = file_manager.seconds_until_next_expiry()
         except Exception as e:
             logger.error(f"Error during background cleanup: {e}")
-        await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+            delay = MAX_CLEANUP_SLEEP_SECONDS
+        await asyncio.sleep(min(delay, MAX_CLEANUP_SLEEP_SECONDS))
+
+
+async def _warm_gear_thumbnails() -> None:
+    """Render missing tuner thumbnails off the event loop."""
+    try:
+        await run_io(tuner.warm_gear_thumbnails)
+    except Exception as e:
+        logger.error(f"Error warming gear thumbnails: {e}")
 
 
 @asynccontextmanager
@@ -49,16 +65,19 @@ async def lifespan(app: FastAPI):
             logger.info(f"Startup cleanup removed {count} expired file(s)")
     except Exception as e:
         logger.error(f"Error during startup cleanup: {e}")
-    # Start periodic task
-    cleanup_task = asyncio.create_task(_periodic_cleanup())
-    logger.info("Background file cleanup task started (interval: 15 minutes)")
+    # Start expiry scheduler
+    cleanup_task = asyncio.create_task(_expiry_scheduler())
+    logger.info("Background file expiry scheduler started")
+    thumbnail_task = asyncio.create_task(_warm_gear_thumbnails())
     yield
     # Shutdown
+    thumbnail_task.cancel()
     cleanup_task.cancel()
     try:
         await cleanup_task
     except asyncio.CancelledError:
         pass
+    shutdown_executors(wait=False)
 
 
 app = FastAPI(
@@ -81,16 +100,13 @@ app.add_middleware(
 app.include_router(upload.router, prefix="/api", tags=["upload"])
 app.include_router(convert.router, prefix="/api", tags=["convert"])
 app.include_router(download.router, prefix="/api", tags=["download"])
+app.include_router(batch.router, prefix="/api", tags=["batch"])
+app.include_router(preview.router, prefix="/api", tags=["preview"])
 app.include_router(tuner.router, prefix="/api/tuner", tags=["tuner"])
 
 
-@app.get("/health")
-async def health_check():
-    """
-    Health check endpoint.
-
-    Returns service status and mapping configuration status.
-    """
+def _check_reference_data() -> dict:
+    """Load mapping and toolchest to report their status (blocking)."""
     mapping_loaded = False
     mapping_count = 0
     bid_icon_count = 0
@@ -128,6 +144,7 @@ async def health_check():
         "mapping_count": mapping_count,
         "toolchest_bid_icons": bid_icon_count,
         "toolchest_deployment_icons": deployment_icon_count,
+        "caches": cache_stats(),
     }
 
     if error_message:
@@ -136,6 +153,33 @@ async def health_check():
     return response
 
 
+@app.get("/health")
+async def health_check():
+    """
+    Health check endpoint.
+
+    Returns service status, mapping configuration status, cache
+    statistics, executor load and admission control state.
+    """
+    return {
+        **await run_io(_check_reference_data),
+        "executors": executor_stats(),
+        "admission": conversion_admission.stats(),
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics endpoint.
+
+    Exposes upload and output size, conversion latency by stage and
+    annotation histograms, conversion and annotation counters, and cache,
+    executor, admission and temp-disk gauges in the text exposition format.
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -144,6 +188,7 @@ async def root():
         "version": settings.version,
         "docs": "/docs",
         "health": "/health",
+        "metrics": "/metrics",
     }
 
 
@@ -33,6 +33,16 @@ class ConversionRequest(BaseModel):
 
     direction: str  # "bid_to_deployment" or "deployment_to_bid"
     output_filename: str | None = None  # Custom output filename (without .pdf extension)
+    compact: bool | None = None  # Object-stream compression (None = server default)
+    linearize: bool | None = None  # Fast web view output (None = server default)
+
+
+class ConversionTimings(BaseModel):
+    """Where a conversion's processing time went."""
+
+    stages_ms: dict[str, float]  # Stage name -> milliseconds, in the order stages ran
+    render_counts: dict[str, int]  # "<mode>:<subtype>" -> icons rendered (compound, rich, simple)
+    cache_counts: dict[str, dict[str, int]] = {}  # Cache name -> hits/misses/evictions added
 
 
 class ConversionResponse(BaseModel):
@@ -51,3 +61,35 @@ class ConversionResponse(BaseModel):
     processing_time_ms: int
     download_url: str
     message: str
+    timings: ConversionTimings | None = None
+    linearized: bool | None = None  # None = not requested, False = no linearizer available
+
+
+class BatchFileResult(BaseModel):
+    """Per-file entry in a batch conversion manifest."""
+
+    source_file: str
+    status: str  # "converted" or "failed"
+    archive_name: str | None = None  # Name of the converted PDF inside the ZIP
+    upload_id: str | None = None
+    file_id: str | None = None
+    annotations_converted: int = 0
+    annotations_skipped: int = 0
+    skipped_subjects: list[str] = []
+    processing_time_ms: int = 0
+    download_url: str | None = None
+    linearized: bool | None = None  # None = not requested, False = no linearizer available
+    warning: str | None = None
+    error: str | None = None
+
+
+class BatchManifest(BaseModel):
+    """Manifest written as manifest.json at the end of a batch ZIP."""
+
+    batch_id: str
+    direction: str
+    total_files: int
+    converted_files: int
+    failed_files: int
+    processing_time_ms: int
+    results: list[BatchFileResult]
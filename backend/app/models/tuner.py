@@ -39,6 +39,7 @@ class IconConfigResponse(BaseModel):
     layer_order: list[str] = ["gear_image", "brand_text", "model_text"]
     id_preview: str = "j100"
     source: str = "python"  # "python" | "json_override" | "custom"
+    revision: int = 0  # Stored revision; send as If-Match when saving
 
 
 class IconConfigUpdateRequest(BaseModel):
@@ -88,7 +89,7 @@ class GearImageInfo(BaseModel):
     filename: str
     category: str
     path: str
-    thumbnail: str  # base64 encoded 64x64 thumbnail
+    thumbnail_url: str  # Versioned URL of the 64x64 thumbnail PNG
 
 
 class ApplyToAllRequest(BaseModel):
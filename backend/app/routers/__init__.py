@@ -1,5 +1,5 @@
 """API routers for Bluebeam PDF Map Converter."""
 
-from . import upload, convert, download
+from . import upload, convert, download, batch, preview
 
-__all__ = ["upload", "convert", "download"]
+__all__ = ["upload", "convert", "download", "batch", "preview"]
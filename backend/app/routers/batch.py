@@ -0,0 +1,142 @@
+"""
+Batch conversion endpoint.
+
+Converts many bid maps in one request and streams back a ZIP of the
+converted PDFs plus a per-file manifest.
+"""
+
+import asyncio
+import logging
+import time
+import weakref
+from collections.abc import AsyncIterator, Iterator
+
+from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.services.admission import conversion_admission, job_cost
+from app.services.batch_converter import MANIFEST_NAME, BatchConverter
+from app.services.conversion_context import ConversionContext
+from app.utils.errors import BatchTooLargeError, ServerBusyError
+from app.utils.executors import run_io
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+class _AdmittedStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that holds a conversion admission until it is done.
+
+    The admission is released once the response has been sent or has
+    failed at any point, including before the body is read. A response
+    that is dropped without ever being sent releases it when collected.
+    """
+
+    def __init__(self, content, cost: int, **kwargs):
+        super().__init__(content, **kwargs)
+        self.cost = cost
+        self._admitted = time.monotonic()
+        loop = asyncio.get_running_loop()
+        self._release_on_drop = weakref.finalize(
+            self, loop.call_soon_threadsafe, conversion_admission.release, cost
+        )
+        self._release_on_drop.atexit = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if self._release_on_drop.detach() is not None:
+                conversion_admission.release(self.cost, time.monotonic() - self._admitted)
+
+
+async def _stream_chunks(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Advance a blocking chunk iterator on the "io" executor."""
+    try:
+        while (chunk := await run_io(next, chunks, None)) is not None:
+            yield chunk
+    finally:
+        await run_io(chunks.close)
+
+
+@router.post("/batch/convert")
+async def convert_batch(files: list[UploadFile] = File(...)):
+    """
+    Convert a set of PDF venue maps from bid to deployment icons.
+
+    Accepts any mix of PDF files and ZIP archives of PDFs. Files are
+    converted concurrently and the response is a streamed ZIP containing
+    each converted PDF followed by manifest.json with per-file results.
+    Converted files are also kept in temporary storage and listed with
+    their download URLs in the manifest. The whole batch is admitted as
+    one job costed by its combined size, and holds that admission until
+    the ZIP has been streamed; its conversions share the CPU pool with
+    single conversions.
+
+    Args:
+        files: PDF files and/or ZIP archives uploaded by the user
+
+    Returns:
+        StreamingResponse with the result ZIP
+
+    Raises:
+        HTTPException 400: No PDFs supplied or too many PDFs in the batch
+        HTTPException 429: Too many uploads and conversions waiting
+        HTTPException 500: Reference data could not be loaded
+        HTTPException 503: Timed out waiting for capacity
+    """
+    try:
+        context = await run_io(ConversionContext.load)
+    except Exception as e:
+        logger.error(f"Failed to load conversion reference data: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Conversion failed: {str(e)}",
+        )
+
+    batch = BatchConverter(context)
+
+    try:
+        for upload in files:
+            name = upload.filename or "unnamed.pdf"
+            if name.lower().endswith(".zip"):
+                await run_io(batch.add_zip, name, upload.file)
+            elif name.lower().endswith(".pdf"):
+                await run_io(batch.add_pdf, name, await upload.read())
+            else:
+                logger.info(f"Batch {batch.batch_id}: ignoring non-PDF upload {name}")
+    except BatchTooLargeError as e:
+        await run_io(batch.discard)
+        raise HTTPException(status_code=400, detail=e.message)
+
+    if batch.file_count == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="No PDF files found. Upload PDF venue maps or a ZIP of PDFs.",
+        )
+
+    cost = job_cost(batch.pending_bytes)
+    try:
+        await conversion_admission.acquire(cost)
+    except ServerBusyError as e:
+        await run_io(batch.discard)
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    logger.info(f"Batch {batch.batch_id}: converting {batch.file_count} file(s)")
+
+    return _AdmittedStreamingResponse(
+        _stream_chunks(batch.iter_zip()),
+        cost,
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="batch_{batch.batch_id}.zip"',
+            "X-Batch-Id": batch.batch_id,
+            "X-Batch-Manifest": MANIFEST_NAME,
+        },
+    )
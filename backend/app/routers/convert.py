@@ -4,21 +4,24 @@ PDF conversion endpoint.
 Handles PDF annotation conversion from bid to deployment icons.
 """
 
+import json
 import logging
 import time
+from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, Path as PathParam
 
 from app.config import settings
-from app.models.pdf_file import ConversionRequest, ConversionResponse
+from app.models.pdf_file import ConversionRequest, ConversionResponse, ConversionTimings
+from app.services import converter_metrics
+from app.services.admission import conversion_admission, job_cost
+from app.services.conversion_context import ConversionContext
 from app.services.file_manager import file_manager
-from app.services.mapping_parser import MappingParser
-from app.services.btx_loader import BTXReferenceLoader
-from app.services.annotation_replacer import AnnotationReplacer
-from app.services.appearance_extractor import AppearanceExtractor
-from app.services.icon_renderer import IconRenderer
-from app.services.icon_config import GEAR_ICONS_DIR
-from app.services.layer_manager import LayerManager
+from app.services.output_optimizer import LINEARIZE_UNAVAILABLE
+from app.utils.cache import counting_lookups, merge_cache_counts
+from app.utils.errors import ServerBusyError
+from app.utils.executors import get_executor, run_cpu, run_io
+from app.utils.timing import StageTimer
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -27,6 +30,29 @@ router = APIRouter()
 SUPPORTED_DIRECTIONS = {"bid_to_deployment"}
 
 
+def _run_conversion(
+    input_path: Path,
+    output_path: Path,
+    compact: bool | None,
+    linearize: bool | None,
+) -> tuple[tuple[int, int, list[str], bool | None], StageTimer, float, dict[str, dict[str, int]]]:
+    """
+    Load reference data and convert one PDF (runs in a CPU worker process).
+
+    Returns:
+        (conversion result, stage timer, seconds spent in the worker,
+        cache counter changes made by the conversion)
+    """
+    started = time.perf_counter()
+    timer = StageTimer()
+    with counting_lookups() as cache_counts:
+        context = ConversionContext.load(timer)
+        result = context.convert(
+            input_path, output_path, compact=compact, linearize=linearize, timer=timer
+        )
+    return result, timer, time.perf_counter() - started, cache_counts
+
+
 @router.post("/convert/{upload_id}", response_model=ConversionResponse)
 async def convert_pdf(
     upload_id: str = PathParam(..., description="Upload session UUID"),
@@ -45,9 +71,12 @@ async def convert_pdf(
     Raises:
         HTTPException 400: Invalid direction parameter
         HTTPException 404: Upload not found or expired
+        HTTPException 429: Too many uploads and conversions waiting
         HTTPException 500: Conversion failed
+        HTTPException 503: Timed out waiting for capacity
     """
     start_time = time.time()
+    timer = StageTimer()
 
     # 1. Validate upload_id exists
     upload_metadata = file_manager.get_file(upload_id)
@@ -71,70 +100,43 @@ async def convert_pdf(
     input_path = upload_metadata.file_path
 
     try:
-        # 3. Load mapping configuration
-        mapping_parser = MappingParser(settings.mapping_file)
-        mapping_parser.load_mappings()
-        logger.info(f"Loaded {len(mapping_parser.mappings)} mappings")
-
-        # 4. Load BTX reference data
-        btx_loader = BTXReferenceLoader(settings.toolchest_dir)
-        btx_loader.load_toolchest()
-        logger.info(
-            f"Loaded BTX: {btx_loader.get_bid_icon_count()} bid, "
-            f"{btx_loader.get_deployment_icon_count()} deployment icons"
-        )
-
-        # 5. Optional: Load appearance extractor
-        appearance_extractor = None
-        deployment_map = settings.deployment_map_path
-        if deployment_map.exists():
-            appearance_extractor = AppearanceExtractor()
-            appearance_extractor.load_from_pdf(deployment_map)
-            logger.info("Loaded appearance data from DeploymentMap.pdf")
-
-        # 6. Initialize icon renderer
-        icon_renderer = None
-        gear_icons_path = GEAR_ICONS_DIR
-        if gear_icons_path.exists():
-            icon_renderer = IconRenderer(gear_icons_path)
-            logger.info("Initialized icon renderer")
-
-        # 7. Optional: Load layer manager for OCG structure
-        layer_manager = None
-        if settings.layer_reference_pdf.exists():
-            layer_manager = LayerManager(settings.layer_reference_pdf)
-            logger.info("Initialized layer manager for OCG structure")
-
-        # 8. Create annotation replacer
-        replacer = AnnotationReplacer(
-            mapping_parser=mapping_parser,
-            btx_loader=btx_loader,
-            appearance_extractor=appearance_extractor,
-            icon_renderer=icon_renderer,
-            layer_manager=layer_manager,
-        )
-
-        # 8. Generate output path
+        # 3. Generate output path
         output_path = settings.temp_dir / f"converted_{upload_id}.pdf"
 
-        # 9. Execute conversion
-        converted_count, skipped_count, skipped_subjects = replacer.replace_annotations(
-            input_path,
-            output_path,
-        )
-
-        # 10. Calculate processing time
+        # 4. Wait for capacity, then load reference data and convert off the event loop
+        wait_started = time.perf_counter()
+        async with conversion_admission.admit(job_cost(upload_metadata.file_size)):
+            timer.add("queue_wait", time.perf_counter() - wait_started)
+            run_started = time.perf_counter()
+            result, worker_timer, worker_seconds, cache_counts = await run_cpu(
+                _run_conversion,
+                input_path,
+                output_path,
+                request.compact if request else None,
+                request.linearize if request else None,
+            )
+            # Executor queueing, worker startup and pickling
+            timer.add("dispatch", time.perf_counter() - run_started - worker_seconds)
+        converted_count, skipped_count, skipped_subjects, linearized = result
+        timer.merge(worker_timer)
+        if get_executor("cpu").processes:
+            # Worker caches are not visible here; report their lookups with ours
+            merge_cache_counts(cache_counts)
+
+        # 5. Calculate processing time
         processing_time_ms = int((time.time() - start_time) * 1000)
 
-        # 11. Store converted file
-        converted_content = output_path.read_bytes()
+        # 6. Store converted file
         custom_filename = request.output_filename if request else None
-        converted_metadata = file_manager.store_converted(
-            converted_content,
-            upload_metadata.original_name,
-            upload_id,
-            custom_filename=custom_filename,
-        )
+        with timer.stage("store"):
+            converted_content = await run_io(output_path.read_bytes)
+            converted_metadata = await run_io(
+                file_manager.store_converted,
+                converted_content,
+                upload_metadata.original_name,
+                upload_id,
+                custom_filename=custom_filename,
+            )
 
         # Remove temporary output file (we stored it with proper naming)
         if output_path.exists() and output_path != converted_metadata.file_path:
@@ -144,8 +146,32 @@ async def convert_pdf(
             f"Conversion complete: {converted_count} converted, "
             f"{skipped_count} skipped in {processing_time_ms}ms"
         )
+        timings = ConversionTimings(
+            stages_ms=timer.stages_ms(),
+            render_counts=timer.counters,
+            cache_counts=cache_counts,
+        )
+        record = {
+            "upload_id": upload_id,
+            "file_id": converted_metadata.file_id,
+            "processing_time_ms": processing_time_ms,
+            "annotations_converted": converted_count,
+            "linearized": linearized,
+            **timings.model_dump(),
+        }
+        logger.info(
+            f"Conversion timings: {json.dumps(record)}",
+            extra={"conversion_timings": record},
+        )
+        converter_metrics.record_conversion(
+            processing_time_ms / 1000,
+            timer,
+            converted_count,
+            skipped_count,
+            converted_metadata.file_size,
+        )
 
-        # 12. Return response
+        # 7. Return response
         return ConversionResponse(
             upload_id=upload_id,
             file_id=converted_metadata.file_id,
@@ -159,12 +185,25 @@ async def convert_pdf(
             skipped_subjects=skipped_subjects[:10],  # Limit to first 10
             processing_time_ms=processing_time_ms,
             download_url=f"/api/download/{converted_metadata.file_id}",
-            message="Conversion completed successfully",
+            message=(
+                f"Conversion completed. {LINEARIZE_UNAVAILABLE}"
+                if linearized is False
+                else "Conversion completed successfully"
+            ),
+            timings=timings,
+            linearized=linearized,
         )
 
     except HTTPException:
         raise
+    except ServerBusyError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
+        converter_metrics.CONVERSIONS.inc(status="failed")
         logger.error(f"Conversion failed: {e}", exc_info=True)
         raise HTTPException(
             status_code=500,
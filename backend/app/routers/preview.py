@@ -0,0 +1,127 @@
+"""
+Converted map preview endpoints.
+
+Serves a deep-zoom tile pyramid and per-page overview images for a
+stored PDF, so a converted map can be inspected in the browser before
+downloading it.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import partial
+
+from fastapi import APIRouter, HTTPException, Path as PathParam, Request
+from fastapi.responses import FileResponse, Response
+
+from app.services.file_manager import file_manager
+from app.services.map_preview import TilePyramid
+from app.utils.executors import run_io
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Tiles never change for a given file, so clients may reuse them freely
+TILE_CACHE_CONTROL = "private, max-age=3600"
+
+# Pyramids of recently previewed files, so page sizes are read once per file
+PYRAMID_CACHE_SIZE = 32
+
+_pyramids: OrderedDict[str, TilePyramid] = OrderedDict()
+_pyramids_lock = threading.Lock()
+
+
+def _get_pyramid(file_id: str) -> TilePyramid:
+    """Get the (cached) pyramid for a stored file, or raise 404."""
+    # Not under _pyramids_lock: file_manager calls _drop_pyramid with its own lock held
+    metadata = file_manager.get_file(file_id)
+    if metadata is None:
+        raise HTTPException(status_code=404, detail="File not found or expired.")
+
+    with _pyramids_lock:
+        pyramid = _pyramids.get(file_id)
+        if pyramid is None:
+            pyramid = TilePyramid(
+                metadata.file_path,
+                file_manager.derived_dir(file_id) / "tiles",
+                on_write=partial(file_manager.add_derived_bytes, file_id),
+            )
+            _pyramids[file_id] = pyramid
+            if len(_pyramids) > PYRAMID_CACHE_SIZE:
+                _pyramids.popitem(last=False)
+        else:
+            _pyramids.move_to_end(file_id)
+        return pyramid
+
+
+def _drop_pyramid(file_id: str) -> None:
+    """Forget a deleted file's pyramid."""
+    with _pyramids_lock:
+        _pyramids.pop(file_id, None)
+
+
+file_manager.add_delete_listener(_drop_pyramid)
+
+
+def _image_response(request: Request, path, etag_key: str) -> Response:
+    """Serve a cached image with an ETag, answering 304 on a match."""
+    etag = '"' + hashlib.sha256(etag_key.encode()).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": TILE_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/png", headers=headers)
+
+
+@router.get("/preview/{file_id}")
+async def get_preview_info(file_id: str = PathParam(..., description="Stored file UUID")):
+    """
+    Describe the tile pyramid for a stored PDF.
+
+    Renders the first page's overview before returning, so the client
+    can show it immediately while tiles load.
+
+    Returns:
+        Page sizes, level geometry and URL templates for overview and tiles
+    """
+    pyramid = _get_pyramid(file_id)
+    try:
+        info = await run_io(pyramid.describe)
+        if info["page_count"]:
+            await run_io(pyramid.overview, 0)
+    except Exception as e:
+        logger.error(f"Preview failed for {file_id}: {e}")
+        raise HTTPException(status_code=422, detail=f"File cannot be previewed: {e}")
+
+    base = f"/api/preview/{file_id}/pages"
+    info["overview_url"] = base + "/{page}/overview.png"
+    info["tile_url"] = base + "/{page}/tiles/{level}/{x}_{y}.png"
+    return info
+
+
+@router.get("/preview/{file_id}/pages/{page}/overview.png")
+async def get_overview(request: Request, file_id: str, page: int):
+    """Low-resolution image of a whole page."""
+    pyramid = _get_pyramid(file_id)
+    try:
+        path = await run_io(pyramid.overview, page)
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _image_response(
+        request, path, f"{file_id}:{page}:overview:{pyramid.overview_size}"
+    )
+
+
+@router.get("/preview/{file_id}/pages/{page}/tiles/{level}/{x}_{y}.png")
+async def get_tile(request: Request, file_id: str, page: int, level: int, x: int, y: int):
+    """One tile of the pyramid, rendered on first request."""
+    pyramid = _get_pyramid(file_id)
+    try:
+        path = await run_io(pyramid.tile, page, level, x, y)
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _image_response(
+        request,
+        path,
+        f"{file_id}:{page}:{level}:{x}:{y}:{pyramid.tile_size}:{pyramid.max_zoom}",
+    )
@@ -1,12 +1,11 @@
 """Icon Tuner API endpoints."""
 
-import base64
-import io
 import logging
-from urllib.parse import unquote
+from urllib.parse import quote, unquote
 
-from fastapi import APIRouter, HTTPException, Response
-from PIL import Image as PILImage
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from pydantic import ValidationError
 
 from app.config import settings
 from app.models.tuner import (
@@ -24,28 +23,76 @@ from app.services.icon_config import (
     ID_PREFIX_CONFIG,
     get_icon_config,
 )
-from app.services.icon_override_store import IconOverrideStore
+from app.services.gear_thumbnails import GearThumbnailCache
+from app.services.icon_override_store import IconOverrideStore, apply_optional_defaults
+from app.services.icon_preview import IconPreviewService
+from app.services.icon_renderer import IconRenderer
+from app.utils.errors import RevisionConflictError
+from app.utils.executors import run_io
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Thumbnail URLs carry the image hash, so a cached copy stays valid for its URL
+THUMBNAIL_CACHE_CONTROL = "public, max-age=86400"
+
 # Lazily initialized singletons
 _store: IconOverrideStore | None = None
-_gear_image_cache: list[GearImageInfo] | None = None
+_thumbnails: GearThumbnailCache | None = None
+_preview_service: IconPreviewService | None = None
 
 
 def _get_store() -> IconOverrideStore:
     global _store
     if _store is None:
-        _store = IconOverrideStore(settings.icon_overrides_file)
+        _store = IconOverrideStore(
+            settings.icon_overrides_file, flush_delay=settings.icon_override_flush_seconds
+        )
     return _store
 
 
+def _get_thumbnails() -> GearThumbnailCache:
+    global _thumbnails
+    if _thumbnails is None:
+        _thumbnails = GearThumbnailCache(
+            settings.gear_icons_dir, settings.gear_thumbnail_dir, settings.gear_thumbnail_size
+        )
+    return _thumbnails
+
+
+def warm_gear_thumbnails() -> int:
+    """Render any missing gear thumbnails (blocking; run off the event loop)."""
+    return _get_thumbnails().warm()
+
+
+def _get_preview_service() -> IconPreviewService:
+    global _preview_service
+    if _preview_service is None:
+        _preview_service = IconPreviewService(IconRenderer(settings.gear_icons_dir))
+    return _preview_service
+
+
 def _decode_subject(subject: str) -> str:
     """URL-decode a subject parameter."""
     return unquote(subject)
 
 
+def _revision_etag(revision: int) -> str:
+    """ETag for a stored icon revision."""
+    return f'"{revision}"'
+
+
+def _parse_if_match(if_match: str | None) -> int | None:
+    """Revision from an If-Match header, or None if absent or "*"."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip().removeprefix("W/").strip('"')
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid If-Match header: {if_match}")
+
+
 def _get_id_preview(subject: str) -> str:
     """Get the ID preview string for a subject from ID_PREFIX_CONFIG."""
     config = ID_PREFIX_CONFIG.get(subject)
@@ -66,7 +113,7 @@ def _get_id_preview(subject: str) -> str:
 async def list_icons():
     """List all icons with merged configs (Python + JSON overrides)."""
     store = _get_store()
-    configs = store.get_all_configs()
+    configs = await run_io(store.get_all_configs)
     for c in configs:
         c["id_preview"] = _get_id_preview(c["subject"])
     return [IconConfigResponse(**c) for c in configs]
@@ -78,9 +125,9 @@ async def apply_to_all(request: ApplyToAllRequest):
     store = _get_store()
 
     # Validate source icon exists and get its category
-    source_config = store.get_icon(request.source_subject)
+    source_config = await run_io(store.get_icon, request.source_subject)
     if not source_config:
-        py_config = get_icon_config(request.source_subject)
+        py_config = await run_io(get_icon_config, request.source_subject)
         if not py_config:
             raise HTTPException(
                 status_code=404,
@@ -91,7 +138,7 @@ async def apply_to_all(request: ApplyToAllRequest):
         source_category = source_config.get("category", "Misc")
 
     # Get all icon configs to determine targets
-    all_configs = store.get_all_configs()
+    all_configs = await run_io(store.get_all_configs)
 
     if request.scope == "category":
         targets = [
@@ -160,7 +207,7 @@ async def apply_to_all(request: ApplyToAllRequest):
             scope=request.scope,
         )
 
-    count = store.apply_to_multiple(targets, updates)
+    count = await run_io(store.apply_to_multiple, targets, updates)
     return ApplyToAllResponse(
         affected_count=count,
         field_group=request.field_group,
@@ -169,54 +216,65 @@ async def apply_to_all(request: ApplyToAllRequest):
 
 
 @router.get("/icons/{subject:path}", response_model=IconConfigResponse)
-async def get_icon(subject: str):
-    """Get a single icon's full config."""
+async def get_icon(subject: str, response: Response):
+    """Get a single icon's full config. The ETag is the stored revision."""
     subject = _decode_subject(subject)
     store = _get_store()
+    revision = await run_io(store.get_revision, subject)
+    response.headers["ETag"] = _revision_etag(revision)
 
     # Check JSON override first
-    json_config = store.get_icon(subject)
+    json_config = await run_io(store.get_icon, subject)
     if json_config:
         json_config["subject"] = subject
         json_config["source"] = "json_override"
         json_config["id_preview"] = _get_id_preview(subject)
+        json_config["revision"] = revision
         return IconConfigResponse(**json_config)
 
     # Fall back to Python config
-    config = get_icon_config(subject)
+    config = await run_io(get_icon_config, subject)
     if not config:
         raise HTTPException(status_code=404, detail=f"Icon not found: {subject}")
 
     config["subject"] = subject
     config["source"] = "python"
-    config.setdefault("img_x_offset", 0.0)
-    config.setdefault("img_y_offset", 0.0)
-    config.setdefault("model_text_override", None)
-    config.setdefault("model_uppercase", False)
-    config.setdefault("no_image", False)
-    config.setdefault("id_box_y_offset", 0.0)
-    config.setdefault("no_id_box", False)
-    config.setdefault("layer_order", ["gear_image", "brand_text", "model_text"])
+    apply_optional_defaults(config)
     config["id_preview"] = _get_id_preview(subject)
+    config["revision"] = revision
     return IconConfigResponse(**config)
 
 
 @router.put("/icons/{subject:path}", response_model=IconConfigResponse)
-async def save_icon(subject: str, update: IconConfigUpdateRequest):
-    """Save/update an icon config to JSON."""
+async def save_icon(
+    subject: str,
+    update: IconConfigUpdateRequest,
+    response: Response,
+    if_match: str | None = Header(None),
+):
+    """
+    Save/update an icon config to JSON.
+
+    With an If-Match header holding the revision the edit is based on, a
+    concurrent change to the icon returns 412 instead of being overwritten.
+    """
     subject = _decode_subject(subject)
     store = _get_store()
+    expected_revision = _parse_if_match(if_match)
 
-    # Build complete config from base + updates
+    # Build complete config from the current config + updates and save it
     partial = update.model_dump(exclude_none=True)
-    full_config = store.build_full_config(subject, partial)
-
-    # Remove transient fields before saving
-    save_config = {k: v for k, v in full_config.items() if k not in ("subject", "source")}
-    store.set_icon(subject, save_config)
+    try:
+        full_config, revision = await run_io(
+            store.update_icon, subject, partial, expected_revision=expected_revision
+        )
+    except RevisionConflictError as e:
+        raise HTTPException(status_code=412, detail=e.message)
 
+    response.headers["ETag"] = _revision_etag(revision)
     full_config["source"] = "json_override"
     full_config["id_preview"] = _get_id_preview(subject)
+    full_config["revision"] = revision
     return IconConfigResponse(**full_config)
 
 
@@ -227,15 +285,15 @@ async def create_icon(request: IconConfigCreateRequest):
     subject = request.subject
 
     # Check it doesn't already exist
-    existing = store.get_icon(subject)
+    existing = await run_io(store.get_icon, subject)
     if existing or subject in ICON_CATEGORIES:
         raise HTTPException(status_code=409, detail=f"Icon already exists: {subject}")
 
     if request.clone_from:
         # Clone from existing icon
-        base = get_icon_config(request.clone_from)
+        base = await run_io(get_icon_config, request.clone_from)
         if not base:
-            clone_config = store.get_icon(request.clone_from)
+            clone_config = await run_io(store.get_icon, request.clone_from)
             if not clone_config:
                 raise HTTPException(
                     status_code=404,
@@ -256,100 +314,135 @@ async def create_icon(request: IconConfigCreateRequest):
         base["image_path"] = None
 
     # Set defaults
-    base.setdefault("img_x_offset", 0.0)
-    base.setdefault("img_y_offset", 0.0)
-    base.setdefault("model_text_override", None)
-    base.setdefault("model_uppercase", False)
-    base.setdefault("no_image", False)
-    base.setdefault("id_box_y_offset", 0.0)
-    base.setdefault("no_id_box", False)
-    base.setdefault("layer_order", ["gear_image", "brand_text", "model_text"])
+    apply_optional_defaults(base)
 
     # Save (without transient fields)
     save_config = {k: v for k, v in base.items() if k not in ("subject", "source")}
-    store.set_icon(subject, save_config)
+    revision = await run_io(store.set_icon, subject, save_config)
 
     base["subject"] = subject
     base["source"] = "custom"
     base["id_preview"] = _get_id_preview(subject)
+    base["revision"] = revision
     return IconConfigResponse(**base)
 
 
 @router.delete("/icons/{subject:path}", status_code=204)
-async def delete_icon(subject: str):
-    """Remove JSON override (reverts to Python defaults)."""
+async def delete_icon(subject: str, if_match: str | None = Header(None)):
+    """Remove JSON override (reverts to Python defaults). Honors If-Match like PUT."""
     subject = _decode_subject(subject)
     store = _get_store()
-    store.delete_icon(subject)
+    try:
+        await run_io(store.delete_icon, subject, expected_revision=_parse_if_match(if_match))
+    except RevisionConflictError as e:
+        raise HTTPException(status_code=412, detail=e.message)
+
+
+# ─── Preview ─────────────────────────────────────────────────────────
+
+
+@router.get("/preview")
+async def preview_icon(
+    request: Request,
+    subject: str,
+    config: str | None = Query(
+        None, description="JSON object of config overrides (IconConfigUpdateRequest fields)"
+    ),
+    scale: float = Query(4.0, gt=0, le=16, description="Pixels per PDF point"),
+    id_label: str | None = None,
+):
+    """
+    Render a subject with a candidate config to PNG.
+
+    The candidate config is the icon's current config with the given
+    overrides applied, exactly as PUT /icons/{subject} would save it.
+    Responses carry an ETag derived from the canonicalized config; a
+    matching If-None-Match returns 304 without rendering.
+    """
+    store = _get_store()
+    if not await run_io(store.get_icon, subject) and not await run_io(get_icon_config, subject):
+        raise HTTPException(status_code=404, detail=f"Icon not found: {subject}")
 
+    overrides: dict = {}
+    if config:
+        try:
+            overrides = IconConfigUpdateRequest.model_validate_json(config).model_dump(
+                exclude_none=True
+            )
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid config: {e.errors()}")
 
-# ─── Gear Images ─────────────────────────────────────────────────────
+    full_config = await run_io(store.build_full_config, subject, overrides)
+    full_config.pop("subject", None)
+    full_config.pop("source", None)
+    label = id_label if id_label is not None else _get_id_preview(subject)
 
+    service = _get_preview_service()
+    etag = service.etag(subject, full_config, scale, label)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
 
-def _load_gear_images() -> list[GearImageInfo]:
-    """Scan gear icons directory and create thumbnail cache."""
-    global _gear_image_cache
-    if _gear_image_cache is not None:
-        return _gear_image_cache
-
-    images: list[GearImageInfo] = []
-    gear_dir = settings.gear_icons_dir
-
-    if not gear_dir.exists():
-        logger.warning(f"Gear icons directory not found: {gear_dir}")
-        return images
-
-    for category_dir in sorted(gear_dir.iterdir()):
-        if not category_dir.is_dir():
-            continue
-        category = category_dir.name
-        for png_file in sorted(category_dir.glob("*.png")):
-            try:
-                with PILImage.open(png_file) as img:
-                    img.thumbnail((64, 64))
-                    buf = io.BytesIO()
-                    img.save(buf, format="PNG")
-                    thumbnail_b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-
-                images.append(
-                    GearImageInfo(
-                        filename=png_file.name,
-                        category=category,
-                        path=f"{category}/{png_file.name}",
-                        thumbnail=thumbnail_b64,
-                    )
-                )
-            except (OSError, ValueError) as e:
-                logger.warning(f"Failed to process gear image {png_file}: {e}")
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    png = await run_io(service.render_png, subject, full_config, scale, label, etag=etag)
+    if png is None:
+        raise HTTPException(status_code=422, detail=f"Icon cannot be rendered: {subject}")
 
-    _gear_image_cache = images
-    return images
+    return Response(content=png, media_type="image/png", headers=headers)
+
+
+# ─── Gear Images ─────────────────────────────────────────────────────
 
 
 @router.get("/gear-images", response_model=list[GearImageInfo])
 async def list_gear_images(category: str | None = None):
-    """List gear PNGs with base64 thumbnails."""
-    images = _load_gear_images()
+    """List gear PNGs with versioned thumbnail URLs."""
+    images = await run_io(_get_thumbnails().images)
     if category:
         images = [img for img in images if img.category == category]
-    return images
+    return [
+        GearImageInfo(
+            filename=img.filename,
+            category=img.category,
+            path=img.path,
+            thumbnail_url=f"/api/tuner/gear-thumbnails/{quote(img.path)}?v={img.digest[:12]}",
+        )
+        for img in images
+    ]
 
 
-@router.get("/gear-image-file/{image_path:path}")
-async def get_gear_image_file(image_path: str):
-    """Serve a full-resolution gear image PNG."""
+@router.get("/gear-thumbnails/{image_path:path}")
+async def get_gear_thumbnail(request: Request, image_path: str):
+    """
+    Serve a gear image thumbnail, rendering it on first request.
+
+    The ETag is the source PNG's content hash; a matching If-None-Match
+    returns 304.
+    """
     image_path = unquote(image_path)
-    full_path = settings.gear_icons_dir / image_path
-    # Security: validate path doesn't escape gear_icons_dir BEFORE checking existence
     try:
-        resolved = full_path.resolve()
-        resolved.relative_to(settings.gear_icons_dir.resolve())
-    except ValueError:
+        found = await run_io(_get_thumbnails().thumbnail, image_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to process gear image {image_path}: {e}")
+        raise HTTPException(status_code=422, detail="Image cannot be read")
+    if found is None:
         raise HTTPException(status_code=404, detail="Image not found")
-    if not resolved.exists() or not resolved.is_file():
+
+    path, digest = found
+    headers = {"ETag": f'"{digest}"', "Cache-Control": THUMBNAIL_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type="image/png", headers=headers)
+
+
+@router.get("/gear-image-file/{image_path:path}")
+async def get_gear_image_file(image_path: str):
+    """Serve a full-resolution gear image PNG."""
+    # resolve() rejects paths that escape gear_icons_dir before checking existence
+    resolved = await run_io(_get_thumbnails().resolve, unquote(image_path))
+    if resolved is None:
         raise HTTPException(status_code=404, detail="Image not found")
-    with open(resolved, "rb") as f:
-        return Response(content=f.read(), media_type="image/png")
+    return FileResponse(resolved, media_type="image/png")
 
 
 # ─── Categories ──────────────────────────────────────────────────────
@@ -359,7 +452,7 @@ async def get_gear_image_file(image_path: str):
 async def list_categories():
     """List categories with defaults and icon counts."""
     store = _get_store()
-    all_configs = store.get_all_configs()
+    all_configs = await run_io(store.get_all_configs)
 
     # Count icons per category
     counts: dict[str, int] = {}
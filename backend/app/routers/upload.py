@@ -10,12 +10,16 @@ from fastapi import APIRouter, UploadFile, File, HTTPException
 
 from app.config import settings
 from app.models.pdf_file import PDFUploadResponse
+from app.services import converter_metrics
+from app.services.admission import conversion_admission, job_cost
 from app.services.file_manager import file_manager
 from app.services.pdf_parser import PDFAnnotationParser
+from app.utils.executors import run_io
 from app.utils.errors import (
     InvalidFileTypeError,
     MultiPagePDFError,
     NoAnnotationsFoundError,
+    ServerBusyError,
 )
 
 logger = logging.getLogger(__name__)
@@ -39,6 +43,8 @@ async def upload_pdf(file: UploadFile = File(...)):
 
     Raises:
         HTTPException 400: Invalid file type, size, or structure
+        HTTPException 429: Too many uploads and conversions waiting
+        HTTPException 503: Timed out waiting for capacity
     """
     # 1. Validate file extension
     if not file.filename or not file.filename.lower().endswith(".pdf"):
@@ -47,50 +53,65 @@ async def upload_pdf(file: UploadFile = File(...)):
             detail="File is not a PDF. Please upload a PDF venue map.",
         )
 
-    # 2. Read file content
+    # 2. Wait for capacity; refuse quickly when the server is overloaded
+    try:
+        async with conversion_admission.admit(job_cost(file.size or 0)):
+            return await _process_upload(file)
+    except ServerBusyError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+async def _process_upload(file: UploadFile) -> PDFUploadResponse:
+    """Read, validate, store and parse an upload once it has been admitted."""
+    # 3. Read file content
     content = await file.read()
+    converter_metrics.UPLOAD_SIZE.observe(len(content))
 
-    # 3. Validate file size
+    # 4. Validate file size
     if len(content) > MAX_FILE_SIZE:
         raise HTTPException(
             status_code=400,
             detail=f"PDF file too large (max {settings.max_file_size_mb}MB). Please reduce file size.",
         )
 
-    # 4. Validate PDF magic number
+    # 5. Validate PDF magic number
     if not content.startswith(PDF_MAGIC):
         raise HTTPException(
             status_code=400,
             detail="File is not a valid PDF. Please upload a PDF venue map.",
         )
 
-    # 5. Store file temporarily for parsing
-    metadata = file_manager.store_upload(content, file.filename)
+    # 6. Store file temporarily for parsing
+    metadata = await run_io(file_manager.store_upload, content, file.filename)
 
     try:
-        # 6. Parse PDF to get page count and annotation count
+        # 7. Parse PDF to get page count and annotation count
         parser = PDFAnnotationParser()
 
         # Validate PDF structure
-        if not parser.validate_pdf(metadata.file_path):
+        if not await run_io(parser.validate_pdf, metadata.file_path):
             raise HTTPException(
                 status_code=400,
                 detail="File is not a valid PDF. Please upload a PDF venue map.",
             )
 
         # Get page count
-        page_count = parser.get_page_count(metadata.file_path)
+        page_count = await run_io(parser.get_page_count, metadata.file_path)
 
-        # 7. Validate single-page PDF (MVP constraint)
+        # 8. Validate single-page PDF (MVP constraint)
         if page_count > 1:
             raise HTTPException(
                 status_code=400,
                 detail="Multi-page PDFs not yet supported. Please upload a single-page venue map.",
             )
 
-        # 8. Parse annotations
+        # 9. Parse annotations
         try:
-            annotations = parser.parse_pdf(metadata.file_path)
+            annotations = await run_io(parser.parse_pdf, metadata.file_path)
             annotation_count = len(annotations)
         except NoAnnotationsFoundError:
             raise HTTPException(
@@ -108,7 +129,7 @@ async def upload_pdf(file: UploadFile = File(...)):
                 detail=f"Unable to parse PDF structure. {str(e)}",
             )
 
-        # 9. Validate annotations exist
+        # 10. Validate annotations exist
         if annotation_count == 0:
             raise HTTPException(
                 status_code=400,
@@ -120,7 +141,7 @@ async def upload_pdf(file: UploadFile = File(...)):
             f"{annotation_count} annotation(s)"
         )
 
-        # 10. Return response
+        # 11. Return response
         return PDFUploadResponse(
             upload_id=metadata.file_id,
             file_name=file.filename,
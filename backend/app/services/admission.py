@@ -0,0 +1,239 @@
+"""
+Admission control for uploads and conversions.
+
+Limits how many jobs are processed at once and how much memory they are
+estimated to need together, so a burst of large PDFs waits its turn
+instead of pushing the host into swap. Jobs that cannot start at once
+wait in a bounded FIFO queue. When the queue is full a job is refused
+right away (429). A job that waits longer than the queue timeout gives
+up (503). Either way the error carries a Retry-After estimate.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from app.config import settings
+from app.utils.errors import ServerBusyError
+
+logger = logging.getLogger(__name__)
+
+# Bounds for the Retry-After estimate, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 300
+
+# Weight of the latest job in the average hold time
+HOLD_TIME_SMOOTHING = 0.2
+
+
+@dataclass
+class _Waiter:
+    """A queued job and the future resolved when it is admitted."""
+
+    cost: int
+    future: asyncio.Future
+
+
+class AdmissionController:
+    """
+    Concurrency and memory budget for jobs, with a bounded wait queue.
+
+    A job is admitted when fewer than max_concurrent jobs are active and
+    its estimated memory fits the remaining budget. A job larger than the
+    whole budget is admitted only when nothing else is running. Waiting
+    jobs are admitted strictly in arrival order, so large jobs are not
+    starved by small ones.
+
+    Used from the event loop only; it is not thread-safe.
+
+    Usage:
+        async with conversion_admission.admit(cost_bytes):
+            await run_cpu(...)
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        memory_budget_bytes: int = 0,
+        max_queue: int = 16,
+        queue_timeout: float = 30.0,
+    ):
+        """
+        Initialize controller.
+
+        Args:
+            max_concurrent: Jobs processed at once
+            memory_budget_bytes: Combined estimated memory of active jobs
+                (0 = no limit)
+            max_queue: Jobs allowed to wait for capacity
+            queue_timeout: Seconds a job may wait before it is refused
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.memory_budget_bytes = max(0, memory_budget_bytes)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._waiters: deque[_Waiter] = deque()
+        self.active = 0
+        self.reserved_bytes = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._avg_hold_seconds: float | None = None
+
+    @property
+    def queued(self) -> int:
+        """Jobs waiting for capacity."""
+        return len(self._waiters)
+
+    def _fits(self, cost: int) -> bool:
+        if self.active >= self.max_concurrent:
+            return False
+        if self.memory_budget_bytes <= 0 or self.active == 0:
+            return True
+        return self.reserved_bytes + cost <= self.memory_budget_bytes
+
+    def _grant(self, cost: int) -> None:
+        self.active += 1
+        self.reserved_bytes += cost
+        self.admitted += 1
+
+    def _wake(self) -> None:
+        """Admit waiting jobs from the head of the queue while they fit."""
+        while self._waiters and self._fits(self._waiters[0].cost):
+            waiter = self._waiters.popleft()
+            self._grant(waiter.cost)
+            waiter.future.set_result(None)
+
+    def release(self, cost: int, held_seconds: float | None = None) -> None:
+        """
+        Return an admitted job's capacity and admit waiting jobs.
+
+        Args:
+            cost: Estimated memory the job was admitted with
+            held_seconds: How long the job ran, for the Retry-After estimate
+        """
+        self.active -= 1
+        self.reserved_bytes -= cost
+        if held_seconds is not None:
+            if self._avg_hold_seconds is None:
+                self._avg_hold_seconds = held_seconds
+            else:
+                self._avg_hold_seconds += HOLD_TIME_SMOOTHING * (
+                    held_seconds - self._avg_hold_seconds
+                )
+        self._wake()
+
+    def retry_after(self) -> int:
+        """Seconds until capacity is likely to free up for a new job."""
+        if self._avg_hold_seconds is None:
+            return MIN_RETRY_AFTER
+        # Everything queued plus the new job, drained max_concurrent at a time
+        rounds = (self.queued + 1) / self.max_concurrent
+        estimate = math.ceil(self._avg_hold_seconds * rounds)
+        return min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, estimate))
+
+    async def acquire(self, cost: int = 0) -> None:
+        """
+        Wait until a job may start, then reserve its capacity.
+
+        Pair every successful acquire() with release().
+
+        Args:
+            cost: Estimated peak memory of the job in bytes
+
+        Raises:
+            ServerBusyError: 429 if the queue is full, 503 if the wait timed out
+        """
+        if not self._waiters and self._fits(cost):
+            self._grant(cost)
+            return
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            retry_after = self.retry_after()
+            logger.warning(
+                f"Rejected job: {self.active} active, {self.queued} queued "
+                f"(retry after {retry_after}s)"
+            )
+            raise ServerBusyError(
+                "Server is busy with other conversions. Please try again shortly.",
+                status_code=429,
+                retry_after=retry_after,
+            )
+
+        waiter = _Waiter(cost, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait([waiter.future], timeout=self.queue_timeout)
+        except BaseException:
+            # Caller cancelled (e.g. client disconnected) while queued
+            self._abandon(waiter)
+            raise
+
+        if not waiter.future.done():
+            self._abandon(waiter)
+            self.timed_out += 1
+            retry_after = self.retry_after()
+            logger.warning(
+                f"Job waited {self.queue_timeout:.0f}s without capacity "
+                f"(retry after {retry_after}s)"
+            )
+            raise ServerBusyError(
+                "Server is overloaded. Please try again later.",
+                status_code=503,
+                retry_after=retry_after,
+            )
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Drop a waiter that gave up, returning capacity granted meanwhile."""
+        if waiter.future.done():
+            self.release(waiter.cost)
+            return
+        self._waiters.remove(waiter)
+        waiter.future.cancel()
+        # A large job at the head may have been holding back smaller ones
+        self._wake()
+
+    @asynccontextmanager
+    async def admit(self, cost: int = 0) -> AsyncIterator[None]:
+        """Hold admission for the duration of the block (see acquire())."""
+        await self.acquire(cost)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(cost, time.monotonic() - started)
+
+    def stats(self) -> dict[str, int | float]:
+        """Current load, limits and rejection counts."""
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "admitted": self.admitted,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "reserved_mb": round(self.reserved_bytes / (1024 * 1024), 1),
+            "memory_budget_mb": round(self.memory_budget_bytes / (1024 * 1024), 1),
+            "retry_after_seconds": self.retry_after(),
+        }
+
+
+def job_cost(file_size: int) -> int:
+    """Estimated peak memory in bytes of processing a PDF of file_size bytes."""
+    return int(file_size * settings.admission_memory_factor)
+
+
+# Shared by /api/upload, /api/convert and /api/batch/convert
+conversion_admission = AdmissionController(
+    max_concurrent=settings.admission_max_concurrent,
+    memory_budget_bytes=settings.admission_memory_budget_mb * 1024 * 1024,
+    max_queue=settings.admission_max_queue,
+    queue_timeout=settings.admission_queue_timeout_seconds,
+)
@@ -12,6 +12,7 @@ matching Bluebeam's native structure for move-survivable icons.
 """
 
 import logging
+import time
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
@@ -33,6 +34,7 @@ from app.models.mapping import IconData
 from app.services.btx_loader import BTXReferenceLoader
 from app.services.icon_config import IconIdAssigner
 from app.services.mapping_parser import MappingParser
+from app.utils.timing import StageTimer
 
 if TYPE_CHECKING:
     from app.services.appearance_extractor import AppearanceExtractor
@@ -445,6 +447,7 @@ class AnnotationReplacer:
         self,
         input_pdf: Path,
         output_pdf: Path,
+        timer: StageTimer | None = None,
     ) -> tuple[int, int, list[str]]:
         """
         Replace bid annotations with deployment annotations in a PDF.
@@ -455,6 +458,9 @@ class AnnotationReplacer:
         Args:
             input_pdf: Path to input PDF with bid annotations
             output_pdf: Path to save converted PDF
+            timer: Optional StageTimer that receives the read, layer_clone,
+                annotation_rewrite, render (part of annotation_rewrite) and
+                write stages, plus "<mode>:<subtype>" counts of rendered icons
 
         Returns:
             Tuple of (converted_count, skipped_count, skipped_subjects)
@@ -462,6 +468,8 @@ class AnnotationReplacer:
         converted_count = 0
         skipped_count = 0
         skipped_subjects: list[str] = []
+        if timer is None:
+            timer = StageTimer()
 
         # Reset counters for new conversion
         self.id_assigner.reset()
@@ -472,19 +480,20 @@ class AnnotationReplacer:
             logger.error(f"Input PDF not found: {input_pdf}")
             return 0, 0, []
 
-        # Open PDF with pypdf
-        reader = PdfReader(str(input_pdf))
-        writer = PdfWriter()
-
-        # Copy all pages to writer
-        for page in reader.pages:
-            writer.add_page(page)
+        # Open PDF with pypdf and copy all pages to writer
+        with timer.stage("read"):
+            reader = PdfReader(str(input_pdf))
+            writer = PdfWriter()
+            for page in reader.pages:
+                writer.add_page(page)
 
         # Apply layer structure from reference PDF (if available)
         if self.layer_manager:
-            self.layer_manager.apply_to_writer(writer)
+            with timer.stage("layer_clone"):
+                self.layer_manager.apply_to_writer(writer)
 
         # Process each page — single-pass array rebuild
+        rewrite_started = time.perf_counter()
         for page_num, page in enumerate(writer.pages):
             annots_ref = page.get("/Annots")
             if not annots_ref:
@@ -562,9 +571,10 @@ class AnnotationReplacer:
                     # Try compound annotation group (Bluebeam-native structure)
                     components = None
                     if self.icon_renderer:
-                        components = self.icon_renderer.render_compound_icon(
-                            writer, deployment_subject, (cx, cy), id_label=id_label
-                        )
+                        with timer.stage("render"):
+                            components = self.icon_renderer.render_compound_icon(
+                                writer, deployment_subject, (cx, cy), id_label=id_label
+                            )
 
                     if components:
                         # Compound group: 3-7 linked annotations
@@ -573,6 +583,7 @@ class AnnotationReplacer:
                         )
                         new_annots.extend(annot_refs)
                         converted_count += 1
+                        timer.count(f"compound:{self._get_annotation_type(annot_subtype)}")
                         logger.debug(
                             f"Converted (compound {len(annot_refs)}): "
                             f"{bid_subject} -> {deployment_subject}"
@@ -589,13 +600,16 @@ class AnnotationReplacer:
                             deployment_subject, icon_data
                         )
 
-                        appearance_ref = self._render_rich_icon(
-                            writer, deployment_subject, rect, id_label=id_label
-                        )
-                        if appearance_ref is None:
-                            appearance_ref = self._create_simple_appearance(
-                                writer, rect, fill_color, stroke_color, annot_subtype
+                        with timer.stage("render"):
+                            render_mode = "rich"
+                            appearance_ref = self._render_rich_icon(
+                                writer, deployment_subject, rect, id_label=id_label
                             )
+                            if appearance_ref is None:
+                                render_mode = "simple"
+                                appearance_ref = self._create_simple_appearance(
+                                    writer, rect, fill_color, stroke_color, annot_subtype
+                                )
 
                         new_annot = self._create_deployment_annotation_dict(
                             rect=rect,
@@ -609,6 +623,7 @@ class AnnotationReplacer:
                         new_annot_ref = writer._add_object(new_annot)
                         new_annots.append(new_annot_ref)
                         converted_count += 1
+                        timer.count(f"{render_mode}:{self._get_annotation_type(annot_subtype)}")
                         logger.debug(f"Converted (single): {bid_subject} -> {deployment_subject}")
 
                 except Exception as e:
@@ -624,8 +639,10 @@ class AnnotationReplacer:
             if deleted_count > 0:
                 logger.info(f"Deleted {deleted_count} legend annotations on page {page_num + 1}")
 
+        timer.add("annotation_rewrite", time.perf_counter() - rewrite_started)
+
         # Save the output PDF
-        with open(output_pdf, "wb") as f:
+        with timer.stage("write"), open(output_pdf, "wb") as f:
             writer.write(f)
 
         logger.info(
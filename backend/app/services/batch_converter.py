@@ -0,0 +1,355 @@
+"""
+Batch conversion service.
+
+Converts many uploaded PDFs concurrently on the shared "cpu" executor, and
+streams the results back as a ZIP archive that is built entry by entry so
+the full archive is never held in memory.
+"""
+
+import logging
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterator
+from uuid import uuid4
+
+from app.config import settings
+from app.models.pdf_file import BatchFileResult, BatchManifest
+from app.services.conversion_context import ConversionContext
+from app.services.file_manager import FileManager, FileMetadata, file_manager
+from app.services.output_optimizer import LINEARIZE_UNAVAILABLE
+from app.utils.cache import counting_lookups, merge_cache_counts
+from app.utils.errors import BatchTooLargeError
+from app.utils.executors import ManagedExecutor, get_executor
+
+logger = logging.getLogger(__name__)
+
+PDF_MAGIC = b"%PDF"
+ZIP_CHUNK_SIZE = 1024 * 1024  # Bytes copied into the archive per yielded chunk
+MANIFEST_NAME = "manifest.json"
+
+
+def _convert_file(
+    context: ConversionContext | None, input_path: Path, output_path: Path
+) -> tuple[tuple[int, int, list[str], bool | None], dict[str, dict[str, int]]]:
+    """
+    Worker: convert one PDF, loading reference data when none is passed.
+
+    Returns:
+        (conversion result, cache counter changes made by the conversion)
+    """
+    with counting_lookups() as cache_counts:
+        if context is None:
+            context = ConversionContext.load()
+        result = context.convert(input_path, output_path)
+    return result, cache_counts
+
+
+class _ZipStreamBuffer:
+    """Write-only sink that lets a ZipFile be drained chunk by chunk."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        """Return and clear everything written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class BatchConverter:
+    """
+    Converts a set of PDFs and streams them back as a ZIP.
+
+    Usage:
+        batch = BatchConverter(ConversionContext.load())
+        batch.add_pdf("zone_a.pdf", content)
+        batch.add_zip("stages.zip", fileobj)
+        for chunk in batch.iter_zip():
+            ...
+    """
+
+    def __init__(
+        self,
+        context: ConversionContext,
+        max_workers: int | None = None,
+        max_files: int | None = None,
+        manager: FileManager | None = None,
+        executor: ManagedExecutor | None = None,
+    ):
+        """
+        Initialize batch converter.
+
+        Args:
+            context: Shared reference data for conversions run on threads;
+                process workers load their own
+            max_workers: Conversions of this batch submitted at once.
+                Defaults to settings.batch_max_workers
+            max_files: Maximum PDFs accepted. Defaults to settings.batch_max_files
+            manager: FileManager for uploads and outputs. Defaults to the global instance
+            executor: Executor that runs the conversions. Defaults to "cpu"
+        """
+        self.context = context
+        self.max_workers = max_workers or settings.batch_max_workers
+        self.max_files = max_files or settings.batch_max_files
+        self.manager = manager or file_manager
+        self.executor = executor or get_executor("cpu")
+        self.batch_id = str(uuid4())
+        self.direction = "bid_to_deployment"
+        self.results: list[BatchFileResult] = []
+        self._pending: list[tuple[int, FileMetadata]] = []
+
+    @property
+    def file_count(self) -> int:
+        """Number of PDFs accepted into the batch (including rejected ones)."""
+        return len(self.results)
+
+    @property
+    def pending_bytes(self) -> int:
+        """Combined size of the stored PDFs still to be converted."""
+        return sum(metadata.file_size for _, metadata in self._pending)
+
+    def add_pdf(self, name: str, content: bytes) -> None:
+        """
+        Add a single PDF to the batch.
+
+        Invalid files are recorded as failed manifest entries rather than
+        aborting the batch.
+
+        Args:
+            name: Source filename (used for the manifest and output name)
+            content: PDF bytes
+
+        Raises:
+            BatchTooLargeError: If the batch already holds max_files PDFs
+        """
+        index = self._reserve_slot(name)
+        max_bytes = settings.max_file_size_mb * 1024 * 1024
+
+        if len(content) > max_bytes:
+            self._fail(index, f"PDF file too large (max {settings.max_file_size_mb}MB)")
+            return
+        if not content.startswith(PDF_MAGIC):
+            self._fail(index, "File is not a valid PDF")
+            return
+
+        metadata = self.manager.store_upload(content, PurePosixPath(name).name)
+        self.results[index].upload_id = metadata.file_id
+        self._pending.append((index, metadata))
+
+    def add_zip(self, name: str, fileobj: BinaryIO) -> None:
+        """
+        Add every PDF inside a ZIP archive to the batch.
+
+        Members are read one at a time; oversized members are rejected from
+        their header size before any data is decompressed.
+
+        Args:
+            name: ZIP filename (prefixed to member names in the manifest)
+            fileobj: Seekable binary file object with the ZIP data
+
+        Raises:
+            BatchTooLargeError: If the archive pushes the batch past max_files
+        """
+        max_bytes = settings.max_file_size_mb * 1024 * 1024
+        try:
+            archive = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile:
+            index = self._reserve_slot(name)
+            self._fail(index, "File is not a valid ZIP archive")
+            return
+
+        with archive:
+            for info in archive.infolist():
+                member = PurePosixPath(info.filename)
+                if info.is_dir() or member.suffix.lower() != ".pdf":
+                    continue
+                if "__MACOSX" in member.parts or member.name.startswith("._"):
+                    continue
+
+                source_name = f"{name}/{info.filename}"
+                if info.file_size > max_bytes:
+                    index = self._reserve_slot(source_name)
+                    self._fail(
+                        index, f"PDF file too large (max {settings.max_file_size_mb}MB)"
+                    )
+                    continue
+
+                self.add_pdf(source_name, archive.read(info))
+
+    def discard(self) -> None:
+        """Delete the stored uploads of a batch that will not be converted."""
+        for _, metadata in self._pending:
+            self.manager._cleanup_file(metadata.file_id)
+        self._pending.clear()
+
+    def iter_zip(self) -> Iterator[bytes]:
+        """
+        Run all pending conversions and yield the result ZIP incrementally.
+
+        Converted PDFs are written to the archive as they complete, copied
+        from FileManager storage in ZIP_CHUNK_SIZE pieces. The manifest is
+        the final entry.
+
+        Yields:
+            Chunks of the ZIP archive
+        """
+        start_time = time.time()
+        buffer = _ZipStreamBuffer()
+        used_names: set[str] = {MANIFEST_NAME}
+        queued = deque(self._pending)
+        running: dict[Future, tuple[int, FileMetadata, float]] = {}
+
+        try:
+            with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+                while queued or running:
+                    # Keep at most max_workers of this batch in the shared pool
+                    while queued and len(running) < self.max_workers:
+                        index, upload = queued.popleft()
+                        running[self._submit(upload)] = (index, upload, time.time())
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index, upload, submitted = running.pop(future)
+                        result = self.results[index]
+                        try:
+                            self._apply_outcome(result, self._finish_one(future, upload, submitted))
+                        except Exception as e:
+                            logger.error(f"Batch conversion failed for {result.source_file}: {e}")
+                            result.status = "failed"
+                            result.error = f"Conversion failed: {e}"
+                            continue
+
+                        converted = self.manager.get_file(result.file_id)
+                        if converted is None:
+                            result.status = "failed"
+                            result.error = "Converted file expired before it could be archived"
+                            continue
+
+                        result.archive_name = self._unique_name(
+                            converted.original_name, used_names
+                        )
+                        with archive.open(result.archive_name, "w", force_zip64=True) as dest:
+                            with open(converted.file_path, "rb") as src:
+                                while chunk := src.read(ZIP_CHUNK_SIZE):
+                                    dest.write(chunk)
+                                    yield buffer.drain()
+                        yield buffer.drain()
+
+                manifest = self.build_manifest(int((time.time() - start_time) * 1000))
+                archive.writestr(
+                    MANIFEST_NAME,
+                    manifest.model_dump_json(indent=2),
+                    compress_type=zipfile.ZIP_DEFLATED,
+                )
+
+            yield buffer.drain()
+
+            logger.info(
+                f"Batch {self.batch_id} complete: {manifest.converted_files} converted, "
+                f"{manifest.failed_files} failed in {manifest.processing_time_ms}ms"
+            )
+        finally:
+            # Stream abandoned: drop queued work and the output of running work
+            for future, (_, upload, _) in running.items():
+                future.cancel()
+                output_path = self._output_path(upload)
+                future.add_done_callback(lambda _, path=output_path: path.unlink(missing_ok=True))
+
+    def build_manifest(self, processing_time_ms: int) -> BatchManifest:
+        """Build the manifest from the current per-file results."""
+        converted = sum(1 for r in self.results if r.status == "converted")
+        return BatchManifest(
+            batch_id=self.batch_id,
+            direction=self.direction,
+            total_files=len(self.results),
+            converted_files=converted,
+            failed_files=len(self.results) - converted,
+            processing_time_ms=processing_time_ms,
+            results=self.results,
+        )
+
+    def _output_path(self, upload: FileMetadata) -> Path:
+        return self.manager.temp_dir / f"converted_{upload.file_id}.pdf"
+
+    def _submit(self, upload: FileMetadata) -> Future:
+        """Start converting one stored upload on the executor."""
+        # Reference data cannot be sent to worker processes; they load their own
+        context = None if self.executor.processes else self.context
+        return self.executor.submit(
+            _convert_file, context, upload.file_path, self._output_path(upload)
+        )
+
+    def _finish_one(self, future: Future, upload: FileMetadata, submitted: float) -> dict:
+        """Store a finished conversion's output and describe the outcome."""
+        output_path = self._output_path(upload)
+        try:
+            result, cache_counts = future.result()
+            converted_count, skipped_count, skipped_subjects, linearized = result
+            if self.executor.processes:
+                merge_cache_counts(cache_counts)
+            converted_metadata = self.manager.store_converted(
+                output_path.read_bytes(),
+                upload.original_name,
+                upload.file_id,
+            )
+        finally:
+            output_path.unlink(missing_ok=True)
+
+        return {
+            "file_id": converted_metadata.file_id,
+            "converted_count": converted_count,
+            "skipped_count": skipped_count,
+            "skipped_subjects": skipped_subjects,
+            "linearized": linearized,
+            "processing_time_ms": int((time.time() - submitted) * 1000),
+        }
+
+    @staticmethod
+    def _apply_outcome(result: BatchFileResult, outcome: dict) -> None:
+        """Copy a worker outcome into its manifest entry."""
+        result.status = "converted"
+        result.file_id = outcome["file_id"]
+        result.annotations_converted = outcome["converted_count"]
+        result.annotations_skipped = outcome["skipped_count"]
+        result.skipped_subjects = outcome["skipped_subjects"][:10]  # Limit to first 10
+        result.processing_time_ms = outcome["processing_time_ms"]
+        result.linearized = outcome["linearized"]
+        if result.linearized is False:
+            result.warning = LINEARIZE_UNAVAILABLE
+        result.download_url = f"/api/download/{outcome['file_id']}"
+
+    def _reserve_slot(self, name: str) -> int:
+        """Append a pending manifest entry and return its index."""
+        if len(self.results) >= self.max_files:
+            raise BatchTooLargeError(self.max_files)
+        self.results.append(BatchFileResult(source_file=name, status="pending"))
+        return len(self.results) - 1
+
+    def _fail(self, index: int, error: str) -> None:
+        """Mark a manifest entry as failed."""
+        self.results[index].status = "failed"
+        self.results[index].error = error
+        logger.warning(f"Batch {self.batch_id}: {self.results[index].source_file}: {error}")
+
+    @staticmethod
+    def _unique_name(name: str, used: set[str]) -> str:
+        """Make an archive member name unique within the ZIP."""
+        candidate = name
+        stem, suffix = Path(name).stem, Path(name).suffix
+        counter = 2
+        while candidate in used:
+            candidate = f"{stem} ({counter}){suffix}"
+            counter += 1
+        used.add(candidate)
+        return candidate
@@ -0,0 +1,171 @@
+"""
+Conversion context service.
+
+Loads the reference data a conversion needs (mapping, BTX toolchest,
+appearance data, icon renderer, layer template) once so it can be shared
+by any number of conversions, e.g. every file in a batch.
+"""
+
+import logging
+from pathlib import Path
+
+from app.config import settings
+from app.services.annotation_replacer import AnnotationReplacer
+from app.services.appearance_extractor import AppearanceExtractor
+from app.services.btx_loader import BTXReferenceLoader
+from app.services.icon_config import GEAR_ICONS_DIR
+from app.services.icon_renderer import IconRenderer
+from app.services.layer_manager import LayerManager
+from app.services.mapping_parser import MappingParser
+from app.services.output_optimizer import compact_pdf, linearize_pdf
+from app.utils.timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+
+class ConversionContext:
+    """
+    Shared, read-only reference data for PDF conversions.
+
+    AnnotationReplacer and LayerManager hold per-conversion state (ID
+    counters, OCG lookups bound to one writer), so a fresh pair is created
+    for every conversion while the loaded reference data is reused.
+    """
+
+    def __init__(
+        self,
+        mapping_parser: MappingParser,
+        btx_loader: BTXReferenceLoader,
+        appearance_extractor: AppearanceExtractor | None = None,
+        icon_renderer: IconRenderer | None = None,
+        layer_reference_pdf: Path | None = None,
+    ):
+        """
+        Initialize conversion context.
+
+        Args:
+            mapping_parser: MappingParser instance with loaded mappings
+            btx_loader: BTXReferenceLoader instance with loaded icons
+            appearance_extractor: Optional AppearanceExtractor with loaded appearances
+            icon_renderer: Optional IconRenderer for rich icon rendering
+            layer_reference_pdf: Optional reference PDF with the OCG layer template
+        """
+        self.mapping_parser = mapping_parser
+        self.btx_loader = btx_loader
+        self.appearance_extractor = appearance_extractor
+        self.icon_renderer = icon_renderer
+        self.layer_reference_pdf = layer_reference_pdf
+
+    @classmethod
+    def load(cls, timer: StageTimer | None = None) -> "ConversionContext":
+        """
+        Load all reference data from the configured settings paths.
+
+        Args:
+            timer: Optional StageTimer that receives the mapping_load,
+                btx_load, appearance_load and renderer_init stages
+
+        Returns:
+            ConversionContext ready to create replacers
+        """
+        if timer is None:
+            timer = StageTimer()
+
+        with timer.stage("mapping_load"):
+            mapping_parser = MappingParser(settings.mapping_file)
+            mapping_parser.load_mappings()
+        logger.info(f"Loaded {len(mapping_parser.mappings)} mappings")
+
+        with timer.stage("btx_load"):
+            btx_loader = BTXReferenceLoader(settings.toolchest_dir)
+            btx_loader.load_toolchest()
+        logger.info(
+            f"Loaded BTX: {btx_loader.get_bid_icon_count()} bid, "
+            f"{btx_loader.get_deployment_icon_count()} deployment icons"
+        )
+
+        appearance_extractor = None
+        if settings.deployment_map_path.exists():
+            with timer.stage("appearance_load"):
+                appearance_extractor = AppearanceExtractor()
+                appearance_extractor.load_from_pdf(settings.deployment_map_path)
+            logger.info("Loaded appearance data from DeploymentMap.pdf")
+
+        icon_renderer = None
+        if GEAR_ICONS_DIR.exists():
+            with timer.stage("renderer_init"):
+                icon_renderer = IconRenderer(GEAR_ICONS_DIR)
+            logger.info("Initialized icon renderer")
+
+        layer_reference_pdf = None
+        if settings.layer_reference_pdf.exists():
+            layer_reference_pdf = settings.layer_reference_pdf
+            logger.info("Using layer reference PDF for OCG structure")
+
+        return cls(
+            mapping_parser=mapping_parser,
+            btx_loader=btx_loader,
+            appearance_extractor=appearance_extractor,
+            icon_renderer=icon_renderer,
+            layer_reference_pdf=layer_reference_pdf,
+        )
+
+    def create_replacer(self) -> AnnotationReplacer:
+        """Create an AnnotationReplacer for a single conversion."""
+        layer_manager = None
+        if self.layer_reference_pdf is not None:
+            layer_manager = LayerManager(self.layer_reference_pdf)
+
+        return AnnotationReplacer(
+            mapping_parser=self.mapping_parser,
+            btx_loader=self.btx_loader,
+            appearance_extractor=self.appearance_extractor,
+            icon_renderer=self.icon_renderer,
+            layer_manager=layer_manager,
+        )
+
+    def convert(
+        self,
+        input_pdf: Path,
+        output_pdf: Path,
+        compact: bool | None = None,
+        linearize: bool | None = None,
+        timer: StageTimer | None = None,
+    ) -> tuple[int, int, list[str], bool | None]:
+        """
+        Convert one PDF using a fresh replacer, then run output stages.
+
+        Args:
+            input_pdf: Path to input PDF with bid annotations
+            output_pdf: Path to save converted PDF
+            compact: Rewrite output with object streams. Defaults to settings.compact_output
+            linearize: Rewrite output for fast web view. Defaults to settings.linearize_output
+            timer: Optional StageTimer that receives the replace_annotations
+                stages plus compact and linearize
+
+        Returns:
+            Tuple of (converted_count, skipped_count, skipped_subjects, linearized).
+            linearized is None if linearization was not requested and False
+            if no linearizer is available (see linearize_pdf)
+        """
+        if timer is None:
+            timer = StageTimer()
+
+        converted_count, skipped_count, skipped_subjects = (
+            self.create_replacer().replace_annotations(input_pdf, output_pdf, timer=timer)
+        )
+        linearized = None
+
+        if not output_pdf.exists():
+            return converted_count, skipped_count, skipped_subjects, linearized
+
+        if settings.compact_output if compact is None else compact:
+            with timer.stage("compact"):
+                compact_pdf(output_pdf)
+
+        # Linearize last: any later rewrite would undo the page ordering
+        if settings.linearize_output if linearize is None else linearize:
+            with timer.stage("linearize"):
+                linearized = linearize_pdf(output_pdf)
+
+        return converted_count, skipped_count, skipped_subjects, linearized
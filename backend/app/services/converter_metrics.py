@@ -0,0 +1,154 @@
+"""
+Converter service metrics.
+
+Histograms and counters recorded by the upload and convert handlers,
+plus a scrape-time collector for cache hit rates, executor load,
+admission control and temp-dir disk usage. Served by /metrics for
+capacity planning. Cache counters include the lookups made by
+conversions in CPU worker processes, which each conversion reports back.
+"""
+
+from app.services.admission import conversion_admission
+from app.services.file_manager import file_manager
+from app.utils.cache import cache_stats
+from app.utils.executors import executor_stats
+from app.utils.metrics import Counter, Histogram, MetricFamily, register_collector
+from app.utils.timing import StageTimer
+
+MB = 1024 * 1024
+
+SIZE_BUCKETS = (64 * 1024, 256 * 1024, 1 * MB, 4 * MB, 8 * MB, 16 * MB, 32 * MB, 50 * MB, 100 * MB)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+ANNOTATION_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+UPLOAD_SIZE = Histogram(
+    "converter_upload_size_bytes", "Size of uploaded PDFs.", SIZE_BUCKETS
+)
+OUTPUT_SIZE = Histogram(
+    "converter_output_size_bytes", "Size of converted PDFs.", SIZE_BUCKETS
+)
+CONVERSION_SECONDS = Histogram(
+    "converter_conversion_seconds", "End-to-end conversion latency.", LATENCY_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "converter_conversion_stage_seconds",
+    "Conversion latency by stage (render is part of annotation_rewrite).",
+    LATENCY_BUCKETS,
+    ["stage"],
+)
+ANNOTATIONS_PER_MAP = Histogram(
+    "converter_annotations_per_map",
+    "Bid annotations processed (converted plus skipped) per converted map.",
+    ANNOTATION_BUCKETS,
+)
+CONVERSIONS = Counter(
+    "converter_conversions_total", "Conversions by outcome.", ["status"]
+)
+ANNOTATIONS = Counter(
+    "converter_annotations_total",
+    "Bid annotations by result (converted or skipped).",
+    ["result"],
+)
+ICONS_RENDERED = Counter(
+    "converter_icons_rendered_total",
+    "Deployment icons rendered by mode and annotation subtype.",
+    ["mode", "subtype"],
+)
+
+
+def record_conversion(
+    seconds: float,
+    timer: StageTimer,
+    converted: int,
+    skipped: int,
+    output_bytes: int,
+) -> None:
+    """Record a successful conversion."""
+    CONVERSIONS.inc(status="success")
+    CONVERSION_SECONDS.observe(seconds)
+    for stage, stage_seconds in timer.stages.items():
+        STAGE_SECONDS.observe(stage_seconds, stage=stage)
+    ANNOTATIONS_PER_MAP.observe(converted + skipped)
+    ANNOTATIONS.inc(converted, result="converted")
+    ANNOTATIONS.inc(skipped, result="skipped")
+    for name, count in timer.counters.items():
+        mode, _, subtype = name.partition(":")
+        ICONS_RENDERED.inc(count, mode=mode, subtype=subtype)
+    OUTPUT_SIZE.observe(output_bytes)
+
+
+def _collect() -> list[MetricFamily]:
+    """Read cache, executor, admission and disk statistics at scrape time."""
+    hits = MetricFamily(
+        "converter_cache_hits_total", "counter", "Cache lookups served from the cache."
+    )
+    misses = MetricFamily("converter_cache_misses_total", "counter", "Cache lookups that missed.")
+    hit_ratio = MetricFamily("converter_cache_hit_ratio", "gauge", "Cache hit rate since start.")
+    cache_bytes = MetricFamily(
+        "converter_cache_bytes", "gauge", "Bytes held by in-memory caches."
+    )
+    for name, stats in cache_stats().items():
+        hits.add(stats["hits"], cache=name)
+        misses.add(stats["misses"], cache=name)
+        hit_ratio.add(stats["hit_rate"], cache=name)
+        if "bytes" in stats:
+            cache_bytes.add(stats["bytes"], cache=name)
+
+    in_flight = MetricFamily(
+        "converter_executor_in_flight", "gauge", "Executor tasks submitted and not finished."
+    )
+    queued = MetricFamily(
+        "converter_executor_queued", "gauge", "Executor tasks waiting for a worker."
+    )
+    tasks = MetricFamily(
+        "converter_executor_tasks_total", "counter", "Executor tasks finished, by result."
+    )
+    wait = MetricFamily(
+        "converter_executor_wait_seconds_total", "counter", "Time tasks waited for a worker."
+    )
+    for name, stats in executor_stats().items():
+        in_flight.add(stats["in_flight"], executor=name)
+        queued.add(stats["queued"], executor=name)
+        tasks.add(stats["completed"], executor=name, result="completed")
+        tasks.add(stats["failed"], executor=name, result="failed")
+        wait.add(stats["wait_seconds_total"], executor=name)
+
+    admission = conversion_admission.stats()
+    active = MetricFamily(
+        "converter_admission_active", "gauge", "Uploads and conversions running."
+    )
+    active.add(admission["active"])
+    waiting = MetricFamily(
+        "converter_admission_queued", "gauge", "Uploads and conversions waiting for capacity."
+    )
+    waiting.add(admission["queued"])
+    rejected = MetricFamily(
+        "converter_admission_rejected_total", "counter", "Jobs refused, by reason."
+    )
+    rejected.add(admission["rejected"], reason="queue_full")
+    rejected.add(admission["timed_out"], reason="timeout")
+
+    disk = MetricFamily(
+        "converter_temp_disk_bytes",
+        "gauge",
+        "Bytes of tracked files and their preview tiles in the temp dir.",
+    )
+    disk.add(file_manager.total_bytes)
+    disk_limit = MetricFamily(
+        "converter_temp_disk_limit_bytes", "gauge", "Temp dir size cap (0 = no cap)."
+    )
+    disk_limit.add(file_manager.max_disk_bytes)
+    files = MetricFamily(
+        "converter_temp_files", "gauge", "Uploads and converted files in the temp dir."
+    )
+    files.add(file_manager.file_count)
+
+    return [
+        hits, misses, hit_ratio, cache_bytes,
+        in_flight, queued, tasks, wait,
+        active, waiting, rejected,
+        disk, disk_limit, files,
+    ]
+
+
+register_collector(_collect)
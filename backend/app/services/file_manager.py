@@ -2,11 +2,19 @@
 File management service for handling PDF uploads and downloads.
 
 Manages temporary file storage with UUID-based naming and expiration tracking.
+Expiry deadlines are kept in a min-heap so the background scheduler can sleep
+until exactly the next deadline instead of scanning every tracked file.
+Data derived from a file (preview tiles) counts toward the disk cap with it
+and is deleted together with it.
 """
 
+import heapq
 import logging
+import shutil
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Callable
 from uuid import uuid4
 
 from app.config import settings
@@ -32,11 +40,15 @@ class FileMetadata:
         self.created_at = created_at
         self.file_size = file_size
         self.file_type = file_type
+        self.derived_bytes = 0  # Size of derived data in derived_dir (e.g. preview tiles)
+
+    def expires_at(self, retention_hours: int) -> datetime:
+        """Get the moment this file expires for a given retention period."""
+        return self.created_at + timedelta(hours=retention_hours)
 
     def is_expired(self, retention_hours: int) -> bool:
         """Check if file has expired based on retention period."""
-        expiry_time = self.created_at + timedelta(hours=retention_hours)
-        return datetime.now() > expiry_time
+        return datetime.now() > self.expires_at(retention_hours)
 
 
 class FileManager:
@@ -46,19 +58,33 @@ class FileManager:
     Handles:
     - Storing uploaded PDFs with UUID-based naming
     - Tracking file metadata for retrieval
-    - File expiration checking
-    - Cleanup of expired files
+    - File expiration checking via a deadline-ordered heap
+    - Batched cleanup of expired files
+    - Oldest-first eviction when total disk usage exceeds the cap, counting
+      derived data reported with add_derived_bytes()
+    - Notifying delete listeners when a file is removed
     """
 
-    def __init__(self, temp_dir: Path | None = None):
+    def __init__(self, temp_dir: Path | None = None, max_disk_mb: int | None = None):
         """
         Initialize FileManager.
 
         Args:
             temp_dir: Directory for temporary file storage. Defaults to settings.temp_dir
+            max_disk_mb: Total size cap for tracked files in MB (0 = no cap).
+                Defaults to settings.max_temp_disk_mb
         """
         self.temp_dir = temp_dir or settings.temp_dir
+        if max_disk_mb is None:
+            max_disk_mb = settings.max_temp_disk_mb
+        self.max_disk_bytes = max_disk_mb * 1024 * 1024
         self._files: dict[str, FileMetadata] = {}
+        # (deadline, file_id) min-heap. Entries for files removed by other
+        # paths (lazy expiry, eviction) are left in place and skipped on pop.
+        self._expiry_heap: list[tuple[datetime, str]] = []
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self._delete_listeners: list[Callable[[str], None]] = []
 
         # Ensure temp directory exists
         self.temp_dir.mkdir(parents=True, exist_ok=True)
@@ -90,7 +116,7 @@ class FileManager:
             file_size=len(content),
             file_type="upload",
         )
-        self._files[file_id] = metadata
+        self._track(metadata)
 
         logger.info(f"Stored upload: {file_id} -> {file_path}")
         return metadata
@@ -142,7 +168,7 @@ class FileManager:
             file_size=len(content),
             file_type="converted",
         )
-        self._files[file_id] = metadata
+        self._track(metadata)
 
         logger.info(f"Stored converted: {file_id} -> {file_path}")
         return metadata
@@ -157,21 +183,22 @@ class FileManager:
         Returns:
             FileMetadata if found and not expired, None otherwise
         """
-        metadata = self._files.get(file_id)
-        if metadata is None:
-            return None
+        with self._lock:
+            metadata = self._files.get(file_id)
+            if metadata is None:
+                return None
 
-        # Check expiration
-        if metadata.is_expired(settings.file_retention_hours):
-            self._cleanup_file(file_id)
-            return None
+            # Check expiration
+            if metadata.is_expired(settings.file_retention_hours):
+                self._cleanup_file(file_id)
+                return None
 
-        # Check file still exists
-        if not metadata.file_path.exists():
-            del self._files[file_id]
-            return None
+            # Check file still exists
+            if not metadata.file_path.exists():
+                self._cleanup_file(file_id)
+                return None
 
-        return metadata
+            return metadata
 
     def get_file_path(self, file_id: str) -> Path | None:
         """
@@ -186,36 +213,178 @@ class FileManager:
         metadata = self.get_file(file_id)
         return metadata.file_path if metadata else None
 
+    @property
+    def total_bytes(self) -> int:
+        """Total size of all tracked files and their derived data in bytes."""
+        return self._total_bytes
+
+    @property
+    def file_count(self) -> int:
+        """Number of tracked files."""
+        return len(self._files)
+
+    def _track(self, metadata: FileMetadata) -> None:
+        """Register stored file metadata and enforce the disk usage cap."""
+        deadline = metadata.expires_at(settings.file_retention_hours)
+        with self._lock:
+            self._files[metadata.file_id] = metadata
+            self._total_bytes += metadata.file_size
+            heapq.heappush(self._expiry_heap, (deadline, metadata.file_id))
+            evicted = self._evict_for_disk_cap(protect=metadata.file_id)
+        self._delete_evicted(evicted)
+
+    def add_derived_bytes(self, file_id: str, size: int) -> None:
+        """
+        Count data written to a file's derived_dir toward the disk cap.
+
+        Args:
+            file_id: UUID of the file the data was derived from
+            size: Bytes written
+        """
+        with self._lock:
+            metadata = self._files.get(file_id)
+            if metadata is None:
+                return
+            metadata.derived_bytes += size
+            self._total_bytes += size
+            evicted = self._evict_for_disk_cap(protect=file_id)
+        self._delete_evicted(evicted)
+
+    def add_delete_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Call listener(file_id) whenever a file is deleted.
+
+        Listeners may run on any thread, with the manager's lock held, so
+        they must not call back into the manager.
+        """
+        self._delete_listeners.append(listener)
+
+    def _delete_evicted(self, evicted: list[FileMetadata]) -> None:
+        """Delete files evicted for the disk cap, logging the eviction."""
+        if evicted:
+            logger.warning(
+                f"Temp disk cap reached: evicted {len(evicted)} oldest file(s) "
+                f"({self._total_bytes} bytes in use)"
+            )
+            self._delete_files(evicted)
+
+    def _forget(self, file_id: str) -> FileMetadata | None:
+        """Drop metadata for a file without touching disk. Caller holds the lock."""
+        metadata = self._files.pop(file_id, None)
+        if metadata is not None:
+            self._total_bytes -= metadata.file_size + metadata.derived_bytes
+        return metadata
+
+    def _pop_stale_heads(self) -> None:
+        """Discard heap entries whose file is no longer tracked. Caller holds the lock."""
+        while self._expiry_heap and self._expiry_heap[0][1] not in self._files:
+            heapq.heappop(self._expiry_heap)
+
+    def _evict_for_disk_cap(self, protect: str | None = None) -> list[FileMetadata]:
+        """
+        Forget oldest files until usage is within the cap. Caller holds the lock.
+
+        Retention is uniform, so heap order (earliest deadline first) is also
+        creation order. The protected file is never evicted.
+
+        Returns:
+            Metadata of evicted files (still on disk; caller deletes them)
+        """
+        if self.max_disk_bytes <= 0:
+            return []
+
+        evicted: list[FileMetadata] = []
+        protected_entries: list[tuple[datetime, str]] = []
+        while self._total_bytes > self.max_disk_bytes and self._expiry_heap:
+            entry = heapq.heappop(self._expiry_heap)
+            file_id = entry[1]
+            if file_id == protect:
+                protected_entries.append(entry)
+                continue
+            metadata = self._forget(file_id)
+            if metadata is not None:
+                evicted.append(metadata)
+
+        for entry in protected_entries:
+            heapq.heappush(self._expiry_heap, entry)
+        return evicted
+
+    def derived_dir(self, file_id: str) -> Path:
+        """
+        Directory for data derived from a stored file (e.g. preview tiles).
+
+        Not created here; it is removed together with the file.
+        """
+        return self.temp_dir / "derived" / file_id
+
+    def _delete_files(self, batch: list[FileMetadata]) -> None:
+        """Delete a batch of files and their derived data from disk, logging failures."""
+        for metadata in batch:
+            try:
+                metadata.file_path.unlink(missing_ok=True)
+                shutil.rmtree(self.derived_dir(metadata.file_id), ignore_errors=True)
+                logger.info(f"Cleaned up file: {metadata.file_id}")
+            except Exception as e:
+                logger.error(f"Error cleaning up file {metadata.file_id}: {e}")
+            for listener in self._delete_listeners:
+                try:
+                    listener(metadata.file_id)
+                except Exception as e:
+                    logger.error(f"Delete listener failed for {metadata.file_id}: {e}")
+
     def _cleanup_file(self, file_id: str) -> None:
         """Remove a file and its metadata."""
-        metadata = self._files.get(file_id)
+        with self._lock:
+            metadata = self._forget(file_id)
         if metadata:
-            try:
-                if metadata.file_path.exists():
-                    metadata.file_path.unlink()
-                logger.info(f"Cleaned up file: {file_id}")
-            except Exception as e:
-                logger.error(f"Error cleaning up file {file_id}: {e}")
-            finally:
-                del self._files[file_id]
+            self._delete_files([metadata])
 
-    def cleanup_expired(self) -> int:
+    def cleanup_expired(self, now: datetime | None = None) -> int:
         """
         Remove all expired files.
 
+        Pops due deadlines off the expiry heap, so the cost is proportional
+        to the number of expired files rather than the number tracked.
+
+        Args:
+            now: Reference time (defaults to the current time)
+
         Returns:
             Number of files cleaned up
         """
-        expired_ids = [
-            file_id
-            for file_id, metadata in self._files.items()
-            if metadata.is_expired(settings.file_retention_hours)
-        ]
+        now = now or datetime.now()
+        expired: list[FileMetadata] = []
+
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                _, file_id = heapq.heappop(self._expiry_heap)
+                metadata = self._forget(file_id)
+                if metadata is not None:
+                    expired.append(metadata)
+
+        self._delete_files(expired)
+        return len(expired)
+
+    def seconds_until_next_expiry(self, now: datetime | None = None) -> float:
+        """
+        Get the delay until the earliest tracked file expires.
 
-        for file_id in expired_ids:
-            self._cleanup_file(file_id)
+        When nothing is tracked, returns the full retention period: any file
+        stored from now on cannot expire sooner than that.
 
-        return len(expired_ids)
+        Args:
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Seconds until the next deadline (0 if one is already due)
+        """
+        now = now or datetime.now()
+        with self._lock:
+            self._pop_stale_heads()
+            if not self._expiry_heap:
+                return timedelta(hours=settings.file_retention_hours).total_seconds()
+            deadline = self._expiry_heap[0][0]
+        return max(0.0, (deadline - now).total_seconds())
 
     @staticmethod
     def _sanitize_filename(name: str) -> str:
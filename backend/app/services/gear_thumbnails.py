@@ -0,0 +1,167 @@
+"""
+Gear image thumbnail cache.
+
+Thumbnails for the tuner's image picker are rendered on first request,
+or all at once on a thread pool with warm(), and stored on disk keyed by
+the PNG's content hash and the thumbnail size. They survive restarts and
+are shared by every worker process. The content hash doubles as the
+thumbnail's HTTP ETag and cache-busting URL version.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GearImage:
+    """A gear PNG and its content hash."""
+
+    category: str
+    filename: str
+    path: str  # Relative to the gear icons directory, "/"-separated
+    digest: str  # Content hash of the PNG
+
+
+class GearThumbnailCache:
+    """
+    Disk-backed thumbnails of gear PNGs.
+
+    Usage:
+        thumbnails = GearThumbnailCache(settings.gear_icons_dir, settings.gear_thumbnail_dir)
+        images = thumbnails.images()
+        found = thumbnails.thumbnail("APs/AP - Cisco MR36H.png")  # (png_path, digest) or None
+    """
+
+    def __init__(self, gear_dir: Path, cache_dir: Path, size: int = 64):
+        """
+        Initialize cache.
+
+        Args:
+            gear_dir: Gear icons directory (one subdirectory per category)
+            cache_dir: Directory for thumbnail PNGs (created on first write)
+            size: Longest thumbnail side in pixels
+        """
+        self.gear_dir = gear_dir
+        self.cache_dir = cache_dir
+        self.size = size
+        # Source path -> ((mtime_ns, size), digest), so unchanged PNGs are hashed once
+        self._digests: dict[Path, tuple[tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def images(self) -> list[GearImage]:
+        """All gear PNGs, sorted by category and filename."""
+        images: list[GearImage] = []
+        if not self.gear_dir.exists():
+            logger.warning(f"Gear icons directory not found: {self.gear_dir}")
+            return images
+
+        for category_dir in sorted(self.gear_dir.iterdir()):
+            if not category_dir.is_dir():
+                continue
+            for png_file in sorted(category_dir.glob("*.png")):
+                try:
+                    digest = self.digest(png_file)
+                except OSError as e:
+                    logger.warning(f"Failed to read gear image {png_file}: {e}")
+                    continue
+                images.append(
+                    GearImage(
+                        category=category_dir.name,
+                        filename=png_file.name,
+                        path=f"{category_dir.name}/{png_file.name}",
+                        digest=digest,
+                    )
+                )
+        return images
+
+    def digest(self, path: Path) -> str:
+        """Content hash of a PNG (cached while its mtime and size are unchanged)."""
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._digests.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()[:32]
+        with self._lock:
+            self._digests[path] = (stamp, digest)
+        return digest
+
+    def resolve(self, image_path: str) -> Path | None:
+        """Gear PNG for a relative path, or None if missing or outside gear_dir."""
+        try:
+            resolved = (self.gear_dir / image_path).resolve()
+            resolved.relative_to(self.gear_dir.resolve())
+        except ValueError:
+            return None
+        if not resolved.is_file():
+            return None
+        return resolved
+
+    def thumbnail(self, image_path: str) -> tuple[Path, str] | None:
+        """
+        Thumbnail for a gear image, rendering it if needed.
+
+        Args:
+            image_path: Path relative to the gear icons directory
+
+        Returns:
+            (thumbnail PNG path, source digest), or None if the image does not exist
+
+        Raises:
+            OSError: If the image cannot be decoded
+        """
+        source = self.resolve(image_path)
+        if source is None:
+            return None
+        digest = self.digest(source)
+        path = self.cache_dir / f"{digest}-{self.size}.png"
+        if not path.exists():
+            self._render(source, path)
+        return path, digest
+
+    def warm(self, workers: int = 4) -> int:
+        """
+        Render every missing thumbnail on a thread pool.
+
+        Returns:
+            Number of thumbnails rendered
+        """
+        missing = [
+            image for image in self.images()
+            if not (self.cache_dir / f"{image.digest}-{self.size}.png").exists()
+        ]
+        if not missing:
+            return 0
+
+        def render(image: GearImage) -> bool:
+            try:
+                self.thumbnail(image.path)
+                return True
+            except OSError as e:
+                logger.warning(f"Failed to process gear image {image.path}: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails") as pool:
+            rendered = sum(pool.map(render, missing))
+        logger.info(f"Rendered {rendered} gear image thumbnails")
+        return rendered
+
+    def _render(self, source: Path, path: Path) -> None:
+        """Write a thumbnail atomically."""
+        with Image.open(source) as img:
+            img.thumbnail((self.size, self.size))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+            img.save(tmp_path, format="PNG")
+        tmp_path.replace(path)  # Concurrent renders of one thumbnail are harmless
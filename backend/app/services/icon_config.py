@@ -784,6 +784,20 @@ def get_icon_config(subject: str) -> dict:
     if json_config:
         return json_config
 
+    return get_python_icon_config(subject)
+
+
+def get_python_icon_config(subject: str) -> dict:
+    """
+    Get the Python-defined configuration for an icon, ignoring JSON overrides.
+
+    Args:
+        subject: Deployment subject name
+
+    Returns:
+        Category defaults with per-icon overrides, image_path and category,
+        or empty dict if subject not found in configuration.
+    """
     category = ICON_CATEGORIES.get(subject)
     if not category:
         return {}
@@ -1,40 +1,258 @@
-"""JSON file persistence for icon configuration overrides."""
+"""
+JSON file persistence for icon configuration overrides.
 
+Writes are transactional. Every load-modify-save runs under a per-file
+lock: a thread lock within the process plus an fcntl lock on a sidecar
+.lock file across processes. Each icon has a revision number in
+_meta.revisions; writers can pass the revision they read and get a
+RevisionConflictError instead of silently overwriting a concurrent edit.
+
+Reads never take the lock. The parsed file is cached per path and reused
+until the file changes on disk; since the file is only ever replaced by
+an atomic rename, a reader always sees one complete document. Returned
+configs are copies, so callers cannot modify the shared snapshot.
+
+With a flush_delay, saves are coalesced: changes are visible to readers
+in the process immediately and written to disk once per window, merged
+onto the file's current content. Other processes only see what is on
+disk, so writes with an expected revision are not coalesced: they flush
+this process's pending changes, check the revision on disk and write
+through, all under the file lock. Bulk methods (get_all_configs,
+apply_to_multiple) work on one document and save at most once.
+"""
+
+import atexit
+import copy
 import json
 import logging
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; writes are then only serialized per process
+    fcntl = None
+
 from app.services.icon_config import (
     CATEGORY_DEFAULTS,
     ICON_CATEGORIES,
-    get_icon_config,
+    get_python_icon_config,
 )
+from app.utils.cache import HitCounter
+from app.utils.errors import RevisionConflictError
 
 logger = logging.getLogger(__name__)
 
+# Reads served from the cached parsed file vs. reads that parsed it again
+snapshot_stats = HitCounter("icon_overrides")
+
+# Optional fields that may be missing from category defaults
+OPTIONAL_FIELD_DEFAULTS: dict[str, Any] = {
+    "img_x_offset": 0.0,
+    "img_y_offset": 0.0,
+    "model_text_override": None,
+    "model_uppercase": False,
+    "no_image": False,
+    "id_box_y_offset": 0.0,
+    "no_id_box": False,
+    "layer_order": ["gear_image", "brand_text", "model_text"],
+}
+
+
+def apply_optional_defaults(config: dict[str, Any]) -> dict[str, Any]:
+    """Fill in missing optional fields in place and return the config."""
+    for key, value in OPTIONAL_FIELD_DEFAULTS.items():
+        config.setdefault(key, list(value) if isinstance(value, list) else value)
+    return config
+
+
+# Pending change per subject: (config, or None for a delete; revision bumps)
+_Pending = dict[str, tuple[dict[str, Any] | None, int]]
+
+
+def _empty_document() -> dict[str, Any]:
+    return {"_meta": {"version": 1}, "icons": {}}
+
+
+def _apply_pending(data: dict[str, Any], pending: _Pending) -> dict[str, Any]:
+    """Return a new document with pending changes applied (data is not modified)."""
+    if not pending:
+        return data
+    meta = data.get("_meta", {})
+    icons = dict(data.get("icons", {}))
+    revisions = dict(meta.get("revisions", {}))
+    for subject, (config, bumps) in pending.items():
+        if config is None:
+            icons.pop(subject, None)
+        else:
+            icons[subject] = config
+        revisions[subject] = revisions.get(subject, 0) + bumps
+    return {**data, "_meta": {**meta, "revisions": revisions}, "icons": icons}
+
+
+class _FileState:
+    """State shared by every store instance for one file in this process."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.snapshot: tuple[Any, dict[str, Any]] | None = None  # (stat key, parsed file)
+        self.view: tuple[Any, _Pending, dict[str, Any]] | None = None  # Snapshot + pending
+        self.pending: _Pending = {}  # Replaced, never mutated, so readers need no lock
+        self.timer: threading.Timer | None = None
+        self.flush_at_exit = False
+
+
+_states: dict[Path, _FileState] = {}
+_states_lock = threading.Lock()
+
+
+def _state_for(path: Path) -> _FileState:
+    key = path.resolve()
+    with _states_lock:
+        state = _states.get(key)
+        if state is None:
+            state = _states[key] = _FileState()
+        return state
+
 
 class IconOverrideStore:
-    """Manages reading/writing icon overrides to a JSON file."""
+    """
+    Manages reading/writing icon overrides to a JSON file.
+
+    Usage:
+        store = IconOverrideStore(settings.icon_overrides_file, flush_delay=0.5)
+        revision = store.get_revision(subject)
+        store.set_icon(subject, config, expected_revision=revision)
+    """
 
-    def __init__(self, json_path: Path):
+    def __init__(self, json_path: Path, flush_delay: float = 0.0):
+        """
+        Initialize store.
+
+        Args:
+            json_path: Overrides JSON file
+            flush_delay: Seconds to coalesce writes before saving to disk
+                (0 = write every change immediately)
+        """
         self.json_path = json_path
+        self.flush_delay = flush_delay
+        self._state = _state_for(json_path)
 
-    def load(self) -> dict[str, Any]:
-        """Load the entire JSON file. Returns empty structure if file doesn't exist."""
+    # ─── Reading ─────────────────────────────────────────────────────
+
+    def _stat_key(self) -> tuple[int, int, int] | None:
+        try:
+            st = os.stat(self.json_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _read_file(self) -> dict[str, Any]:
+        """Parse the file. Returns empty structure if it doesn't exist."""
         if not self.json_path.exists():
-            return {"_meta": {"version": 1}, "icons": {}}
+            return _empty_document()
         try:
             with open(self.json_path) as f:
                 return json.load(f)
         except (json.JSONDecodeError, OSError) as e:
             logger.error(f"Failed to load icon overrides: {e}")
-            return {"_meta": {"version": 1}, "icons": {}}
+            return _empty_document()
 
-    def save(self, data: dict[str, Any]) -> None:
-        """Atomic write: write to temp file then rename."""
+    def _current(self) -> dict[str, Any]:
+        """Latest document (file snapshot plus pending writes); shared, do not modify."""
+        state = self._state
+        key = self._stat_key()
+        pending = state.pending
+        view = state.view
+        if view is not None and view[0] == key and view[1] is pending:
+            snapshot_stats.hit()
+            return view[2]
+
+        snapshot = state.snapshot
+        if snapshot is None or snapshot[0] != key:
+            snapshot_stats.miss()
+            snapshot = (key, self._read_file())
+            state.snapshot = snapshot
+        else:
+            snapshot_stats.hit()
+        data = _apply_pending(snapshot[1], pending)
+        state.view = (key, pending, data)
+        return data
+
+    def load(self) -> dict[str, Any]:
+        """Load the entire document (a private copy, including unflushed changes)."""
+        return copy.deepcopy(self._current())
+
+    def get_icon(self, subject: str) -> dict[str, Any] | None:
+        """Get a single icon config from JSON, or None."""
+        config = self._current().get("icons", {}).get(subject)
+        return copy.deepcopy(config) if config is not None else None
+
+    def get_revision(self, subject: str) -> int:
+        """Revision of a subject's stored config (0 if it was never saved)."""
+        return self._current().get("_meta", {}).get("revisions", {}).get(subject, 0)
+
+    def list_icons(self) -> list[str]:
+        """Return all icon subjects in JSON."""
+        return list(self._current().get("icons", {}).keys())
+
+    # ─── Writing ─────────────────────────────────────────────────────
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the thread lock and the cross-process file lock."""
+        with self._state.lock:
+            if fcntl is None:
+                yield
+                return
+            lock_path = self.json_path.with_suffix(".lock")
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _check_revision(self, subject: str, expected_revision: int | None) -> None:
+        if expected_revision is None:
+            return
+        # Check against the file, which other processes' writes go to
+        self._flush_locked()
+        actual = self.get_revision(subject)
+        if actual != expected_revision:
+            raise RevisionConflictError(subject, expected_revision, actual)
+
+    def _commit(
+        self, changes: dict[str, dict[str, Any] | None], write_through: bool = False
+    ) -> None:
+        """Queue changes (config, or None to delete) and write or schedule a flush. Caller holds the lock."""
+        state = self._state
+        pending = dict(state.pending)
+        for subject, config in changes.items():
+            bumps = pending[subject][1] if subject in pending else 0
+            pending[subject] = (config, bumps + 1)
+        state.pending = pending
+
+        if self.flush_delay <= 0 or write_through:
+            self._flush_locked()
+        elif state.timer is None:
+            state.timer = threading.Timer(self.flush_delay, self.flush)
+            state.timer.daemon = True
+            state.timer.start()
+            if not state.flush_at_exit:
+                atexit.register(self.flush)
+                state.flush_at_exit = True
+
+    def _write_file(self, data: dict[str, Any]) -> None:
+        """Atomic write: write to temp file then rename. Caller holds the lock."""
         data["_meta"] = {
+            **data.get("_meta", {}),
             "version": 1,
             "last_modified": datetime.now(timezone.utc).isoformat(),
         }
@@ -42,35 +260,115 @@ class IconOverrideStore:
         tmp_path = self.json_path.with_suffix(".tmp")
         with open(tmp_path, "w") as f:
             json.dump(data, f, indent=2)
-        tmp_path.rename(self.json_path)
+        tmp_path.replace(self.json_path)
+        self._state.snapshot = (self._stat_key(), data)
 
-    def get_icon(self, subject: str) -> dict[str, Any] | None:
-        """Get a single icon config from JSON, or None."""
-        data = self.load()
-        return data.get("icons", {}).get(subject)
-
-    def set_icon(self, subject: str, config: dict[str, Any]) -> None:
-        """Upsert a complete icon config."""
-        data = self.load()
-        if "icons" not in data:
-            data["icons"] = {}
-        data["icons"][subject] = config
-        self.save(data)
-
-    def delete_icon(self, subject: str) -> bool:
-        """Remove an icon from JSON. Returns True if it existed."""
-        data = self.load()
-        icons = data.get("icons", {})
-        if subject in icons:
-            del icons[subject]
-            self.save(data)
-            return True
-        return False
+    def _flush_locked(self) -> None:
+        state = self._state
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        if not state.pending:
+            return
+        # Merge onto the file as it is now, which may include other processes' writes
+        snapshot = state.snapshot
+        if snapshot is not None and snapshot[0] == self._stat_key():
+            base = snapshot[1]
+        else:
+            base = self._read_file()
+        data = _apply_pending(base, state.pending)
+        self._write_file(data)
+        state.pending = {}
 
-    def list_icons(self) -> list[str]:
-        """Return all icon subjects in JSON."""
-        data = self.load()
-        return list(data.get("icons", {}).keys())
+    def flush(self) -> None:
+        """Write any coalesced changes to disk now."""
+        with self._locked():
+            self._flush_locked()
+
+    def save(self, data: dict[str, Any]) -> None:
+        """Replace the whole document, bumping revisions of changed icons."""
+        with self._locked():
+            current = self._current()
+            old_icons = current.get("icons", {})
+            new_icons = data.get("icons", {})
+            revisions = dict(current.get("_meta", {}).get("revisions", {}))
+            for subject in old_icons.keys() | new_icons.keys():
+                if old_icons.get(subject) != new_icons.get(subject):
+                    revisions[subject] = revisions.get(subject, 0) + 1
+
+            if self._state.timer is not None:
+                self._state.timer.cancel()
+                self._state.timer = None
+            data["_meta"] = {**data.get("_meta", {}), "revisions": revisions}
+            self._write_file(data)
+            self._state.pending = {}
+
+    def set_icon(
+        self,
+        subject: str,
+        config: dict[str, Any],
+        expected_revision: int | None = None,
+    ) -> int:
+        """
+        Upsert a complete icon config.
+
+        Args:
+            subject: Icon subject
+            config: Complete config to store
+            expected_revision: Revision the caller's edit is based on, or
+                None to overwrite unconditionally
+
+        Returns:
+            New revision of the icon
+
+        Raises:
+            RevisionConflictError: If the icon's revision is not expected_revision
+        """
+        with self._locked():
+            self._check_revision(subject, expected_revision)
+            self._commit({subject: copy.deepcopy(config)}, expected_revision is not None)
+            return self.get_revision(subject)
+
+    def update_icon(
+        self,
+        subject: str,
+        partial: dict[str, Any],
+        expected_revision: int | None = None,
+    ) -> tuple[dict[str, Any], int]:
+        """
+        Apply partial updates to an icon's current config and save it, atomically.
+
+        Args:
+            subject: Icon subject
+            partial: Updates to apply (None values are skipped)
+            expected_revision: Revision the caller's edit is based on, or None
+
+        Returns:
+            (full config as built by build_full_config, new revision)
+
+        Raises:
+            RevisionConflictError: If the icon's revision is not expected_revision
+        """
+        with self._locked():
+            self._check_revision(subject, expected_revision)
+            full_config = self.build_full_config(subject, partial, icons=self._current().get("icons", {}))
+            save_config = {k: v for k, v in full_config.items() if k not in ("subject", "source")}
+            self._commit({subject: copy.deepcopy(save_config)}, expected_revision is not None)
+            return full_config, self.get_revision(subject)
+
+    def delete_icon(self, subject: str, expected_revision: int | None = None) -> bool:
+        """
+        Remove an icon from JSON. Returns True if it existed.
+
+        Raises:
+            RevisionConflictError: If the icon's revision is not expected_revision
+        """
+        with self._locked():
+            self._check_revision(subject, expected_revision)
+            if subject not in self._current().get("icons", {}):
+                return False
+            self._commit({subject: None}, expected_revision is not None)
+            return True
 
     def get_all_configs(self) -> list[dict[str, Any]]:
         """
@@ -78,30 +376,29 @@ class IconOverrideStore:
 
         Python-configured icons are the base. JSON overrides replace
         Python entries for the same subject. JSON-only entries are
-        included as 'custom' source.
+        included as 'custom' source. Every entry carries its revision.
         """
         result: dict[str, dict[str, Any]] = {}
+        data = self._current()
+        json_icons = data.get("icons", {})
+        revisions = data.get("_meta", {}).get("revisions", {})
 
-        # Start with all Python-configured icons
+        # Start with all Python-configured icons not overridden in JSON
         for subject in ICON_CATEGORIES:
-            config = get_icon_config(subject)
+            if subject in json_icons:
+                result[subject] = {}  # Keeps Python ordering; replaced below
+                continue
+            config = get_python_icon_config(subject)
             if config:
                 config["subject"] = subject
                 config["source"] = "python"
-                # Ensure defaults for fields that may not be in category defaults
-                config.setdefault("img_x_offset", 0.0)
-                config.setdefault("img_y_offset", 0.0)
-                config.setdefault("model_text_override", None)
-                config.setdefault("model_uppercase", False)
-                config.setdefault("no_image", False)
-                config.setdefault("id_box_y_offset", 0.0)
-                config.setdefault("no_id_box", False)
-                config.setdefault("layer_order", ["gear_image", "brand_text", "model_text"])
-                result[subject] = config
+                config["revision"] = revisions.get(subject, 0)
+                result[subject] = apply_optional_defaults(config)
 
         # Apply JSON overrides
-        data = self.load()
-        for subject, json_config in data.get("icons", {}).items():
+        for subject, stored in json_icons.items():
+            json_config = copy.deepcopy(stored)
+            json_config["revision"] = revisions.get(subject, 0)
             if subject in result:
                 # Override existing Python config
                 json_config["source"] = "json_override"
@@ -118,38 +415,52 @@ class IconOverrideStore:
     def apply_to_multiple(
         self, subjects: list[str], updates: dict[str, Any]
     ) -> int:
-        """Apply partial updates to multiple icons at once. Returns count of updated icons."""
-        data = self.load()
-        if "icons" not in data:
-            data["icons"] = {}
-
-        count = 0
-        for subject in subjects:
-            full_config = self.build_full_config(subject, updates)
-            save_config = {
-                k: v for k, v in full_config.items() if k not in ("subject", "source")
-            }
-            data["icons"][subject] = save_config
-            count += 1
-
-        if count > 0:
-            self.save(data)
-        return count
-
-    def build_full_config(self, subject: str, partial: dict[str, Any]) -> dict[str, Any]:
+        """
+        Apply partial updates to multiple icons at once.
+
+        The document is read and committed once for the whole batch, as
+        one transaction.
+
+        Returns:
+            Count of updated icons
+        """
+        with self._locked():
+            icons = self._current().get("icons", {})
+            changes: dict[str, dict[str, Any] | None] = {}
+            for subject in subjects:
+                full_config = self.build_full_config(subject, updates, icons=icons)
+                changes[subject] = {
+                    k: v for k, v in full_config.items() if k not in ("subject", "source")
+                }
+
+            if changes:
+                self._commit(changes)
+            return len(changes)
+
+    def build_full_config(
+        self,
+        subject: str,
+        partial: dict[str, Any],
+        icons: dict[str, dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
         """
         Build a complete config by merging partial updates onto the current config.
 
         Priority: JSON override (current state) > Python config > category defaults.
         Apply partial updates on top.
+
+        Args:
+            subject: Icon subject
+            partial: Updates to apply (None values are skipped)
+            icons: Already-loaded "icons" mapping, to avoid re-reading the file
         """
         # Check JSON override first - this is the current tuned state
-        existing_json = self.get_icon(subject)
+        existing_json = icons.get(subject) if icons is not None else self.get_icon(subject)
         if existing_json:
-            base = existing_json.copy()
+            base = copy.deepcopy(existing_json)
         else:
             # Fall back to Python config
-            base = get_icon_config(subject)
+            base = get_python_icon_config(subject)
             if not base:
                 # New icon - use category defaults if category provided
                 category = partial.get("category", "Misc")
@@ -158,14 +469,7 @@ class IconOverrideStore:
                 base["image_path"] = None
 
         # Set defaults for optional fields
-        base.setdefault("img_x_offset", 0.0)
-        base.setdefault("img_y_offset", 0.0)
-        base.setdefault("model_text_override", None)
-        base.setdefault("model_uppercase", False)
-        base.setdefault("no_image", False)
-        base.setdefault("id_box_y_offset", 0.0)
-        base.setdefault("no_id_box", False)
-        base.setdefault("layer_order", ["gear_image", "brand_text", "model_text"])
+        apply_optional_defaults(base)
 
         # Apply partial updates (skip None values)
         for key, value in partial.items():
@@ -0,0 +1,317 @@
+"""
+Icon preview service.
+
+Rasterizes what IconRenderer produces for a subject and candidate config
+to PNG, for the icon tuner and the tuner comparator. Previews are cached
+in memory keyed by a hash of the canonicalized config, and the same hash
+is used as the HTTP ETag.
+
+Rasterizing does not serialize a PDF: the renderer's appearance stream
+and its resources are copied object by object into an in-memory PyMuPDF
+document and drawn on a page sized to the icon. rasterize_icon_sheet
+draws many candidate configs of one subject into a single document,
+sharing their resources, for batch scoring in the tuner.
+"""
+
+import hashlib
+import io
+import json
+import logging
+from typing import Any
+
+import pymupdf
+from PIL import Image
+from pypdf import PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    PdfObject,
+    StreamObject,
+)
+
+from app.config import settings
+from app.services.icon_renderer import IconRenderer
+from app.utils.cache import ByteLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Margin around the icon rect so the ID box above and model text below fit
+PREVIEW_PADDING_X = 2.0
+PREVIEW_PADDING_Y = 6.0
+
+# Stream keys PyMuPDF rewrites when a stream body is replaced
+_STREAM_KEYS = ("/Length", "/Filter", "/DecodeParms")
+
+
+class _ObjectCopier:
+    """Copy pypdf objects into a PyMuPDF document, following references."""
+
+    def __init__(self, doc: pymupdf.Document):
+        self.doc = doc
+        self._xrefs: dict[int, int] = {}  # pypdf idnum -> PyMuPDF xref
+
+    def reference(self, ref: IndirectObject) -> str:
+        """Copy a referenced object (once) and return its PDF reference."""
+        xref = self._xrefs.get(ref.idnum)
+        if xref is None:
+            xref = self.doc.get_new_xref()
+            self._xrefs[ref.idnum] = xref
+            obj = ref.get_object()
+            if isinstance(obj, StreamObject):
+                self._copy_stream(xref, obj)
+            else:
+                self.doc.update_object(xref, self.literal(obj))
+        return f"{xref} 0 R"
+
+    def literal(self, obj: PdfObject) -> str:
+        """Serialize a direct object, copying any objects it references."""
+        if isinstance(obj, IndirectObject):
+            return self.reference(obj)
+        if isinstance(obj, DictionaryObject):
+            items = " ".join(f"{key} {self.literal(value)}" for key, value in obj.items())
+            return f"<<{items}>>"
+        if isinstance(obj, ArrayObject):
+            return "[" + " ".join(self.literal(value) for value in obj) + "]"
+        buf = io.BytesIO()
+        obj.write_to_stream(buf)
+        return buf.getvalue().decode("latin-1")
+
+    def _copy_stream(self, xref: int, stream: StreamObject) -> None:
+        items = {k: v for k, v in stream.items() if k not in _STREAM_KEYS}
+        self.doc.update_object(xref, self.literal(DictionaryObject(items)))
+        # Data is copied as-is; already-compressed image samples stay compressed
+        self.doc.update_stream(xref, stream.get_data(), new=True, compress=False)
+        for key in _STREAM_KEYS[1:]:
+            if key in stream:
+                self.doc.xref_set_key(xref, key[1:], self.literal(stream[key]))
+
+
+def _icon_rect(icon_w: float, icon_h: float) -> list[float]:
+    """Icon rect inside its padded preview cell."""
+    return [
+        PREVIEW_PADDING_X,
+        PREVIEW_PADDING_Y,
+        PREVIEW_PADDING_X + icon_w,
+        PREVIEW_PADDING_Y + icon_h,
+    ]
+
+
+def rasterize_icon(
+    renderer: IconRenderer,
+    subject: str,
+    config: dict[str, Any],
+    scale: float = 4.0,
+    id_label: str = "j100",
+    icon_size: tuple[float, float] | None = None,
+) -> Image.Image | None:
+    """
+    Render an icon with an explicit config to a PIL Image.
+
+    The icon is drawn on a page just large enough for it plus padding, so
+    the whole page is the preview.
+
+    Args:
+        renderer: IconRenderer to draw with
+        subject: Deployment subject name
+        config: Full icon configuration
+        scale: Pixels per PDF point
+        id_label: ID label text for the icon
+        icon_size: Icon (width, height) in PDF points. Defaults to the
+            renderer's canonical 25x30 pt rect
+
+    Returns:
+        RGB image of the icon, or None if the subject cannot be rendered
+    """
+    icon_w, icon_h = icon_size or (renderer.CANON_W, renderer.CANON_H)
+    rect = _icon_rect(icon_w, icon_h)
+
+    # The writer only collects objects; it is never written out
+    writer = PdfWriter()
+    appearance_ref = renderer.render_icon(writer, subject, rect, id_label=id_label, config=config)
+    if appearance_ref is None:
+        return None
+
+    with pymupdf.open() as doc:
+        page = doc.new_page(width=icon_w + 2 * PREVIEW_PADDING_X, height=icon_h + 2 * PREVIEW_PADDING_Y)
+        page_xref = page.xref
+        appearance = _ObjectCopier(doc).reference(appearance_ref)
+
+        # The appearance BBox starts at 0,0, so placing it at the rect origin
+        # matches how a viewer draws it for an annotation with this rect
+        contents_xref = doc.get_new_xref()
+        doc.update_object(contents_xref, "<<>>")
+        doc.update_stream(
+            contents_xref, f"q 1 0 0 1 {rect[0]} {rect[1]} cm /Icon Do Q".encode(), new=True
+        )
+        doc.xref_set_key(page_xref, "Resources", f"<</XObject <</Icon {appearance}>>>>")
+        doc.xref_set_key(page_xref, "Contents", f"{contents_xref} 0 R")
+
+        pix = doc[0].get_pixmap(matrix=pymupdf.Matrix(scale, scale), alpha=False)
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+def rasterize_icon_sheet(
+    renderer: IconRenderer,
+    subject: str,
+    configs: list[dict[str, Any]],
+    scale: float = 4.0,
+    id_label: str = "j100",
+    icon_size: tuple[float, float] | None = None,
+) -> list[Image.Image | None]:
+    """
+    Render many configs of one icon as a sheet: one document, a page each.
+
+    Every page is built exactly like a rasterize_icon page, so each image
+    is pixel-identical to rasterizing that config on its own. Shared
+    resources (fonts, the gear image) and the page content stream are
+    embedded once for the whole sheet.
+
+    Args:
+        renderer: IconRenderer to draw with
+        subject: Deployment subject name
+        configs: Full icon configurations, one per page
+        scale: Pixels per PDF point
+        id_label: ID label text for every icon
+        icon_size: Icon (width, height) in PDF points. Defaults to the
+            renderer's canonical 25x30 pt rect
+
+    Returns:
+        RGB image per config, in order; None where the subject cannot be rendered
+    """
+    if not configs:
+        return []
+
+    icon_w, icon_h = icon_size or (renderer.CANON_W, renderer.CANON_H)
+    rect = _icon_rect(icon_w, icon_h)
+
+    writer = PdfWriter()
+    refs = [
+        renderer.render_icon(writer, subject, rect, id_label=id_label, config=config)
+        for config in configs
+    ]
+    if all(ref is None for ref in refs):
+        return [None] * len(configs)
+
+    images: list[Image.Image | None] = []
+    with pymupdf.open() as doc:
+        copier = _ObjectCopier(doc)
+        # Cells differ only in which appearance /Icon names
+        contents_xref = doc.get_new_xref()
+        doc.update_object(contents_xref, "<<>>")
+        doc.update_stream(
+            contents_xref, f"q 1 0 0 1 {rect[0]} {rect[1]} cm /Icon Do Q".encode(), new=True
+        )
+        matrix = pymupdf.Matrix(scale, scale)
+
+        for ref in refs:
+            if ref is None:
+                images.append(None)
+                continue
+            # A shared page would put cells far from the origin, where
+            # MuPDF's float32 coordinates round half-pixel edges differently
+            page = doc.new_page(width=icon_w + 2 * PREVIEW_PADDING_X, height=icon_h + 2 * PREVIEW_PADDING_Y)
+            doc.xref_set_key(page.xref, "Resources", f"<</XObject <</Icon {copier.reference(ref)}>>>>")
+            doc.xref_set_key(page.xref, "Contents", f"{contents_xref} 0 R")
+            pix = page.get_pixmap(matrix=matrix, alpha=False)
+            images.append(Image.frombytes("RGB", (pix.width, pix.height), pix.samples))
+    return images
+
+
+class IconPreviewService:
+    """
+    Cached PNG previews of tuner icon configs.
+
+    Usage:
+        service = IconPreviewService(IconRenderer(settings.gear_icons_dir))
+        etag = service.etag(subject, config, scale, id_label)
+        png = service.render_png(subject, config, scale, id_label)
+    """
+
+    def __init__(self, renderer: IconRenderer, cache: ByteLRUCache | None = None):
+        """
+        Initialize preview service.
+
+        Args:
+            renderer: IconRenderer used for previews
+            cache: PNG cache. Defaults to a registered "icon_previews" cache
+                sized by settings.preview_cache_mb
+        """
+        self.renderer = renderer
+        self.cache = cache if cache is not None else ByteLRUCache(
+            "icon_previews", settings.preview_cache_mb * 1024 * 1024
+        )
+
+    def etag(
+        self,
+        subject: str,
+        config: dict[str, Any],
+        scale: float,
+        id_label: str,
+    ) -> str:
+        """
+        Hash everything that determines the preview pixels.
+
+        The config is canonicalized (sorted keys, tuples as lists) so equal
+        configs hash equally regardless of how they were built. The gear
+        image's modification time is included so replaced PNGs invalidate.
+        """
+        image_mtime = 0
+        image_path = config.get("image_path")
+        if image_path:
+            try:
+                image_mtime = (self.renderer.gear_icons_dir / image_path).stat().st_mtime_ns
+            except OSError:
+                pass
+
+        canonical = json.dumps(
+            {
+                "subject": subject,
+                "config": config,
+                "scale": round(scale, 4),
+                "id_label": id_label,
+                "image_mtime": image_mtime,
+                "max_image_dpi": self.renderer.max_image_dpi,
+                "image_alpha_mode": self.renderer.image_alpha_mode,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return '"' + hashlib.sha256(canonical.encode()).hexdigest()[:32] + '"'
+
+    def render_png(
+        self,
+        subject: str,
+        config: dict[str, Any],
+        scale: float,
+        id_label: str,
+        etag: str | None = None,
+    ) -> bytes | None:
+        """
+        Render (or fetch from cache) a PNG preview.
+
+        Args:
+            subject: Deployment subject name
+            config: Full icon configuration
+            scale: Pixels per PDF point
+            id_label: ID label text
+            etag: Precomputed etag, if the caller already has it
+
+        Returns:
+            PNG bytes, or None if the subject cannot be rendered
+        """
+        key = etag or self.etag(subject, config, scale, id_label)
+        png = self.cache.get(key)
+        if png is not None:
+            return png
+
+        img = rasterize_icon(self.renderer, subject, config, scale, id_label)
+        if img is None:
+            return None
+
+        buf = io.BytesIO()
+        img.save(buf, format="PNG", compress_level=1)  # Speed over size for previews
+        png = buf.getvalue()
+        self.cache.put(key, png, len(png))
+        return png
@@ -14,6 +14,8 @@ Supports two rendering modes:
 """
 
 import logging
+import threading
+import weakref
 import zlib
 from pathlib import Path
 from typing import Any
@@ -30,7 +32,16 @@ from pypdf.generic import (
     StreamObject,
 )
 
+from app.config import settings
 from app.services.icon_config import get_icon_config, get_model_text
+from app.services.image_pipeline import (
+    PreparedImage,
+    PreparedImageCache,
+    flatten_image,
+    prepare_image,
+    target_pixels,
+)
+from app.utils.cache import ByteLRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -60,21 +71,58 @@ def measure_text_width(text: str, font_size: float) -> float:
     return width_units * font_size / 1000
 
 
+IMAGE_ALPHA_MODES = ("smask", "flatten")
+
+# Process-wide image cache shared by every renderer (and so by every
+# conversion) in this process; bounded by decoded/compressed byte size
+shared_image_cache = ByteLRUCache("icon_images", settings.icon_image_cache_mb * 1024 * 1024)
+
+
 class IconRenderer:
     """Service for rendering deployment icons as PDF appearance streams."""
 
     # Bezier magic constant for circle approximation
     BEZIER_K = 0.5522847498
 
-    def __init__(self, gear_icons_dir: Path):
+    def __init__(
+        self,
+        gear_icons_dir: Path,
+        max_image_dpi: int | None = None,
+        image_alpha_mode: str | None = None,
+        image_cache_dir: Path | None = None,
+        image_cache: ByteLRUCache | None = None,
+    ):
         """
         Initialize icon renderer.
 
         Args:
             gear_icons_dir: Path to gear icons directory (samples/icons/gearIcons)
+            max_image_dpi: Maximum effective DPI of embedded gear images
+                (0 = native resolution). Defaults to settings.gear_image_max_dpi
+            image_alpha_mode: "smask" keeps transparency as a /SMask so one image
+                serves every circle color; "flatten" bakes the circle color in.
+                Defaults to settings.gear_image_alpha_mode
+            image_cache_dir: On-disk cache for prepared image payloads.
+                Defaults to settings.image_cache_dir (None there disables it)
+            image_cache: In-memory cache for loaded and prepared images.
+                Defaults to the process-wide icon_images cache
         """
         self.gear_icons_dir = gear_icons_dir
-        self._image_cache: dict[str, tuple[bytes, int, int]] = {}
+        self.max_image_dpi = (
+            settings.gear_image_max_dpi if max_image_dpi is None else max_image_dpi
+        )
+        self.image_alpha_mode = image_alpha_mode or settings.gear_image_alpha_mode
+        if self.image_alpha_mode not in IMAGE_ALPHA_MODES:
+            raise ValueError(f"Unknown image alpha mode: {self.image_alpha_mode}")
+        self._image_cache = image_cache if image_cache is not None else shared_image_cache
+        cache_dir = image_cache_dir or settings.image_cache_dir
+        self._disk_cache = PreparedImageCache(cache_dir) if cache_dir else None
+        # Image XObjects already added to each writer, so repeated icons
+        # share one image object per PDF
+        self._embedded: weakref.WeakKeyDictionary[
+            PdfWriter, dict[PreparedImage, IndirectObject]
+        ] = weakref.WeakKeyDictionary()
+        self._embedded_lock = threading.Lock()
 
     def can_render(self, subject: str) -> bool:
         """
@@ -116,9 +164,10 @@ class IconRenderer:
         Returns:
             Tuple of (raw_rgb_bytes, width, height)
         """
-        cache_key = f"{image_path}:{bg_color}"
-        if cache_key in self._image_cache:
-            return self._image_cache[cache_key]
+        cache_key = f"raw:{self.gear_icons_dir / image_path}:{bg_color}"
+        cached = self._image_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         full_path = self.gear_icons_dir / image_path
 
@@ -130,21 +179,11 @@ class IconRenderer:
         )
 
         with Image.open(full_path) as img:
-            if img.mode in ("RGBA", "P"):
-                background = Image.new("RGB", img.size, bg_rgb)
-                if img.mode == "RGBA":
-                    background.paste(img, mask=img.split()[3])
-                else:
-                    img = img.convert("RGBA")
-                    background.paste(img, mask=img.split()[3])
-                img = background
-            elif img.mode != "RGB":
-                img = img.convert("RGB")
-
+            img = flatten_image(img, bg_rgb)
             width, height = img.size
             raw_data = img.tobytes()
 
-        self._image_cache[cache_key] = (raw_data, width, height)
+        self._image_cache.put(cache_key, (raw_data, width, height), len(raw_data))
         return raw_data, width, height
 
     def create_image_xobject(
@@ -166,17 +205,131 @@ class IconRenderer:
         Returns:
             IndirectObject reference to the image XObject
         """
-        compressed = zlib.compress(image_data)
+        return self._add_image_stream(writer, zlib.compress(image_data), width, height)
+
+    def prepare_image(
+        self,
+        image_path: str,
+        bg_color: tuple[float, float, float],
+        extent_pt: float,
+    ) -> PreparedImage:
+        """
+        Load a gear image resampled and pre-deflated for its drawn size.
+
+        In "smask" mode the background color is not applied, so every
+        subject and circle color using the same PNG shares one entry.
+        Misses in memory fall back to the on-disk cache before decoding.
+
+        Args:
+            image_path: Relative path from gear_icons_dir
+            bg_color: RGB background color (0-1 range), used in "flatten" mode
+            extent_pt: Longest drawn side of the image in PDF points
+
+        Returns:
+            PreparedImage (cached per path, background and target size)
+        """
+        max_side = target_pixels(extent_pt, self.max_image_dpi) if self.max_image_dpi else 0
+        background = None if self.image_alpha_mode == "smask" else bg_color
+        cache_key = (
+            f"prepared:{self.gear_icons_dir / image_path}:{background or 'alpha'}:{max_side}"
+        )
+        cached = self._image_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        full_path = self.gear_icons_dir / image_path
+        disk_key = None
+        prepared = None
+        if self._disk_cache:
+            disk_key = self._disk_cache.key(full_path.read_bytes(), background, max_side)
+            prepared = self._disk_cache.get(disk_key)
+
+        if prepared is None:
+            prepared = prepare_image(full_path, background, extent_pt, self.max_image_dpi)
+            if disk_key:
+                self._disk_cache.put(disk_key, prepared)
+
+        self._image_cache.put(
+            cache_key, prepared, len(prepared.data) + len(prepared.smask or b"")
+        )
+        return prepared
 
+    def embed_prepared_image(
+        self,
+        writer: PdfWriter,
+        prepared: PreparedImage,
+    ) -> IndirectObject:
+        """
+        Create PDF XObject Image from a prepared image without recompressing.
+
+        Each prepared image is added to a writer once; later calls for the
+        same writer return the existing reference.
+
+        Args:
+            writer: PdfWriter to add the object to
+            prepared: PreparedImage from prepare_image
+
+        Returns:
+            IndirectObject reference to the image XObject
+        """
+        with self._embedded_lock:
+            embedded = self._embedded.setdefault(writer, {})
+            ref = embedded.get(prepared)
+        if ref is not None:
+            return ref
+
+        smask_ref = None
+        if prepared.smask is not None:
+            smask_ref = self._add_image_stream(
+                writer, prepared.smask, prepared.width, prepared.height,
+                color_space="/DeviceGray",
+            )
+        ref = self._add_image_stream(
+            writer, prepared.data, prepared.width, prepared.height, smask_ref=smask_ref
+        )
+
+        with self._embedded_lock:
+            embedded[prepared] = ref
+        return ref
+
+    def image_extent_pt(self, config: dict[str, Any], render_scale: float) -> float:
+        """
+        Upper bound of an icon image's longest drawn side in PDF points.
+
+        The image is fitted to radius * img_scale_ratio in the canonical
+        25x30 space, and the radius never exceeds CANON_W / 2.
+
+        Args:
+            config: Icon configuration dictionary
+            render_scale: Canonical-to-page scale factor
+
+        Returns:
+            Longest drawn image side in points
+        """
+        img_scale_ratio = config.get("img_scale_ratio", 0.70)
+        return (self.CANON_W / 2) * img_scale_ratio * render_scale
+
+    def _add_image_stream(
+        self,
+        writer: PdfWriter,
+        compressed: bytes,
+        width: int,
+        height: int,
+        color_space: str = "/DeviceRGB",
+        smask_ref: IndirectObject | None = None,
+    ) -> IndirectObject:
+        """Add a Flate-compressed 8-bit image XObject to the writer."""
         img_dict = DictionaryObject()
         img_dict[NameObject("/Type")] = NameObject("/XObject")
         img_dict[NameObject("/Subtype")] = NameObject("/Image")
         img_dict[NameObject("/Width")] = NumberObject(width)
         img_dict[NameObject("/Height")] = NumberObject(height)
-        img_dict[NameObject("/ColorSpace")] = NameObject("/DeviceRGB")
+        img_dict[NameObject("/ColorSpace")] = NameObject(color_space)
         img_dict[NameObject("/BitsPerComponent")] = NumberObject(8)
         img_dict[NameObject("/Filter")] = NameObject("/FlateDecode")
         img_dict[NameObject("/Length")] = NumberObject(len(compressed))
+        if smask_ref is not None:
+            img_dict[NameObject("/SMask")] = smask_ref
 
         img_stream = StreamObject()
         img_stream.update(img_dict)
@@ -190,6 +343,7 @@ class IconRenderer:
         subject: str,
         rect: list[float],
         id_label: str = "j100",
+        config: dict[str, Any] | None = None,
     ) -> IndirectObject | None:
         """
         Render a deployment icon and return its appearance stream.
@@ -199,11 +353,13 @@ class IconRenderer:
             subject: Deployment subject (e.g., "AP - Cisco MR36H")
             rect: Annotation rect [x1, y1, x2, y2]
             id_label: ID label for top box (e.g., "j100")
+            config: Icon configuration to render with. Defaults to get_icon_config(subject)
 
         Returns:
             IndirectObject reference to appearance stream, or None if can't render
         """
-        config = get_icon_config(subject)
+        if config is None:
+            config = get_icon_config(subject)
         if not config:
             logger.warning(f"No config found for subject: {subject}")
             return None
@@ -218,12 +374,18 @@ class IconRenderer:
             logger.warning(f"Image not found: {full_image_path}")
             return None
 
-        # Load image
+        # Load image, resampled for the drawn size
         circle_color = config.get("circle_color", (0.5, 0.5, 0.5))
-        img_data, img_width, img_height = self.load_image(image_path, circle_color)
+        render_scale = min(
+            (rect[2] - rect[0]) / self.CANON_W, (rect[3] - rect[1]) / self.CANON_H
+        )
+        prepared = self.prepare_image(
+            image_path, circle_color, self.image_extent_pt(config, render_scale)
+        )
+        img_width, img_height = prepared.width, prepared.height
 
         # Create image XObject
-        img_xobject_ref = self.create_image_xobject(writer, img_data, img_width, img_height)
+        img_xobject_ref = self.embed_prepared_image(writer, prepared)
 
         # Build appearance stream
         # Check for model text override, otherwise use extracted model
@@ -586,6 +748,7 @@ class IconRenderer:
         subject: str,
         center: tuple[float, float],
         id_label: str = "j100",
+        config: dict[str, Any] | None = None,
     ) -> list[dict] | None:
         """
         Render a deployment icon as compound annotation components.
@@ -598,12 +761,14 @@ class IconRenderer:
             subject: Deployment subject (e.g., "AP - Cisco MR36H")
             center: (cx, cy) center position in page coordinates
             id_label: ID label for top box (e.g., "j100")
+            config: Icon configuration to render with. Defaults to get_icon_config(subject)
 
         Returns:
             List of component dicts (3-7 items) or None if no config.
             Each dict has: role, subtype, rect, ap_ref, extra_props.
         """
-        config = get_icon_config(subject)
+        if config is None:
+            config = get_icon_config(subject)
         if not config:
             return None
 
@@ -619,12 +784,13 @@ class IconRenderer:
             full_path = self.gear_icons_dir / image_path
             if full_path.exists():
                 circle_color = config.get("circle_color", (0.5, 0.5, 0.5))
-                img_data, img_width, img_height = self.load_image(
-                    image_path, circle_color
-                )
-                image_xobj_ref = self.create_image_xobject(
-                    writer, img_data, img_width, img_height
+                prepared = self.prepare_image(
+                    image_path,
+                    circle_color,
+                    self.image_extent_pt(config, self.COMPOUND_RENDER_SCALE),
                 )
+                img_width, img_height = prepared.width, prepared.height
+                image_xobj_ref = self.embed_prepared_image(writer, prepared)
                 has_image = True
 
         # Get text values
@@ -0,0 +1,287 @@
+"""
+Gear image preprocessing pipeline.
+
+Prepares gear PNGs for embedding as PDF image XObjects: resamples to the
+resolution actually needed for the on-map icon size, either flattens
+transparency onto the icon's circle color or splits it into a separate
+alpha channel (/SMask), and deflates the samples once so every embedding
+reuses the compressed bytes.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+POINTS_PER_INCH = 72.0
+DEFLATE_LEVEL = 9  # Paid once per prepared image, so favour size
+
+# Bump when prepare_image output changes so stale disk entries are ignored
+PIPELINE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """Resampled, Flate-compressed RGB image with optional alpha channel."""
+
+    data: bytes  # FlateDecode-compressed 8-bit RGB samples
+    width: int
+    height: int
+    source_width: int
+    source_height: int
+    smask: bytes | None = None  # FlateDecode-compressed 8-bit alpha, if not opaque
+
+    @property
+    def resampled(self) -> bool:
+        """True if the image was downsampled from its source resolution."""
+        return (self.width, self.height) != (self.source_width, self.source_height)
+
+
+def target_pixels(extent_pt: float, max_dpi: int) -> int:
+    """
+    Pixels needed along an image's longest side.
+
+    Args:
+        extent_pt: Longest drawn side of the image in PDF points
+        max_dpi: Maximum effective resolution in dots per inch
+
+    Returns:
+        Pixel count, at least 1
+    """
+    return max(1, math.ceil(extent_pt / POINTS_PER_INCH * max_dpi))
+
+
+def flatten_image(img: Image.Image, bg_rgb: tuple[int, int, int]) -> Image.Image:
+    """
+    Flatten an image onto a solid background and convert to RGB.
+
+    Args:
+        img: Source image in any PIL mode
+        bg_rgb: Background color (0-255) for transparent areas
+
+    Returns:
+        RGB image
+    """
+    if img.mode in ("RGBA", "P"):
+        background = Image.new("RGB", img.size, bg_rgb)
+        if img.mode != "RGBA":
+            img = img.convert("RGBA")
+        background.paste(img, mask=img.split()[3])
+        return background
+    if img.mode != "RGB":
+        return img.convert("RGB")
+    return img
+
+
+def split_alpha(img: Image.Image) -> tuple[Image.Image, Image.Image | None]:
+    """
+    Split an image into RGB color and an 8-bit alpha channel.
+
+    Args:
+        img: Source image in any PIL mode
+
+    Returns:
+        Tuple of (rgb_image, alpha_image). Alpha is None for fully opaque images.
+    """
+    if img.mode == "P" or img.mode in ("LA", "PA"):
+        img = img.convert("RGBA")
+    if img.mode != "RGBA":
+        return img.convert("RGB") if img.mode != "RGB" else img, None
+
+    alpha = img.getchannel("A")
+    if alpha.getextrema() == (255, 255):
+        alpha = None
+    return img.convert("RGB"), alpha
+
+
+def prepare_image(
+    path: Path,
+    bg_color: tuple[float, float, float] | None,
+    extent_pt: float,
+    max_dpi: int,
+) -> PreparedImage:
+    """
+    Prepare a gear image for embedding.
+
+    Downsamples (never upsamples) so the longest side is no more than
+    max_dpi at the drawn size, preserving aspect ratio so icon layout
+    math is unchanged.
+
+    Args:
+        path: PNG file path
+        bg_color: RGB background color (0-1 range) to flatten transparency
+            onto, or None to keep transparency as a separate alpha channel
+        extent_pt: Longest drawn side of the image in PDF points
+        max_dpi: Maximum effective resolution (0 = keep native resolution)
+
+    Returns:
+        PreparedImage with compressed samples
+    """
+    with Image.open(path) as img:
+        source_width, source_height = img.size
+        # Resample before flattening so the alpha edge is filtered too
+        if max_dpi > 0:
+            limit = target_pixels(extent_pt, max_dpi)
+            if max(img.size) > limit:
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA")
+                img = img.copy()
+                img.thumbnail((limit, limit), Image.Resampling.LANCZOS)
+        width, height = img.size
+
+        smask = None
+        if bg_color is None:
+            img, alpha = split_alpha(img)
+            if alpha is not None:
+                smask = zlib.compress(alpha.tobytes(), DEFLATE_LEVEL)
+        else:
+            bg_rgb = (
+                int(bg_color[0] * 255),
+                int(bg_color[1] * 255),
+                int(bg_color[2] * 255),
+            )
+            img = flatten_image(img, bg_rgb)
+
+        data = zlib.compress(img.tobytes(), DEFLATE_LEVEL)
+
+    return PreparedImage(
+        data=data,
+        width=width,
+        height=height,
+        source_width=source_width,
+        source_height=source_height,
+        smask=smask,
+    )
+
+
+class PreparedImageCache:
+    """
+    On-disk cache of prepared image stream payloads.
+
+    Entries are keyed by the PNG's content hash plus the preprocessing
+    parameters, so any process can embed an image without decoding or
+    compressing it. Each entry is one file: a JSON header line (dimensions,
+    filter, color space, payload lengths) followed by the image payload
+    and the optional SMask payload.
+    """
+
+    FILTER = "/FlateDecode"
+    COLOR_SPACE = "/DeviceRGB"
+    BITS_PER_COMPONENT = 8
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Directory for cache entries (created on first write)
+        """
+        self.cache_dir = cache_dir
+
+    def key(
+        self,
+        png_bytes: bytes,
+        bg_color: tuple[float, float, float] | None,
+        max_side: int,
+    ) -> str:
+        """
+        Build the cache key for a PNG and its preprocessing parameters.
+
+        Args:
+            png_bytes: Source PNG file content
+            bg_color: Flatten background, or None for alpha-preserving images
+            max_side: Target longest side in pixels (0 = native resolution)
+
+        Returns:
+            Hex digest identifying the prepared payload
+        """
+        params = f"v{PIPELINE_VERSION}:{bg_color or 'alpha'}:{max_side}:{DEFLATE_LEVEL}"
+        digest = hashlib.sha256(png_bytes)
+        digest.update(params.encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> PreparedImage | None:
+        """
+        Load a cached payload.
+
+        Returns:
+            PreparedImage, or None on a miss or unreadable entry
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                payload = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring corrupt image cache entry {path.name}: {e}")
+            return None
+
+        if (
+            header.get("filter") != self.FILTER
+            or header.get("color_space") != self.COLOR_SPACE
+            or header.get("bits_per_component") != self.BITS_PER_COMPONENT
+            or len(payload) != header["data_length"] + header["smask_length"]
+        ):
+            return None
+
+        data_length = header["data_length"]
+        return PreparedImage(
+            data=payload[:data_length],
+            width=header["width"],
+            height=header["height"],
+            source_width=header["source_width"],
+            source_height=header["source_height"],
+            smask=payload[data_length:] if header["smask_length"] else None,
+        )
+
+    def put(self, key: str, prepared: PreparedImage) -> None:
+        """
+        Store a payload atomically.
+
+        Write failures are logged and ignored; the cache is an optimization.
+        """
+        header = {
+            k: v for k, v in asdict(prepared).items() if k not in ("data", "smask")
+        }
+        header.update(
+            filter=self.FILTER,
+            color_space=self.COLOR_SPACE,
+            bits_per_component=self.BITS_PER_COMPONENT,
+            data_length=len(prepared.data),
+            smask_length=len(prepared.smask or b""),
+        )
+
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(json.dumps(header).encode() + b"\n")
+                f.write(prepared.data)
+                f.write(prepared.smask or b"")
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write image cache entry {path.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def clear(self) -> int:
+        """Delete all cache entries and return how many were removed."""
+        removed = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.bin"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.bin"
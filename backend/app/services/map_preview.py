@@ -0,0 +1,190 @@
+"""
+Map preview service.
+
+Rasterizes a converted PDF into a deep-zoom tile pyramid for in-browser
+preview. Tiles are rendered lazily with PyMuPDF on first request and
+cached on disk in the FileManager's derived directory for the file, so
+they are deleted when the file expires. The bytes written are reported
+through on_write so they count toward the temp disk cap. A single low-resolution overview
+image per page is available for the first paint.
+
+Levels follow the usual deep-zoom layout: level 0 fits the whole page in
+one tile, and each level doubles the resolution up to max_zoom pixels
+per PDF point.
+"""
+
+import logging
+import math
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+import pymupdf
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PyramidLevel:
+    """Geometry of one pyramid level for a page."""
+
+    level: int
+    scale: float  # Pixels per PDF point
+    width: int
+    height: int
+    columns: int
+    rows: int
+
+
+class TilePyramid:
+    """
+    Lazily rendered tile pyramid for one PDF.
+
+    Usage:
+        pyramid = TilePyramid(
+            pdf_path,
+            file_manager.derived_dir(file_id) / "tiles",
+            on_write=partial(file_manager.add_derived_bytes, file_id),
+        )
+        info = pyramid.describe()
+        png_path = pyramid.tile(page=0, level=3, x=1, y=2)
+    """
+
+    def __init__(
+        self,
+        pdf_path: Path,
+        cache_dir: Path,
+        tile_size: int | None = None,
+        max_zoom: float | None = None,
+        overview_size: int | None = None,
+        on_write: Callable[[int], None] | None = None,
+    ):
+        """
+        Initialize tile pyramid.
+
+        Args:
+            pdf_path: PDF to render
+            cache_dir: Directory for cached tiles and overviews
+            tile_size: Tile edge in pixels. Defaults to settings.preview_tile_size
+            max_zoom: Pixels per PDF point at the deepest level.
+                Defaults to settings.preview_max_zoom
+            overview_size: Longest side of overview images in pixels.
+                Defaults to settings.preview_overview_size
+            on_write: Called with the size of every newly cached image
+        """
+        self.pdf_path = pdf_path
+        self.cache_dir = cache_dir
+        self.tile_size = tile_size or settings.preview_tile_size
+        self.max_zoom = max_zoom or settings.preview_max_zoom
+        self.overview_size = overview_size or settings.preview_overview_size
+        self.on_write = on_write
+        self._page_sizes: list[tuple[float, float]] | None = None
+
+    @property
+    def page_sizes(self) -> list[tuple[float, float]]:
+        """(width, height) in PDF points for every page."""
+        if self._page_sizes is None:
+            with pymupdf.open(self.pdf_path) as doc:
+                self._page_sizes = [(page.rect.width, page.rect.height) for page in doc]
+        return self._page_sizes
+
+    def max_level(self, page: int) -> int:
+        """Deepest level index for a page."""
+        width, height = self.page_sizes[page]
+        full_px = max(width, height) * self.max_zoom
+        return max(0, math.ceil(math.log2(full_px / self.tile_size)))
+
+    def level_info(self, page: int, level: int) -> PyramidLevel:
+        """
+        Geometry of a pyramid level.
+
+        Raises:
+            IndexError: If page or level is out of range
+        """
+        if not 0 <= page < len(self.page_sizes):
+            raise IndexError(f"Page {page} out of range")
+        max_level = self.max_level(page)
+        if not 0 <= level <= max_level:
+            raise IndexError(f"Level {level} out of range (0-{max_level})")
+
+        width, height = self.page_sizes[page]
+        scale = self.max_zoom / (2 ** (max_level - level))
+        px_w = max(1, math.ceil(width * scale))
+        px_h = max(1, math.ceil(height * scale))
+        return PyramidLevel(
+            level=level,
+            scale=scale,
+            width=px_w,
+            height=px_h,
+            columns=math.ceil(px_w / self.tile_size),
+            rows=math.ceil(px_h / self.tile_size),
+        )
+
+    def describe(self) -> dict:
+        """Pyramid metadata for all pages (JSON-serializable)."""
+        pages = []
+        for index, (width, height) in enumerate(self.page_sizes):
+            levels = [
+                asdict(self.level_info(index, level))
+                for level in range(self.max_level(index) + 1)
+            ]
+            pages.append({"page": index, "width_pt": width, "height_pt": height, "levels": levels})
+        return {"tile_size": self.tile_size, "page_count": len(pages), "pages": pages}
+
+    def overview(self, page: int = 0) -> Path:
+        """
+        Path to the page's overview image, rendering it if needed.
+
+        Raises:
+            IndexError: If page is out of range
+        """
+        if not 0 <= page < len(self.page_sizes):
+            raise IndexError(f"Page {page} out of range")
+
+        path = self.cache_dir / str(page) / "overview.png"
+        if not path.exists():
+            width, height = self.page_sizes[page]
+            scale = min(self.overview_size / max(width, height), self.max_zoom)
+            self._render(page, scale, None, path)
+        return path
+
+    def tile(self, page: int, level: int, x: int, y: int) -> Path:
+        """
+        Path to a tile image, rendering it if needed.
+
+        Raises:
+            IndexError: If page, level or tile coordinates are out of range
+        """
+        info = self.level_info(page, level)
+        if not (0 <= x < info.columns and 0 <= y < info.rows):
+            raise IndexError(f"Tile {x},{y} out of range at level {level}")
+
+        path = self.cache_dir / str(page) / str(level) / f"{x}_{y}.png"
+        if not path.exists():
+            step = self.tile_size / info.scale  # Tile edge in PDF points
+            clip = pymupdf.Rect(x * step, y * step, (x + 1) * step, (y + 1) * step)
+            self._render(page, info.scale, clip, path)
+        return path
+
+    def _render(self, page: int, scale: float, clip: pymupdf.Rect | None, path: Path) -> None:
+        """Render a page region and write it atomically as PNG."""
+        with pymupdf.open(self.pdf_path) as doc:
+            pdf_page = doc[page]
+            if clip is not None:
+                clip = clip & pdf_page.rect
+            pix = pdf_page.get_pixmap(
+                matrix=pymupdf.Matrix(scale, scale), clip=clip, alpha=False
+            )
+            data = pix.tobytes("png")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        replaced = path.exists()
+        tmp_path.replace(path)  # Concurrent renders of one tile are harmless
+        if self.on_write is not None and not replaced:
+            self.on_write(len(data))
@@ -0,0 +1,116 @@
+"""
+Output optimizer service.
+
+Post-processing stages applied to a converted PDF after
+AnnotationReplacer has written it. pypdf writes every object as a
+top-level uncompressed object with a classic xref table; these stages
+rewrite the file into a smaller or progressively loadable form.
+
+Linearization uses pikepdf (optional, ``pip install '.[linearize]'``).
+Without it, PyMuPDF's own linear save is tried, which only exists in
+PyMuPDF releases before 1.25.
+"""
+
+import logging
+from pathlib import Path
+
+import pymupdf
+
+try:
+    import pikepdf
+except ImportError:  # Optional dependency
+    pikepdf = None
+
+logger = logging.getLogger(__name__)
+
+# Reported when linearized output was requested but could not be written
+LINEARIZE_UNAVAILABLE = "Output was not linearized: install pikepdf to enable fast web view"
+
+
+def _replace_file(pdf_path: Path, content: bytes) -> None:
+    """Atomically replace a file's content."""
+    tmp_path = pdf_path.with_name(pdf_path.name + ".tmp")
+    try:
+        tmp_path.write_bytes(content)
+        tmp_path.replace(pdf_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def compact_pdf(pdf_path: Path) -> tuple[int, int]:
+    """
+    Rewrite a PDF in place in compact form.
+
+    Packs non-stream objects (annotation dictionaries, OCGs, font and
+    resource dictionaries) into compressed object streams with a
+    cross-reference stream, Flate-compresses uncompressed streams (the
+    generated appearance content streams) and drops unused objects.
+    Duplicate-object merging (garbage=3) is skipped: it costs seconds on
+    large maps for well under 1% extra saving.
+
+    Args:
+        pdf_path: PDF to rewrite
+
+    Returns:
+        Tuple of (size_before, size_after) in bytes
+    """
+    size_before = pdf_path.stat().st_size
+
+    with pymupdf.open(pdf_path) as doc:
+        content = doc.tobytes(garbage=2, deflate=True, use_objstms=1)
+
+    _replace_file(pdf_path, content)
+
+    size_after = len(content)
+    logger.info(
+        f"Compacted {pdf_path.name}: {size_before} -> {size_after} bytes "
+        f"({100 * (1 - size_after / size_before):.1f}% smaller)"
+    )
+    return size_before, size_after
+
+
+def linearize_pdf(pdf_path: Path) -> bool:
+    """
+    Rewrite a PDF in place as linearized ("fast web view").
+
+    A linearized file puts the first page's objects and a hint table at
+    the front so viewers can render page one before the download ends.
+    Object streams written by compact_pdf are preserved.
+
+    Args:
+        pdf_path: PDF to rewrite
+
+    Returns:
+        True if the file was linearized, False if no linearizer is available
+    """
+    tmp_path = pdf_path.with_name(pdf_path.name + ".tmp")
+
+    if pikepdf is not None:
+        try:
+            with pikepdf.open(pdf_path) as pdf:
+                pdf.save(tmp_path, linearize=True)
+            tmp_path.replace(pdf_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)  # Don't leave a partial file behind
+            raise
+        logger.info(f"Linearized {pdf_path.name} with pikepdf")
+        return True
+
+    try:
+        with pymupdf.open(pdf_path) as doc:
+            content = doc.tobytes(garbage=1, linear=True)
+    except Exception as e:
+        # PyMuPDF >= 1.25 rejects linear=True
+        logger.warning(f"Skipping linearization of {pdf_path.name}: {e} (install pikepdf)")
+        return False
+
+    _replace_file(pdf_path, content)
+    logger.info(f"Linearized {pdf_path.name} with PyMuPDF")
+    return True
+
+
+def is_linearized(pdf_path: Path) -> bool:
+    """Check for a linearization dictionary at the start of a PDF."""
+    with open(pdf_path, "rb") as f:
+        return b"/Linearized" in f.read(1024)
@@ -0,0 +1,235 @@
+"""
+In-process caches with memory accounting.
+
+ByteLRUCache bounds a cache by the total byte size of its values rather
+than by entry count. HitCounter gives caches that manage their own
+storage the same hit/miss statistics. Named caches register themselves
+so their statistics can be reported by the health and metrics endpoints.
+Work done in worker processes reports its counter changes back (see
+counting_lookups()), which are merged into this process's caches.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+# Cumulative counters that worker processes report back
+COUNTER_FIELDS = ("hits", "misses", "evictions")
+
+# Named caches, for reporting
+_registry: dict[str, "ByteLRUCache | HitCounter"] = {}
+_registry_lock = threading.Lock()
+
+
+class ByteLRUCache:
+    """
+    Thread-safe LRU cache bounded by total value size in bytes.
+
+    Callers pass each value's size on insert. Least recently used entries
+    are evicted until the total fits in max_bytes; a value larger than
+    the whole budget is not stored.
+    """
+
+    def __init__(self, name: str, max_bytes: int, register: bool = True):
+        """
+        Initialize cache.
+
+        Args:
+            name: Cache name used in statistics
+            max_bytes: Byte budget for all values (0 = cache nothing)
+            register: Add to the registry reported by cache_stats()
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if register:
+            with _registry_lock:
+                _registry[name] = self
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value (marking it recently used) or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any, size: int) -> None:
+        """
+        Insert or replace a value, evicting least recently used entries.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            size: Value size in bytes
+        """
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+
+            if size > self.max_bytes:
+                return
+
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def add_counts(self, hits: int = 0, misses: int = 0, evictions: int = 0) -> None:
+        """Add lookups made by another process's copy of this cache."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+
+    def clear(self) -> None:
+        """Remove all entries (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict[str, int | float]:
+        """Current size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class HitCounter:
+    """
+    Thread-safe hit/miss counters for a cache with its own storage.
+
+    Usage:
+        snapshot_stats = HitCounter("icon_overrides")
+        snapshot_stats.hit()
+    """
+
+    def __init__(self, name: str, register: bool = True):
+        """
+        Initialize counters.
+
+        Args:
+            name: Cache name used in statistics
+            register: Add to the registry reported by cache_stats()
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if register:
+            with _registry_lock:
+                _registry[name] = self
+
+    def hit(self) -> None:
+        """Record a lookup served from the cache."""
+        with self._lock:
+            self.hits += 1
+
+    def miss(self) -> None:
+        """Record a lookup that had to load the value."""
+        with self._lock:
+            self.misses += 1
+
+    def add_counts(self, hits: int = 0, misses: int = 0) -> None:
+        """Add lookups made by another process's copy of this cache."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self) -> dict[str, int | float]:
+        """Hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def cache_stats() -> dict[str, dict[str, int | float]]:
+    """Statistics for every registered cache, keyed by name."""
+    with _registry_lock:
+        caches = list(_registry.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+
+def cache_counts() -> dict[str, dict[str, int]]:
+    """Cumulative hit/miss/eviction counters of every registered cache, keyed by name."""
+    return {
+        name: {field: stats[field] for field in COUNTER_FIELDS if field in stats}
+        for name, stats in cache_stats().items()
+    }
+
+
+@contextmanager
+def counting_lookups() -> Iterator[dict[str, dict[str, int]]]:
+    """
+    Collect the cache counter changes made during the block.
+
+    The yielded dict is filled in when the block exits, with cache name ->
+    counter -> increase for every cache that changed. Lookups by other
+    threads are included too, so the counts are exact only in a process
+    doing one job at a time, such as a pool worker.
+
+    Usage:
+        with counting_lookups() as counts:
+            context.convert(input_path, output_path)
+        return result, counts
+    """
+    before = cache_counts()
+    changes: dict[str, dict[str, int]] = {}
+    try:
+        yield changes
+    finally:
+        for name, counts in cache_counts().items():
+            previous = before.get(name, {})
+            changed = {
+                field: value - previous.get(field, 0)
+                for field, value in counts.items()
+                if value != previous.get(field, 0)
+            }
+            if changed:
+                changes[name] = changed
+
+
+def merge_cache_counts(changes: dict[str, dict[str, int]]) -> None:
+    """Add counter changes reported by a worker process to the caches of the same name."""
+    with _registry_lock:
+        caches = dict(_registry)
+    for name, counts in changes.items():
+        cache = caches.get(name)
+        if cache is not None:
+            cache.add_counts(**counts)
@@ -82,3 +82,36 @@ class ConvertedFileNotFoundError(PDFConverterError):
     ):
         self.message = message
         super().__init__(self.message)
+
+
+class BatchTooLargeError(PDFConverterError):
+    """Raised when a batch contains more PDFs than allowed."""
+
+    def __init__(self, max_files: int):
+        self.max_files = max_files
+        self.message = f"Batch exceeds the limit of {max_files} PDFs"
+        super().__init__(self.message)
+
+
+class RevisionConflictError(PDFConverterError):
+    """Raised when a stored icon changed since the revision a writer read."""
+
+    def __init__(self, subject: str, expected: int, actual: int):
+        self.subject = subject
+        self.expected = expected
+        self.actual = actual
+        self.message = (
+            f"Icon {subject} was modified concurrently "
+            f"(revision {actual}, expected {expected})"
+        )
+        super().__init__(self.message)
+
+
+class ServerBusyError(PDFConverterError):
+    """Raised when a job is refused because the server is at capacity."""
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        self.status_code = status_code  # 429 (queue full) or 503 (queue wait timed out)
+        self.retry_after = retry_after  # Suggested seconds before retrying
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,229 @@
+"""
+Managed executors for blocking work in async handlers.
+
+Routers run blocking service calls through a named executor instead of
+on the event loop. "io" is a thread pool for file I/O, PDF inspection and
+image work. "cpu" is a process pool for conversions. Executors register
+themselves like the caches in app.utils.cache, and executor_stats()
+reports their load for the health and metrics endpoints:
+- in-flight and queued task counts;
+- how long tasks waited for a worker;
+- how long they ran.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+# Named executors, for reporting
+_registry: dict[str, "ManagedExecutor"] = {}
+_registry_lock = threading.Lock()
+
+
+def _call_timed(fn: Callable[..., T], args: tuple, kwargs: dict) -> tuple[float, float, T]:
+    """Run fn in the worker, returning (started, finished, result) monotonic times."""
+    started = time.monotonic()
+    result = fn(*args, **kwargs)
+    return started, time.monotonic(), result
+
+
+class ManagedExecutor:
+    """
+    Lazily created thread or process pool with load statistics.
+
+    Process pools use the "spawn" start method, so workers never inherit
+    the server's threads or locks; functions and arguments must be
+    picklable. Monotonic clocks are system-wide, so wait times are
+    measured across processes too.
+
+    Usage:
+        result = await get_executor("io").run(parser.parse_pdf, path)
+    """
+
+    def __init__(self, name: str, max_workers: int, processes: bool = False, register: bool = True):
+        """
+        Initialize executor.
+
+        Args:
+            name: Executor name used in statistics
+            max_workers: Worker threads or processes
+            processes: Use a process pool instead of a thread pool
+            register: Add to the registry reported by executor_stats()
+        """
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.processes = processes
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+        if register:
+            with _registry_lock:
+                _registry[name] = self
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.processes:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix=self.name
+                    )
+            return self._executor
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        """
+        Submit a blocking call from synchronous code, e.g. a worker thread.
+
+        Returns a future for fn's result, counted in the statistics like
+        run(). Cancelling it cancels the call if it has not started. A
+        process pool whose worker died is replaced on the next call.
+        """
+        executor = self._get_executor()
+        with self._lock:
+            self.in_flight += 1
+            self.submitted += 1
+        submitted = time.monotonic()
+        try:
+            inner = executor.submit(_call_timed, fn, args, kwargs)
+        except BaseException as e:
+            self._record_failure(executor, e)
+            raise
+
+        outer: Future = Future()
+
+        def finish(inner: Future) -> None:
+            try:
+                started, finished, result = inner.result()
+            except BaseException as e:
+                self._record_failure(executor, e)
+                if not outer.cancelled():
+                    outer.set_exception(e)
+                return
+
+            wait = max(0.0, started - submitted)
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.wait_seconds_total += wait
+                self.run_seconds_total += finished - started
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            if not outer.cancelled():
+                outer.set_result(result)
+
+        def cancel(outer: Future) -> None:
+            if outer.cancelled():
+                inner.cancel()
+
+        outer.add_done_callback(cancel)
+        inner.add_done_callback(finish)
+        return outer
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call in the pool and await its result.
+
+        Exceptions raised by fn propagate to the caller.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _record_failure(self, executor: Executor, error: BaseException) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.failed += 1
+            if isinstance(error, BrokenProcessPool) and self._executor is executor:
+                # A worker died (e.g. out of memory); start a fresh pool next time
+                self._executor = None
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the pool; it is recreated on the next run()."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict[str, int | float | str]:
+        """Current load and cumulative wait/run timings."""
+        with self._lock:
+            done = self.completed
+            return {
+                "kind": "process" if self.processes else "thread",
+                "max_workers": self.max_workers,
+                "in_flight": self.in_flight,
+                # Tasks beyond the worker count are waiting for a worker
+                "queued": max(0, self.in_flight - self.max_workers),
+                "submitted": self.submitted,
+                "completed": done,
+                "failed": self.failed,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "run_seconds_total": round(self.run_seconds_total, 6),
+                "avg_wait_ms": round(self.wait_seconds_total / done * 1000, 3) if done else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+def get_executor(name: str) -> ManagedExecutor:
+    """
+    Get a named executor, creating the standard ones on first use.
+
+    "io" is a thread pool of settings.io_workers threads. "cpu" is a
+    process pool of settings.cpu_workers processes, or the "io" pool when
+    cpu_workers is 0.
+
+    Raises:
+        KeyError: For an unknown name that was never created
+    """
+    with _registry_lock:
+        executor = _registry.get(name)
+    if executor is not None:
+        return executor
+    if name == "io":
+        return ManagedExecutor("io", settings.io_workers)
+    if name == "cpu":
+        if settings.cpu_workers <= 0:
+            return get_executor("io")
+        return ManagedExecutor("cpu", settings.cpu_workers, processes=True)
+    raise KeyError(f"Unknown executor: {name}")
+
+
+async def run_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking I/O-bound call on the shared thread pool."""
+    return await get_executor("io").run(fn, *args, **kwargs)
+
+
+async def run_cpu(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a CPU-heavy call (picklable function and arguments) on the process pool."""
+    return await get_executor("cpu").run(fn, *args, **kwargs)
+
+
+def executor_stats() -> dict[str, dict[str, int | float | str]]:
+    """Statistics for every registered executor, keyed by name."""
+    with _registry_lock:
+        executors = list(_registry.values())
+    return {executor.name: executor.stats() for executor in executors}
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Stop every registered executor's pool."""
+    with _registry_lock:
+        executors = list(_registry.values())
+    for executor in executors:
+        executor.shutdown(wait=wait)
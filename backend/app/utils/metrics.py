@@ -0,0 +1,208 @@
+"""
+Prometheus text-format metrics.
+
+Counter and Histogram record events as they happen. Values that already
+live elsewhere (cache, executor and admission statistics, disk usage)
+are read at scrape time by collector functions registered with
+register_collector(). render_metrics() produces the text exposition
+format (version 0.0.4) served by /metrics.
+
+Metrics are per process. Work done in executor processes is recorded by
+the request handler that awaited it.
+"""
+
+import math
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = tuple[str, ...]
+
+
+@dataclass
+class MetricFamily:
+    """One metric's samples as (sample name, labels, value) at scrape time."""
+
+    name: str
+    type: str  # "counter", "gauge" or "histogram"
+    help: str
+    samples: list[tuple[str, dict[str, str], float]] = field(default_factory=list)
+
+    def add(self, value: float, suffix: str = "", **labels: str) -> None:
+        """Append a sample (suffix for histogram parts, e.g. "_bucket")."""
+        self.samples.append((self.name + suffix, labels, value))
+
+
+# Families recorded by Counter and Histogram, plus scrape-time collectors
+_metrics: list["Counter | Histogram"] = []
+_collectors: list[Callable[[], Iterable[MetricFamily]]] = []
+_registry_lock = threading.Lock()
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+
+    Usage:
+        CONVERSIONS = Counter("converter_conversions_total", "Conversions", ["status"])
+        CONVERSIONS.inc(status="success")
+    """
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), register: bool = True):
+        """
+        Initialize counter.
+
+        Args:
+            name: Metric name, ending in "_total"
+            help: HELP text
+            labelnames: Label names every inc() must supply
+            register: Include in render_metrics()
+        """
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+        if register:
+            with _registry_lock:
+                _metrics.append(self)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add amount (>= 0) to the labelled series."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Current value of a labelled series (0 if never incremented)."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "counter", self.help)
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                family.samples.append((self.name, dict(zip(self.labelnames, key)), value))
+        return family
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with optional labels.
+
+    Usage:
+        UPLOAD_SIZE = Histogram("converter_upload_size_bytes", "Upload sizes", SIZE_BUCKETS)
+        UPLOAD_SIZE.observe(len(content))
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: Sequence[float],
+        labelnames: Sequence[str] = (),
+        register: bool = True,
+    ):
+        """
+        Initialize histogram.
+
+        Args:
+            name: Metric name (unit suffix, e.g. "_seconds" or "_bytes")
+            help: HELP text
+            buckets: Increasing upper bounds; +Inf is added automatically
+            labelnames: Label names every observe() must supply
+            register: Include in render_metrics()
+        """
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.labelnames = tuple(labelnames)
+        # Label values -> (per-bucket counts, sum, count)
+        self._series: dict[LabelValues, tuple[list[int], float, int]] = {}
+        self._lock = threading.Lock()
+        if register:
+            with _registry_lock:
+                _metrics.append(self)
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation in the labelled series."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            counts, total, count = self._series.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._series[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        """Observations in a labelled series."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            return series[2] if series else 0
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, "histogram", self.help)
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    family.add(cumulative, "_bucket", **labels, le=_format_value(bound))
+                family.add(total, "_sum", **labels)
+                family.add(count, "_count", **labels)
+        return family
+
+
+def register_collector(collector: Callable[[], Iterable[MetricFamily]]) -> None:
+    """Add a function that reports metric families at scrape time."""
+    with _registry_lock:
+        _collectors.append(collector)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_family(family: MetricFamily) -> list[str]:
+    help_text = family.help.replace("\\", r"\\").replace("\n", r"\n")
+    lines = [f"# HELP {family.name} {help_text}", f"# TYPE {family.name} {family.type}"]
+    for name, labels, value in family.samples:
+        if labels:
+            label_text = ",".join(f'{k}="{_escape_label(str(v))}"' for k, v in labels.items())
+            name = f"{name}{{{label_text}}}"
+        lines.append(f"{name} {_format_value(value)}")
+    return lines
+
+
+def render_metrics() -> str:
+    """All registered metrics and collector output in the text exposition format."""
+    with _registry_lock:
+        metrics = list(_metrics)
+        collectors = list(_collectors)
+
+    families = [metric.collect() for metric in metrics]
+    for collector in collectors:
+        families.extend(collector())
+
+    lines: list[str] = []
+    for family in families:
+        lines.extend(_format_family(family))
+    return "\n".join(lines) + "\n"
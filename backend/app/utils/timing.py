@@ -0,0 +1,61 @@
+"""
+Stage timing for conversions.
+
+A StageTimer accumulates wall-clock time per named stage plus event
+counters. One is threaded through a conversion (context load, annotation
+rewrite, output stages) so the response and logs can show where the time
+went. Timers are plain data, so one filled in a worker process can be
+returned to the request handler.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Accumulated seconds per stage and counts per event.
+
+    Stages keep the order in which they were first entered. Timing the
+    same stage name again adds to it, so per-item work (e.g. rendering
+    each icon) sums into one entry.
+
+    Usage:
+        timer = StageTimer()
+        with timer.stage("write"):
+            writer.write(f)
+        timer.count("compound:/Circle")
+    """
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the block and add it to the named stage."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add measured seconds to a stage."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Increment an event counter."""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, other: "StageTimer") -> None:
+        """Add another timer's stages and counters to this one."""
+        for name, seconds in other.stages.items():
+            self.add(name, seconds)
+        for name, n in other.counters.items():
+            self.count(name, n)
+
+    def stages_ms(self) -> dict[str, float]:
+        """Stage durations in milliseconds, rounded to 0.01 ms."""
+        return {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()}
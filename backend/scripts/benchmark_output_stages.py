@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Benchmark output post-processing stages.
+
+Converts a map once, then measures the extra write cost and resulting
+size of each output stage (compact, linearize, both) on copies of the
+converted file.
+
+Usage:
+    python scripts/benchmark_output_stages.py                 # synthetic map
+    python scripts/benchmark_output_stages.py path/to/map.pdf
+    python scripts/benchmark_output_stages.py --icons 2000 --repeat 5
+"""
+
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pymupdf
+
+from app.services.conversion_context import ConversionContext
+from app.services.output_optimizer import compact_pdf, is_linearized, linearize_pdf
+
+SYNTHETIC_SUBJECT = "Artist - Wi-Fi Access Point"
+
+STAGES = {
+    "compact": [compact_pdf],
+    "linearize": [linearize_pdf],
+    "compact+linearize": [compact_pdf, linearize_pdf],
+}
+
+
+def make_synthetic_map(path: Path, icon_count: int) -> None:
+    """Write a single-page bid map with a grid of bid circles."""
+    doc = pymupdf.open()
+    page = doc.new_page(width=2448, height=1584)  # Tabloid landscape x2
+    columns = 48
+    for i in range(icon_count):
+        x = 20 + (i % columns) * 50
+        y = 20 + (i // columns) * 40
+        annot = page.add_circle_annot(pymupdf.Rect(x, y, x + 20, y + 20))
+        info = annot.info
+        info["subject"] = SYNTHETIC_SUBJECT
+        annot.set_info(info)
+        annot.update()
+    doc.save(path)
+    doc.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark output post-processing stages")
+    parser.add_argument("input_pdf", nargs="?", type=Path, help="Bid map (default: synthetic)")
+    parser.add_argument("--icons", type=int, default=500, help="Icons in the synthetic map")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        input_pdf = args.input_pdf
+        if input_pdf is None:
+            input_pdf = work_dir / "synthetic_bid.pdf"
+            make_synthetic_map(input_pdf, args.icons)
+            print(f"Synthetic map: {args.icons} icons")
+
+        context = ConversionContext.load()
+        converted = work_dir / "converted.pdf"
+        start = time.perf_counter()
+        converted_count, _, _, _ = context.convert(
+            input_pdf, converted, compact=False, linearize=False
+        )
+        convert_ms = (time.perf_counter() - start) * 1000
+        base_size = converted.stat().st_size
+
+        print(f"Converted {converted_count} annotations in {convert_ms:.0f}ms")
+        print(f"\n{'Stage':<20} {'Size':>12} {'Saved':>7} {'Extra ms':>10} {'Linearized':>11}")
+        print("-" * 64)
+        print(f"{'baseline':<20} {base_size:>12,} {'':>7} {0:>10.0f} {'':>11}")
+
+        for name, stages in STAGES.items():
+            timings = []
+            for run in range(args.repeat):
+                target = work_dir / f"{name}_{run}.pdf"
+                shutil.copyfile(converted, target)
+                start = time.perf_counter()
+                for stage in stages:
+                    stage(target)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            size = target.stat().st_size
+            saved = 100 * (1 - size / base_size)
+            print(
+                f"{name:<20} {size:>12,} {saved:>6.1f}% "
+                f"{statistics.median(timings):>10.0f} {str(is_linearized(target)):>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,199 @@ Auto-tuning engine for icon rendering parameters.
 Uses coordinate descent optimization to adjust icon_config.py
 parameters (colors, offsets, sizes) to maximize visual match
 against reference deployment PDFs.
+
+Two strategies are available: "search" (bisection for sizes, two-pass
+grids for offsets) and "descent" (coordinate descent with a shrinking
+step over each phase's parameters), which needs far fewer renders.
+
+Candidates are scored through a TuningContext, which memoizes scores in
+a ScoreCache (optionally persistent), counts evaluations per subject and
+can spread candidate evaluations (the probes of each bisection step, the
+cells of each offset grid) and whole subjects over a TuningPool of
+worker processes. Scores are gathered in candidate order and the first
+best candidate wins, so results are identical to a sequential run.
+
+Uncached candidates are rendered in batches: up to batch_size configs
+are drawn as a sheet, one page each in a single document that embeds
+their shared resources once. Each page renders exactly like a candidate
+drawn on its own, so batching never changes a score.
 """
 
 import logging
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from math import ceil
+from pathlib import Path
 from typing import Callable
 
 from PIL import Image
 
+from app.services.icon_config import get_icon_config
 from scripts.icon_tuner.icon_comparator import (
     compute_similarity,
     render_icon_to_image,
+    render_icons_to_images,
 )
+from scripts.icon_tuner.score_cache import ScoreCache, metric_name, reference_hash
 
 logger = logging.getLogger(__name__)
 
+STRATEGIES = ("search", "descent")
+
+# Candidates drawn per sheet (1 = render each candidate in its own document)
+SHEET_BATCH_SIZE = 64
+
+# Parameters and bounds tuned by each phase after the circle color
+TUNING_PHASES: list[tuple[str, dict[str, tuple[float, float]]]] = [
+    ("scale", {"img_scale_ratio": (0.3, 2.0)}),
+    ("img_offset", {"img_x_offset": (-2.0, 2.0), "img_y_offset": (-2.0, 2.0)}),
+    ("text_offsets", {
+        "brand_x_offset": (-2.0, 2.0), "brand_y_offset": (-5.0, 0.0),
+        "model_x_offset": (-2.0, 2.0), "model_y_offset": (0.0, 5.0),
+    }),
+    ("font_sizes", {
+        "brand_font_size": (0.4, 4.0), "model_font_size": (0.4, 4.0), "id_font_size": (1.0, 4.0),
+    }),
+    ("structural", {
+        "id_box_height": (2.0, 6.0), "id_box_width_ratio": (0.4, 0.8),
+        "circle_border_width": (0.3, 2.5), "id_box_border_width": (0.3, 2.0),
+    }),
+]
+
+# State held by each TuningPool worker process
+_worker_refs: dict[str, Image.Image] = {}
+_worker_cache_path: Path | None = None
+
+
+def _init_worker(ref_icons: dict[str, Image.Image], cache_path: Path | None) -> None:
+    """Process pool initializer: keep reference images for the worker's lifetime."""
+    global _worker_refs, _worker_cache_path
+    _worker_refs = ref_icons
+    _worker_cache_path = cache_path
+
+
+def _score_task(
+    subject: str,
+    overrides: list[dict],
+    metric_fn: Callable[[dict], float] | None,
+    batch_size: int,
+) -> list[float]:
+    """Worker: score a chunk of candidates against the worker's reference image."""
+    return _score_candidates(subject, _worker_refs[subject], overrides, metric_fn, batch_size)
+
+
+def _tune_task(
+    subject: str, config: dict, threshold: float, strategy: str, batch_size: int
+) -> tuple[dict, list[dict], "TuningStats"]:
+    """Worker: run a full sequential auto-tune for one subject."""
+    context = TuningContext(cache=ScoreCache(_worker_cache_path), batch_size=batch_size)
+    proposed, history = auto_tune_icon(
+        subject, _worker_refs[subject], config,
+        threshold=threshold, strategy=strategy, context=context,
+    )
+    return proposed, history, context.stats.get(subject, TuningStats())
+
+
+class TuningPool:
+    """
+    Process pool for scoring tuner candidates and tuning whole subjects.
+
+    Reference images are sent to each worker once, when it starts; the
+    worker's IconRenderer and image caches stay warm across tasks.
+
+    Usage:
+        with TuningPool(ref_icons, workers=8) as pool:
+            best = binary_search_parameter(..., context=TuningContext(pool=pool))
+    """
+
+    def __init__(
+        self,
+        ref_icons: dict[str, Image.Image],
+        workers: int,
+        cache_path: Path | None = None,
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            ref_icons: Reference images by subject, for every subject to be tuned
+            workers: Number of worker processes
+            cache_path: Score cache file for subjects tuned inside workers
+        """
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(ref_icons, cache_path),
+        )
+
+    def score(
+        self,
+        subject: str,
+        overrides: list[dict],
+        metric_fn: Callable[[dict], float] | None = None,
+        batch_size: int = 1,
+    ) -> list[float]:
+        """
+        Score candidate configs in parallel.
+
+        Candidates are split evenly over the workers, one task per chunk
+        of at most batch_size. Sheet pages render exactly like single
+        icons, so the scores do not depend on how candidates are chunked.
+
+        Args:
+            subject: Deployment subject name
+            overrides: Full config overrides, one per candidate
+            metric_fn: Optional scoring function (must be picklable)
+            batch_size: Maximum candidates per sheet
+
+        Returns:
+            Scores in the same order as overrides
+        """
+        chunk_size = max(1, min(batch_size, ceil(len(overrides) / self.workers)))
+        chunks = [overrides[i:i + chunk_size] for i in range(0, len(overrides), chunk_size)]
+        results = self._executor.map(
+            _score_task, repeat(subject), chunks, repeat(metric_fn), repeat(batch_size)
+        )
+        return [score for chunk in results for score in chunk]
+
+    def tune(
+        self,
+        jobs: list[tuple[str, dict]],
+        threshold: float,
+        strategy: str = "search",
+        batch_size: int = SHEET_BATCH_SIZE,
+    ) -> Iterator[tuple[dict, list[dict], "TuningStats"]]:
+        """
+        Auto-tune several subjects in parallel, one subject per task.
+
+        Args:
+            jobs: (subject, current_config) pairs
+            threshold: Target combined score
+            strategy: Optimizer strategy (see STRATEGIES)
+            batch_size: Maximum candidates per sheet
+
+        Returns:
+            Iterator of (proposed_overrides, history, stats) in job order
+        """
+        subjects = [subject for subject, _ in jobs]
+        configs = [config for _, config in jobs]
+        return self._executor.map(
+            _tune_task, subjects, configs, repeat(threshold), repeat(strategy), repeat(batch_size)
+        )
+
+    def close(self) -> None:
+        """Shut down worker processes."""
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "TuningPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
 
 def extract_dominant_circle_color(
     ref_img: Image.Image,
@@ -91,6 +270,15 @@ def _score_with_override(
     """Render icon with overrides and score against reference."""
     merged = {**base_config, **override}
     gen_img = render_icon_to_image(subject, config_override=merged)
+    return _score_image(ref_img, gen_img, metric_fn)
+
+
+def _score_image(
+    ref_img: Image.Image,
+    gen_img: Image.Image | None,
+    metric_fn: Callable[[dict], float] | None = None,
+) -> float:
+    """Score a rendered candidate against reference (0 if it failed to render)."""
     if gen_img is None:
         return 0.0
 
@@ -102,6 +290,117 @@ def _score_with_override(
     return scores["combined"]
 
 
+def _score_candidates(
+    subject: str,
+    ref_img: Image.Image,
+    overrides: list[dict],
+    metric_fn: Callable[[dict], float] | None = None,
+    batch_size: int = SHEET_BATCH_SIZE,
+) -> list[float]:
+    """Render candidates in sheets of up to batch_size and score each."""
+    if batch_size <= 1:
+        return [_score_with_override(subject, ref_img, {}, override, metric_fn) for override in overrides]
+
+    scores = []
+    for start in range(0, len(overrides), batch_size):
+        images = render_icons_to_images(subject, overrides[start:start + batch_size])
+        scores.extend(_score_image(ref_img, img, metric_fn) for img in images)
+    return scores
+
+
+@dataclass
+class TuningStats:
+    """Candidate evaluation counts for one subject."""
+
+    evaluations: int = 0  # Candidates scored, including cache hits
+    renders: int = 0  # Candidates actually rendered and compared
+
+
+class TuningContext:
+    """
+    How candidates are scored during a tuning run.
+
+    Each candidate is looked up in the score cache first; the remaining
+    distinct candidates are rendered in sheet batches and scored,
+    in this process or on a TuningPool, and recorded. Evaluations are
+    counted per subject.
+    """
+
+    def __init__(
+        self,
+        pool: TuningPool | None = None,
+        cache: ScoreCache | None = None,
+        batch_size: int = SHEET_BATCH_SIZE,
+    ):
+        """
+        Initialize context.
+
+        Args:
+            pool: Worker pool for scoring candidates, or None to score in this process
+            cache: Score cache. Defaults to an in-memory one for this run
+            batch_size: Maximum candidates per sheet (1 = render each alone)
+        """
+        self.pool = pool
+        self.cache = cache if cache is not None else ScoreCache()
+        self.batch_size = batch_size
+        self.stats: dict[str, TuningStats] = {}
+        self._icon_configs: dict[str, dict] = {}
+
+    def score(
+        self,
+        subject: str,
+        ref_img: Image.Image,
+        base_config: dict,
+        overrides: list[dict],
+        metric_fn: Callable[[dict], float] | None = None,
+    ) -> list[float]:
+        """
+        Score candidate overrides on top of base_config.
+
+        Returns:
+            Scores in the same order as overrides
+
+        Raises:
+            ValueError: If metric_fn is a lambda or nested function (see metric_name)
+        """
+        stats = self.stats.setdefault(subject, TuningStats())
+        stats.evaluations += len(overrides)
+
+        if subject not in self._icon_configs:
+            self._icon_configs[subject] = get_icon_config(subject)
+        icon_config = self._icon_configs[subject]
+        ref_hash = reference_hash(ref_img)
+        metric = metric_name(metric_fn)
+
+        candidates = [{**base_config, **override} for override in overrides]
+        keys = [
+            self.cache.key(subject, ref_hash, {**icon_config, **candidate}, metric)
+            for candidate in candidates
+        ]
+        scores = [self.cache.get(key) for key in keys]
+
+        # Render each distinct uncached candidate once
+        missing: dict[str, dict] = {}
+        for key, candidate, score in zip(keys, candidates, scores):
+            if score is None:
+                missing.setdefault(key, candidate)
+        if not missing:
+            return scores
+
+        if self.pool is None:
+            results = _score_candidates(
+                subject, ref_img, list(missing.values()), metric_fn, self.batch_size
+            )
+        else:
+            results = self.pool.score(subject, list(missing.values()), metric_fn, self.batch_size)
+        stats.renders += len(results)
+
+        fresh = dict(zip(missing, results))
+        for key, score in fresh.items():
+            self.cache.put(key, score)
+        return [fresh[key] if score is None else score for key, score in zip(keys, scores)]
+
+
 def binary_search_parameter(
     subject: str,
     ref_img: Image.Image,
@@ -111,6 +410,7 @@ def binary_search_parameter(
     high: float,
     steps: int = 8,
     metric_fn: Callable[[dict], float] | None = None,
+    context: TuningContext | None = None,
 ) -> float:
     """
     Binary search for optimal value of a single numeric parameter.
@@ -126,21 +426,22 @@ def binary_search_parameter(
         high: Upper bound
         steps: Number of iterations
         metric_fn: Optional function to extract score from similarity dict
+        context: TuningContext to score with. Defaults to a sequential one
 
     Returns:
         Optimal parameter value
     """
+    context = context or TuningContext()
     best_val = (low + high) / 2
     best_score = 0.0
 
     for _ in range(steps):
         mid = (low + high) / 2
         test_points = [low, mid, high]
+        overrides = [{param_name: round(val, 4)} for val in test_points]
+        scores = context.score(subject, ref_img, base_config, overrides, metric_fn)
 
-        for val in test_points:
-            override = {param_name: round(val, 4)}
-            score = _score_with_override(subject, ref_img, base_config, override, metric_fn)
-
+        for val, score in zip(test_points, scores):
             if score > best_score:
                 best_score = score
                 best_val = val
@@ -164,6 +465,7 @@ def grid_search_offsets(
     coarse_step: float = 1.0,
     fine_step: float = 0.2,
     metric_fn: Callable[[dict], float] | None = None,
+    context: TuningContext | None = None,
 ) -> tuple[float, float]:
     """
     Two-pass grid search for optimal x/y offset parameters.
@@ -181,53 +483,123 @@ def grid_search_offsets(
         coarse_step: Step size for coarse pass
         fine_step: Step size for fine pass
         metric_fn: Optional scoring function
+        context: TuningContext to score with. Defaults to a sequential one
 
     Returns:
         (best_x, best_y) offset values
     """
+    context = context or TuningContext()
     best_x, best_y = 0.0, 0.0
     best_score = 0.0
 
-    # Coarse pass
-    x = x_range[0]
-    while x <= x_range[1]:
-        y = y_range[0]
-        while y <= y_range[1]:
-            override = {x_param: round(x, 4), y_param: round(y, 4)}
-            score = _score_with_override(subject, ref_img, base_config, override, metric_fn)
+    def search(x_min: float, x_max: float, y_min: float, y_max: float, step: float) -> None:
+        nonlocal best_x, best_y, best_score
+        cells = []
+        x = x_min
+        while x <= x_max:
+            y = y_min
+            while y <= y_max:
+                cells.append((x, y))
+                y += step
+            x += step
+
+        overrides = [{x_param: round(x, 4), y_param: round(y, 4)} for x, y in cells]
+        scores = context.score(subject, ref_img, base_config, overrides, metric_fn)
+        for (x, y), score in zip(cells, scores):
             if score > best_score:
                 best_score = score
                 best_x, best_y = x, y
-            y += coarse_step
-        x += coarse_step
+
+    # Coarse pass
+    search(x_range[0], x_range[1], y_range[0], y_range[1], coarse_step)
 
     # Fine pass around best
-    fine_x_min = max(x_range[0], best_x - coarse_step)
-    fine_x_max = min(x_range[1], best_x + coarse_step)
-    fine_y_min = max(y_range[0], best_y - coarse_step)
-    fine_y_max = min(y_range[1], best_y + coarse_step)
-
-    x = fine_x_min
-    while x <= fine_x_max:
-        y = fine_y_min
-        while y <= fine_y_max:
-            override = {x_param: round(x, 4), y_param: round(y, 4)}
-            score = _score_with_override(subject, ref_img, base_config, override, metric_fn)
-            if score > best_score:
-                best_score = score
-                best_x, best_y = x, y
-            y += fine_step
-        x += fine_step
+    search(
+        max(x_range[0], best_x - coarse_step),
+        min(x_range[1], best_x + coarse_step),
+        max(y_range[0], best_y - coarse_step),
+        min(y_range[1], best_y + coarse_step),
+        fine_step,
+    )
 
     return (round(best_x, 4), round(best_y, 4))
 
 
+def coordinate_descent(
+    subject: str,
+    ref_img: Image.Image,
+    base_config: dict,
+    bounds: dict[str, tuple[float, float]],
+    start: dict[str, float],
+    min_step_ratio: float = 1 / 64,
+    metric_fn: Callable[[dict], float] | None = None,
+    context: TuningContext | None = None,
+) -> tuple[dict[str, float], float]:
+    """
+    Coordinate descent over several numeric parameters.
+
+    Probes each parameter one step below and above its current value and
+    moves to the better probe if it beats the current score; otherwise
+    that parameter's step is halved. Steps start at a quarter of each
+    parameter's range.
+
+    Args:
+        subject: Deployment subject name
+        ref_img: Reference icon image
+        base_config: Current icon config overrides
+        bounds: Parameter name -> (min, max)
+        start: Starting values (missing parameters start mid-range)
+        min_step_ratio: Stop once every step is below this fraction of its range
+        metric_fn: Optional scoring function
+        context: TuningContext to score with. Defaults to a sequential one
+
+    Returns:
+        (best parameter values, best score)
+    """
+    context = context or TuningContext()
+
+    def clamp(name: str, value: float) -> float:
+        low, high = bounds[name]
+        return round(min(max(value, low), high), 4)
+
+    point = {name: clamp(name, start.get(name, (low + high) / 2)) for name, (low, high) in bounds.items()}
+    steps = {name: (high - low) / 4 for name, (low, high) in bounds.items()}
+    min_steps = {name: (high - low) * min_step_ratio for name, (low, high) in bounds.items()}
+    best_score = context.score(subject, ref_img, base_config, [point], metric_fn)[0]
+
+    while any(steps[name] >= min_steps[name] for name in bounds):
+        for name in bounds:
+            if steps[name] < min_steps[name]:
+                continue
+
+            probes = []
+            for value in (point[name] - steps[name], point[name] + steps[name]):
+                value = clamp(name, value)
+                if value != point[name] and value not in probes:
+                    probes.append(value)
+            overrides = [{**point, name: value} for value in probes]
+            scores = context.score(subject, ref_img, base_config, overrides, metric_fn)
+
+            moved = False
+            for value, score in zip(probes, scores):
+                if score > best_score:
+                    best_score = score
+                    point[name] = value
+                    moved = True
+            if not moved:
+                steps[name] /= 2
+
+    return point, best_score
+
+
 def auto_tune_icon(
     subject: str,
     ref_img: Image.Image,
     current_config: dict,
     max_iterations: int = 20,
     threshold: float = 0.85,
+    strategy: str = "search",
+    context: TuningContext | None = None,
 ) -> tuple[dict, list[dict]]:
     """
     Auto-tune icon rendering parameters to match reference.
@@ -238,6 +610,11 @@ def auto_tune_icon(
     C. Grid search img_x/y_offset
     D. Grid search brand/model x/y offsets
     E. Step search font sizes
+    F. Binary search structural parameters (ID box, borders)
+
+    With strategy "descent", phases B-F instead run coordinate descent
+    over each phase's parameters (see TUNING_PHASES), starting from the
+    current config.
 
     Args:
         subject: Deployment subject name
@@ -245,10 +622,17 @@ def auto_tune_icon(
         current_config: Current icon configuration
         max_iterations: Max optimization iterations (unused, kept for API compat)
         threshold: Target combined score (stop early if reached)
+        strategy: "search" or "descent"
+        context: TuningContext for cached, optionally parallel scoring;
+            its stats hold the subject's evaluation counts afterwards
 
     Returns:
         (proposed_overrides, iteration_history)
     """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r} (expected one of {STRATEGIES})")
+
+    context = context or TuningContext()
     proposed: dict = {}
     history: list[dict] = []
 
@@ -280,9 +664,27 @@ def auto_tune_icon(
         if score_a["combined"] >= threshold:
             return proposed, history
 
+    if strategy == "descent":
+        for phase, bounds in TUNING_PHASES:
+            start = {
+                name: current_config[name]
+                for name in bounds
+                if isinstance(current_config.get(name), (int, float))
+            }
+            point, score = coordinate_descent(
+                subject, ref_img, proposed, bounds, start, context=context
+            )
+            proposed.update(point)
+            history.append({"phase": phase, "score": score, "params": point})
+            logger.info(f"{subject}: after {phase} -> combined={score:.3f}")
+
+            if score >= threshold:
+                break
+        return proposed, history
+
     # Phase B: Binary search img_scale_ratio
     best_scale = binary_search_parameter(
-        subject, ref_img, proposed, "img_scale_ratio", 0.3, 2.0, steps=6
+        subject, ref_img, proposed, "img_scale_ratio", 0.3, 2.0, steps=6, context=context
     )
     proposed["img_scale_ratio"] = best_scale
 
@@ -300,7 +702,7 @@ def auto_tune_icon(
         subject, ref_img, proposed,
         "img_x_offset", "img_y_offset",
         (-2.0, 2.0), (-2.0, 2.0),
-        coarse_step=1.0, fine_step=0.4,
+        coarse_step=1.0, fine_step=0.4, context=context,
     )
     if best_ix != 0.0:
         proposed["img_x_offset"] = best_ix
@@ -325,7 +727,7 @@ def auto_tune_icon(
         subject, ref_img, proposed,
         "brand_x_offset", "brand_y_offset",
         (-2.0, 2.0), (-5.0, 0.0),
-        coarse_step=1.0, fine_step=0.4,
+        coarse_step=1.0, fine_step=0.4, context=context,
     )
     proposed["brand_x_offset"] = best_bx
     proposed["brand_y_offset"] = best_by
@@ -334,7 +736,7 @@ def auto_tune_icon(
         subject, ref_img, proposed,
         "model_x_offset", "model_y_offset",
         (-2.0, 2.0), (0.0, 5.0),
-        coarse_step=1.0, fine_step=0.4,
+        coarse_step=1.0, fine_step=0.4, context=context,
     )
     proposed["model_x_offset"] = best_mx
     proposed["model_y_offset"] = best_my
@@ -357,17 +759,17 @@ def auto_tune_icon(
 
     # Phase E: Step search font sizes
     best_brand_fs = binary_search_parameter(
-        subject, ref_img, proposed, "brand_font_size", 0.4, 4.0, steps=6
+        subject, ref_img, proposed, "brand_font_size", 0.4, 4.0, steps=6, context=context
     )
     proposed["brand_font_size"] = best_brand_fs
 
     best_model_fs = binary_search_parameter(
-        subject, ref_img, proposed, "model_font_size", 0.4, 4.0, steps=6
+        subject, ref_img, proposed, "model_font_size", 0.4, 4.0, steps=6, context=context
     )
     proposed["model_font_size"] = best_model_fs
 
     best_id_fs = binary_search_parameter(
-        subject, ref_img, proposed, "id_font_size", 1.0, 4.0, steps=5
+        subject, ref_img, proposed, "id_font_size", 1.0, 4.0, steps=5, context=context
     )
     proposed["id_font_size"] = best_id_fs
 
@@ -390,22 +792,22 @@ def auto_tune_icon(
 
     # Phase F: Structural parameters (id_box, border)
     best_id_box_h = binary_search_parameter(
-        subject, ref_img, proposed, "id_box_height", 2.0, 6.0, steps=5
+        subject, ref_img, proposed, "id_box_height", 2.0, 6.0, steps=5, context=context
     )
     proposed["id_box_height"] = best_id_box_h
 
     best_id_box_wr = binary_search_parameter(
-        subject, ref_img, proposed, "id_box_width_ratio", 0.4, 0.8, steps=5
+        subject, ref_img, proposed, "id_box_width_ratio", 0.4, 0.8, steps=5, context=context
     )
     proposed["id_box_width_ratio"] = best_id_box_wr
 
     best_border_w = binary_search_parameter(
-        subject, ref_img, proposed, "circle_border_width", 0.3, 2.5, steps=5
+        subject, ref_img, proposed, "circle_border_width", 0.3, 2.5, steps=5, context=context
     )
     proposed["circle_border_width"] = best_border_w
 
     best_id_border_w = binary_search_parameter(
-        subject, ref_img, proposed, "id_box_border_width", 0.3, 2.0, steps=5
+        subject, ref_img, proposed, "id_box_border_width", 0.3, 2.0, steps=5, context=context
     )
     proposed["id_box_border_width"] = best_id_border_w
 
@@ -427,6 +829,59 @@ def auto_tune_icon(
     return proposed, history
 
 
+def tune_subjects(
+    jobs: list[tuple[str, dict]],
+    ref_icons: dict[str, Image.Image],
+    threshold: float = 0.85,
+    workers: int = 1,
+    strategy: str = "search",
+    cache_path: Path | None = None,
+    batch_size: int = SHEET_BATCH_SIZE,
+) -> Iterator[tuple[str, dict, list[dict], TuningStats]]:
+    """
+    Auto-tune several subjects, optionally across worker processes.
+
+    With at least as many subjects as workers, whole subjects are tuned in
+    parallel; otherwise subjects are tuned one at a time and each one's
+    candidate evaluations are spread over the workers.
+
+    Args:
+        jobs: (subject, current_config) pairs; every subject needs a reference image
+        ref_icons: Reference images by subject
+        threshold: Target combined score
+        workers: Number of worker processes (1 = run in this process)
+        strategy: Optimizer strategy (see STRATEGIES)
+        cache_path: Persistent score cache file, or None for in-memory only
+        batch_size: Maximum candidates per sheet (1 = render each alone)
+
+    Yields:
+        (subject, proposed_overrides, history, stats) in job order
+    """
+    if workers <= 1:
+        context = TuningContext(cache=ScoreCache(cache_path), batch_size=batch_size)
+        for subject, config in jobs:
+            proposed, history = auto_tune_icon(
+                subject, ref_icons[subject], config,
+                threshold=threshold, strategy=strategy, context=context,
+            )
+            yield subject, proposed, history, context.stats.get(subject, TuningStats())
+        return
+
+    refs = {subject: ref_icons[subject] for subject, _ in jobs}
+    with TuningPool(refs, workers, cache_path) as pool:
+        if len(jobs) >= workers:
+            for (subject, _), result in zip(jobs, pool.tune(jobs, threshold, strategy, batch_size)):
+                yield subject, *result
+        else:
+            context = TuningContext(pool=pool, cache=ScoreCache(cache_path), batch_size=batch_size)
+            for subject, config in jobs:
+                proposed, history = auto_tune_icon(
+                    subject, refs[subject], config,
+                    threshold=threshold, strategy=strategy, context=context,
+                )
+                yield subject, proposed, history, context.stats.get(subject, TuningStats())
+
+
 def generate_proposed_config(results: dict[str, tuple[dict, list[dict]]]) -> str:
     """
     Generate Python source code for proposed ICON_OVERRIDES.
@@ -5,27 +5,26 @@ Renders generated icons to PIL Images and computes pixel-level
 similarity scores against reference icon crops.
 """
 
-import io
 import logging
-from unittest.mock import patch
 
-import fitz  # PyMuPDF
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
-from pypdf import PdfWriter
-from pypdf.generic import (
-    ArrayObject,
-    DictionaryObject,
-    FloatObject,
-    NameObject,
-    NumberObject,
-    TextStringObject,
-)
 
 from app.services.icon_config import get_icon_config, GEAR_ICONS_DIR
+from app.services.icon_preview import rasterize_icon, rasterize_icon_sheet
 from app.services.icon_renderer import IconRenderer
 
 logger = logging.getLogger(__name__)
 
+# Comparison regions as (x1, y1, x2, y2) fractions of the icon image
+REGIONS = {
+    "id_box": (0.0, 0.0, 1.0, 0.15),
+    "circle": (0.0, 0.10, 1.0, 0.95),
+    "brand_zone": (0.1, 0.15, 0.9, 0.35),
+    "image_zone": (0.1, 0.30, 0.9, 0.70),
+    "model_zone": (0.1, 0.70, 0.9, 0.90),
+}
+
 # Shared renderer instance
 _renderer: IconRenderer | None = None
 
@@ -48,127 +47,90 @@ def render_icon_to_image(
     """
     Render a generated icon to a PIL Image.
 
-    Creates a PDF with the icon annotation, renders via PyMuPDF,
-    and crops to the annotation area.
+    Draws the icon straight into an in-memory page sized to the icon plus
+    room for the ID box above and model text below; no PDF is written.
 
     Args:
         subject: Deployment subject name
-        config_override: Optional parameter overrides for get_icon_config
-        rect: Annotation rect [x1, y1, x2, y2], defaults to standard test rect
+        config_override: Optional parameter overrides applied on top of
+            get_icon_config(subject)
+        rect: Annotation rect [x1, y1, x2, y2]; only its size is used.
+            Defaults to the standard 25x30 pt test rect
         id_label: ID label text for the icon
         dpi: Rendering resolution
 
     Returns:
-        Cropped PIL Image of the rendered icon, or None on failure
+        PIL Image of the rendered icon, or None on failure
     """
     if rect is None:
         rect = [100.0, 700.0, 125.0, 730.0]
 
-    renderer = _get_renderer()
-
-    # Get base config for annotation colors
     base_config = get_icon_config(subject)
     if not base_config:
         logger.warning(f"No config for subject: {subject}")
         return None
+    config = {**base_config, **(config_override or {})}
 
     try:
-        if config_override:
-            original_get_config = get_icon_config
-
-            def mock_get_config(subj: str) -> dict:
-                config = original_get_config(subj)
-                if subj == subject and config:
-                    config.update(config_override)
-                return config
-
-            with patch("app.services.icon_renderer.get_icon_config", side_effect=mock_get_config):
-                return _render_and_capture(renderer, subject, rect, id_label, base_config, dpi)
-        else:
-            return _render_and_capture(renderer, subject, rect, id_label, base_config, dpi)
-
+        return rasterize_icon(
+            _get_renderer(),
+            subject,
+            config,
+            scale=dpi / 72.0,
+            id_label=id_label,
+            icon_size=(rect[2] - rect[0], rect[3] - rect[1]),
+        )
     except Exception:
         logger.exception(f"Failed to render icon: {subject}")
         return None
 
 
-def _render_and_capture(
-    renderer: IconRenderer,
+def render_icons_to_images(
     subject: str,
-    rect: list[float],
-    id_label: str,
-    config: dict,
-    dpi: int,
-) -> Image.Image | None:
-    """Internal: render icon to PDF, capture as image, crop to rect."""
-    writer = PdfWriter()
-    writer.add_blank_page(612, 792)
-    page = writer.pages[0]
+    config_overrides: list[dict],
+    rect: list[float] | None = None,
+    id_label: str = "test",
+    dpi: int = 300,
+) -> list[Image.Image | None]:
+    """
+    Render several configs of one icon as a single sheet.
 
-    appearance_ref = renderer.render_icon(writer, subject, rect, id_label=id_label)
-    if not appearance_ref:
-        return None
+    Batch counterpart of render_icon_to_image: every candidate gets a page
+    in one shared document, so fonts and the gear image are embedded once.
 
-    # Create annotation (mirrors test_icon_render.py)
-    annot = DictionaryObject()
-    annot[NameObject("/Type")] = NameObject("/Annot")
-    annot[NameObject("/Subtype")] = NameObject("/Circle")
-    annot[NameObject("/Rect")] = ArrayObject([
-        FloatObject(rect[0]),
-        FloatObject(rect[1]),
-        FloatObject(rect[2]),
-        FloatObject(rect[3]),
-    ])
-    annot[NameObject("/Subj")] = TextStringObject(subject)
-    annot[NameObject("/F")] = NumberObject(4)
-
-    circle_color = config.get("circle_color", (0.5, 0.5, 0.5))
-    annot[NameObject("/IC")] = ArrayObject([
-        FloatObject(circle_color[0]),
-        FloatObject(circle_color[1]),
-        FloatObject(circle_color[2]),
-    ])
-
-    ap = DictionaryObject()
-    ap[NameObject("/N")] = appearance_ref
-    annot[NameObject("/AP")] = ap
-
-    page[NameObject("/Annots")] = ArrayObject([annot])
-
-    # Write to buffer
-    buf = io.BytesIO()
-    writer.write(buf)
-    buf.seek(0)
-
-    # Render with PyMuPDF
-    doc = fitz.open(stream=buf.read(), filetype="pdf")
-    fitz_page = doc[0]
-    zoom = dpi / 72.0
-    mat = fitz.Matrix(zoom, zoom)
-    pix = fitz_page.get_pixmap(matrix=mat)
-    full_img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
-    doc.close()
-
-    # Crop to annotation rect (PDF y-axis is bottom-up, image is top-down)
-    page_height = 792.0
-    x1, y1, x2, y2 = rect
-
-    # Convert PDF coords to image coords
-    img_x1 = int(x1 * zoom)
-    img_y1 = int((page_height - y2) * zoom)  # PDF y2 (top) -> image top
-    img_x2 = int(x2 * zoom)
-    img_y2 = int((page_height - y1) * zoom)  # PDF y1 (bottom) -> image bottom
-
-    # Add padding to capture ID box above and model text below
-    padding_y = int(6 * zoom)  # Extra padding for ID box + model text
-    padding_x = int(2 * zoom)
-    img_x1 = max(0, img_x1 - padding_x)
-    img_y1 = max(0, img_y1 - padding_y)
-    img_x2 = min(full_img.width, img_x2 + padding_x)
-    img_y2 = min(full_img.height, img_y2 + padding_y)
-
-    cropped = full_img.crop((img_x1, img_y1, img_x2, img_y2))
-    return cropped
+    Args:
+        subject: Deployment subject name
+        config_overrides: Parameter overrides per candidate, applied on top
+            of get_icon_config(subject)
+        rect: Annotation rect [x1, y1, x2, y2]; only its size is used.
+            Defaults to the standard 25x30 pt test rect
+        id_label: ID label text for the icons
+        dpi: Rendering resolution
+
+    Returns:
+        PIL Image per override in order, or None entries on failure
+    """
+    if rect is None:
+        rect = [100.0, 700.0, 125.0, 730.0]
+
+    base_config = get_icon_config(subject)
+    if not base_config:
+        logger.warning(f"No config for subject: {subject}")
+        return [None] * len(config_overrides)
+    configs = [{**base_config, **override} for override in config_overrides]
+
+    try:
+        return rasterize_icon_sheet(
+            _get_renderer(),
+            subject,
+            configs,
+            scale=dpi / 72.0,
+            id_label=id_label,
+            icon_size=(rect[2] - rect[0], rect[3] - rect[1]),
+        )
+    except Exception:
+        logger.exception(f"Failed to render icon sheet: {subject}")
+        return [None] * len(config_overrides)
 
 
 def _normalize_background(img: Image.Image, bg_color: tuple[int, int, int] = (255, 255, 255)) -> Image.Image:
@@ -185,22 +147,13 @@ def _normalize_background(img: Image.Image, bg_color: tuple[int, int, int] = (25
     Returns:
         Image with normalized background
     """
-    result = img.convert("RGB").copy()
-    pixels = result.load()
-    w, h = result.size
-
-    for y in range(h):
-        for x in range(w):
-            r, g, b = pixels[x, y]
-            lum = 0.299 * r + 0.587 * g + 0.114 * b
-            # Replace near-white and light-gray pixels (background)
-            max_c = max(r, g, b)
-            min_c = min(r, g, b)
-            saturation = max_c - min_c
-            if lum > 200 and saturation < 30:
-                pixels[x, y] = bg_color
-
-    return result
+    pixels = np.array(img.convert("RGB"))
+    channels = pixels.astype(np.int16)
+    lum = channels @ np.array([0.299, 0.587, 0.114])
+    saturation = channels.max(axis=2) - channels.min(axis=2)
+    # Replace near-white and light-gray pixels (background)
+    pixels[(lum > 200) & (saturation < 30)] = bg_color
+    return Image.fromarray(pixels)
 
 
 def _trim_to_content(img: Image.Image, threshold: int = 240) -> Image.Image:
@@ -214,34 +167,81 @@ def _trim_to_content(img: Image.Image, threshold: int = 240) -> Image.Image:
     Returns:
         Trimmed image
     """
-    gray = img.convert("L")
-    w, h = gray.size
-    pixels = gray.load()
-
-    min_x, min_y = w, h
-    max_x, max_y = 0, 0
-
-    for y in range(h):
-        for x in range(w):
-            if pixels[x, y] < threshold:
-                min_x = min(min_x, x)
-                min_y = min(min_y, y)
-                max_x = max(max_x, x)
-                max_y = max(max_y, y)
-
-    if max_x <= min_x or max_y <= min_y:
+    content = np.asarray(img.convert("L")) < threshold
+    rows = np.flatnonzero(content.any(axis=1))
+    cols = np.flatnonzero(content.any(axis=0))
+    if len(rows) == 0 or cols[-1] <= cols[0] or rows[-1] <= rows[0]:
         return img
 
     # Add small padding
     pad = 2
-    min_x = max(0, min_x - pad)
-    min_y = max(0, min_y - pad)
-    max_x = min(w, max_x + pad)
-    max_y = min(h, max_y + pad)
+    w, h = img.size
+    min_x = max(0, int(cols[0]) - pad)
+    min_y = max(0, int(rows[0]) - pad)
+    max_x = min(w, int(cols[-1]) + pad)
+    max_y = min(h, int(rows[-1]) + pad)
 
     return img.crop((min_x, min_y, max_x, max_y))
 
 
+def _prepare(img: Image.Image) -> Image.Image:
+    """Normalize background to white and trim to content."""
+    return _trim_to_content(_normalize_background(img))
+
+
+def _resize_pair(n1: Image.Image, n2: Image.Image) -> tuple[Image.Image, Image.Image]:
+    """Resize two prepared images to a common size of at least 64x64."""
+    target_w = max(n1.width, n2.width, 64)
+    target_h = max(n1.height, n2.height, 64)
+    return (
+        n1.resize((target_w, target_h), Image.LANCZOS),
+        n2.resize((target_w, target_h), Image.LANCZOS),
+    )
+
+
+def _to_arrays(img1: Image.Image, img2: Image.Image) -> tuple[np.ndarray, np.ndarray]:
+    """RGB pixel arrays with room for signed differences."""
+    return (
+        np.asarray(img1.convert("RGB"), dtype=np.int16),
+        np.asarray(img2.convert("RGB"), dtype=np.int16),
+    )
+
+
+def _nmae(a1: np.ndarray, a2: np.ndarray) -> float:
+    """Mean absolute difference of two equally sized arrays, scaled to 0-1."""
+    if a1.size == 0:
+        return 0.0
+    return float(np.abs(a1 - a2).mean() / 255.0)
+
+
+def _histogram_similarity(n1: Image.Image, n2: Image.Image) -> float:
+    """Histogram intersection of two prepared images at 64x64."""
+    h1 = np.array(n1.resize((64, 64), Image.LANCZOS).convert("RGB").histogram())
+    h2 = np.array(n2.resize((64, 64), Image.LANCZOS).convert("RGB").histogram())
+
+    total = h1.sum()
+    if total == 0:
+        return 0.0
+    return float(np.minimum(h1, h2).sum() / total)
+
+
+def _region_similarity(r1: Image.Image, r2: Image.Image) -> dict[str, float]:
+    """
+    Per-region 1 - NMAE of two equally sized images.
+
+    Each region crop is normalized and trimmed again before comparing, so
+    a region is scored on its own content rather than its position.
+    """
+    w, h = r1.size
+    scores = {}
+    for name, (rx1, ry1, rx2, ry2) in REGIONS.items():
+        crop_box = (int(rx1 * w), int(ry1 * h), int(rx2 * w), int(ry2 * h))
+        c1 = _prepare(r1.crop(crop_box))
+        c2 = _prepare(r2.crop(crop_box))
+        scores[name] = 1.0 - _nmae(*_to_arrays(*_resize_pair(c1, c2)))
+    return scores
+
+
 def compute_nmae(img1: Image.Image, img2: Image.Image) -> float:
     """
     Compute Normalized Mean Absolute Error between two images.
@@ -255,29 +255,7 @@ def compute_nmae(img1: Image.Image, img2: Image.Image) -> float:
     Returns:
         NMAE score (0 = identical, 1 = maximum difference)
     """
-    # Normalize backgrounds to white and trim to content
-    n1 = _trim_to_content(_normalize_background(img1))
-    n2 = _trim_to_content(_normalize_background(img2))
-
-    # Resize to same dimensions
-    target_w = max(n1.width, n2.width, 64)
-    target_h = max(n1.height, n2.height, 64)
-
-    r1 = n1.resize((target_w, target_h), Image.LANCZOS)
-    r2 = n2.resize((target_w, target_h), Image.LANCZOS)
-
-    p1 = r1.convert("RGB").tobytes()
-    p2 = r2.convert("RGB").tobytes()
-
-    total_diff = 0
-    for a, b in zip(p1, p2):
-        total_diff += abs(a - b)
-
-    num_values = len(p1)
-    if num_values == 0:
-        return 0.0
-
-    return total_diff / (255.0 * num_values)
+    return _nmae(*_to_arrays(*_resize_pair(_prepare(img1), _prepare(img2))))
 
 
 def compute_histogram_similarity(img1: Image.Image, img2: Image.Image) -> float:
@@ -293,24 +271,7 @@ def compute_histogram_similarity(img1: Image.Image, img2: Image.Image) -> float:
     Returns:
         Similarity score (0 = no overlap, 1 = identical histograms)
     """
-    # Normalize and trim before histogram comparison
-    n1 = _trim_to_content(_normalize_background(img1))
-    n2 = _trim_to_content(_normalize_background(img2))
-
-    r1 = n1.resize((64, 64), Image.LANCZOS).convert("RGB")
-    r2 = n2.resize((64, 64), Image.LANCZOS).convert("RGB")
-
-    h1 = r1.histogram()
-    h2 = r2.histogram()
-
-    # Histogram intersection
-    intersection = sum(min(a, b) for a, b in zip(h1, h2))
-    total = sum(h1)
-
-    if total == 0:
-        return 0.0
-
-    return intersection / total
+    return _histogram_similarity(_prepare(img1), _prepare(img2))
 
 
 def compute_region_similarity(
@@ -320,7 +281,7 @@ def compute_region_similarity(
     """
     Compare specific regions of two icon images.
 
-    Regions are defined as percentages of image height:
+    Regions are defined as percentages of image height (see REGIONS):
     - id_box: top 15%
     - circle: 10-95%
     - brand_zone: 15-35%
@@ -334,38 +295,7 @@ def compute_region_similarity(
     Returns:
         Dict of region name -> similarity score (0-1)
     """
-    # Normalize and trim before region comparison
-    n1 = _trim_to_content(_normalize_background(img1))
-    n2 = _trim_to_content(_normalize_background(img2))
-
-    target_w = max(n1.width, n2.width, 64)
-    target_h = max(n1.height, n2.height, 64)
-
-    r1 = n1.resize((target_w, target_h), Image.LANCZOS)
-    r2 = n2.resize((target_w, target_h), Image.LANCZOS)
-
-    regions = {
-        "id_box": (0.0, 0.0, 1.0, 0.15),
-        "circle": (0.0, 0.10, 1.0, 0.95),
-        "brand_zone": (0.1, 0.15, 0.9, 0.35),
-        "image_zone": (0.1, 0.30, 0.9, 0.70),
-        "model_zone": (0.1, 0.70, 0.9, 0.90),
-    }
-
-    scores = {}
-    for name, (rx1, ry1, rx2, ry2) in regions.items():
-        crop_box = (
-            int(rx1 * target_w),
-            int(ry1 * target_h),
-            int(rx2 * target_w),
-            int(ry2 * target_h),
-        )
-        c1 = r1.crop(crop_box)
-        c2 = r2.crop(crop_box)
-        nmae = compute_nmae(c1, c2)
-        scores[name] = 1.0 - nmae
-
-    return scores
+    return _region_similarity(*_resize_pair(_prepare(img1), _prepare(img2)))
 
 
 def compute_similarity(
@@ -375,6 +305,9 @@ def compute_similarity(
     """
     Compute combined similarity metrics between reference and generated icons.
 
+    Each image is normalized, trimmed and resized once; all metrics
+    share the result.
+
     Args:
         ref_img: Reference icon image
         gen_img: Generated icon image
@@ -382,9 +315,12 @@ def compute_similarity(
     Returns:
         Dict with 'nmae', 'histogram', 'region_scores', 'region_avg', 'combined' keys
     """
-    nmae = compute_nmae(ref_img, gen_img)
-    histogram = compute_histogram_similarity(ref_img, gen_img)
-    region_scores = compute_region_similarity(ref_img, gen_img)
+    n1, n2 = _prepare(ref_img), _prepare(gen_img)
+    r1, r2 = _resize_pair(n1, n2)
+
+    nmae = _nmae(*_to_arrays(r1, r2))
+    histogram = _histogram_similarity(n1, n2)
+    region_scores = _region_similarity(r1, r2)
 
     region_avg = sum(region_scores.values()) / max(len(region_scores), 1)
 
@@ -427,21 +363,13 @@ def create_comparison_image(
 
     # Create diff image
     diff_w = max(ref_w, gen_w)
-    diff_ref = ref_img.resize((diff_w, target_h), Image.LANCZOS).convert("RGB")
-    diff_gen = gen_img.resize((diff_w, target_h), Image.LANCZOS).convert("RGB")
-
-    diff_img = Image.new("RGB", (diff_w, target_h))
-    ref_px = diff_ref.load()
-    gen_px = diff_gen.load()
-    diff_px = diff_img.load()
-
-    for y in range(target_h):
-        for x in range(diff_w):
-            r = abs(ref_px[x, y][0] - gen_px[x, y][0])
-            g = abs(ref_px[x, y][1] - gen_px[x, y][1])
-            b = abs(ref_px[x, y][2] - gen_px[x, y][2])
-            # Amplify differences
-            diff_px[x, y] = (min(255, r * 3), min(255, g * 3), min(255, b * 3))
+    diff_ref = ref_img.resize((diff_w, target_h), Image.LANCZOS)
+    diff_gen = gen_img.resize((diff_w, target_h), Image.LANCZOS)
+    ref_px, gen_px = _to_arrays(diff_ref, diff_gen)
+
+    # Amplify differences
+    diff = np.minimum(np.abs(ref_px - gen_px) * 3, 255).astype(np.uint8)
+    diff_img = Image.fromarray(diff)
 
     # Layout: header + [reference | generated | diff]
     header_height = 50
@@ -3,20 +3,169 @@ Reference PDF icon extraction.
 
 Renders reference deployment PDF pages to images and extracts
 individual icon crops using threshold-based blob detection.
+
+Rendered pages and extracted crops are cached on disk (ReferenceCache),
+keyed by the PDF's content hash, the DPI and the detection parameters,
+so repeated tuner runs skip rasterization and detection.
 """
 
+import hashlib
+import json
 import logging
+import os
+import shutil
 from pathlib import Path
 
 import fitz  # PyMuPDF
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
-from scripts.icon_tuner.region_config import REFERENCE_REGIONS, REFERENCE_PDF_DIR
+from scripts.icon_tuner.region_config import (
+    REFERENCE_CACHE_DIR,
+    REFERENCE_PDF_DIR,
+    REFERENCE_REGIONS,
+)
 
 logger = logging.getLogger(__name__)
 
+# Bump when rendering or detection changes so cached crops are ignored
+EXTRACTOR_VERSION = 1
+
+# detect_icon_regions arguments used for reference extraction
+DETECTION_PARAMS = {"min_size": 40, "merge_distance": 5, "luminance_threshold": 200}
+
 # Cache extracted icons to avoid re-rendering
-_icon_cache: dict[str, dict[str, Image.Image]] = {}
+_icon_cache: dict[tuple[str, int], dict[str, Image.Image]] = {}
+
+
+class ReferenceCache:
+    """
+    On-disk cache of rendered reference pages and extracted icon crops.
+
+    Layout:
+        pages/<pdf_hash>-<dpi>.png         Rendered first page
+        crops/<key>/manifest.json          {"subjects": {subject: file}}
+        crops/<key>/<n>.png                One crop per subject
+
+    Crop keys cover the PDF hash, DPI, detection parameters and the PDF's
+    region config entries, so editing any of them re-extracts.
+    """
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Directory for cache entries (created on first write)
+        """
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def pdf_hash(pdf_path: Path) -> str:
+        """Content hash of a PDF file."""
+        return hashlib.sha256(pdf_path.read_bytes()).hexdigest()[:32]
+
+    def crops_key(self, pdf_hash: str, dpi: int, entries: list) -> str:
+        """
+        Build the cache key for a PDF's extracted crops.
+
+        Args:
+            pdf_hash: pdf_hash() of the reference PDF
+            dpi: Rendering resolution
+            entries: The PDF's REFERENCE_REGIONS entries
+
+        Returns:
+            Hex digest identifying the crops
+        """
+        canonical = json.dumps(
+            {
+                "version": EXTRACTOR_VERSION,
+                "pdf": pdf_hash,
+                "dpi": dpi,
+                "detection": DETECTION_PARAMS,
+                "entries": entries,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+    def get_page(self, pdf_hash: str, dpi: int) -> Image.Image | None:
+        """Load a rendered page, or None on a miss."""
+        path = self._page_path(pdf_hash, dpi)
+        try:
+            with Image.open(path) as img:
+                return img.convert("RGB")
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Ignoring unreadable cached page {path.name}: {e}")
+            return None
+
+    def put_page(self, pdf_hash: str, dpi: int, img: Image.Image) -> None:
+        """Store a rendered page atomically."""
+        path = self._page_path(pdf_hash, dpi)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.png")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            img.save(tmp_path, compress_level=1)  # Large page; favour speed
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not cache page {path.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def get_crops(self, key: str) -> dict[str, Image.Image] | None:
+        """Load a PDF's extracted crops, or None on a miss."""
+        entry_dir = self.cache_dir / "crops" / key
+        try:
+            manifest = json.loads((entry_dir / "manifest.json").read_text())
+            icons = {}
+            for subject, filename in manifest["subjects"].items():
+                with Image.open(entry_dir / filename) as img:
+                    icons[subject] = img.convert("RGB")
+            return icons
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring corrupt cached crops {key}: {e}")
+            return None
+
+    def put_crops(self, key: str, icons: dict[str, Image.Image]) -> None:
+        """Store a PDF's extracted crops atomically (as one directory)."""
+        entry_dir = self.cache_dir / "crops" / key
+        tmp_dir = entry_dir.with_name(f"{key}.{os.getpid()}.tmp")
+        try:
+            tmp_dir.mkdir(parents=True, exist_ok=True)
+            subjects = {}
+            for index, (subject, img) in enumerate(icons.items()):
+                filename = f"{index:03d}.png"
+                img.save(tmp_dir / filename)
+                subjects[subject] = filename
+            (tmp_dir / "manifest.json").write_text(json.dumps({"subjects": subjects}, indent=2))
+            if entry_dir.exists():
+                shutil.rmtree(entry_dir)
+            tmp_dir.rename(entry_dir)
+        except OSError as e:
+            logger.warning(f"Could not cache crops {key}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def clear(self) -> int:
+        """Delete all cached pages and crops and return how many entries were removed."""
+        removed = 0
+        pages_dir = self.cache_dir / "pages"
+        if pages_dir.exists():
+            for path in pages_dir.glob("*.png"):
+                path.unlink(missing_ok=True)
+                removed += 1
+        crops_dir = self.cache_dir / "crops"
+        if crops_dir.exists():
+            for path in crops_dir.iterdir():
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        _icon_cache.clear()
+        return removed
+
+    def _page_path(self, pdf_hash: str, dpi: int) -> Path:
+        return self.cache_dir / "pages" / f"{pdf_hash}-{dpi}.png"
 
 
 def render_pdf_page_to_image(pdf_path: Path, page_num: int = 0, dpi: int = 300) -> Image.Image:
@@ -51,7 +200,9 @@ def detect_icon_regions(
     Detect icon bounding boxes using threshold-based blob detection.
 
     Finds connected regions of non-background pixels and computes
-    bounding boxes around them.
+    bounding boxes around them. Dark pixels are connected to dark pixels
+    one or two steps away horizontally or vertically, so hairline gaps
+    (anti-aliasing, thin light strokes) do not split an icon.
 
     Args:
         image: Rendered PDF page as PIL Image
@@ -62,59 +213,16 @@ def detect_icon_regions(
     Returns:
         List of (x1, y1, x2, y2) bounding boxes, sorted top-to-bottom, left-to-right
     """
-    gray = image.convert("L")
-    width, height = gray.size
-    pixels = gray.load()
-
-    # Find rows that contain dark pixels
-    row_ranges: list[tuple[int, int, int, int]] = []  # (min_x, min_y, max_x, max_y)
-
-    # Scan for dark pixel blobs using row-based approach
-    visited = set()
-
-    def flood_fill_bbox(start_x: int, start_y: int) -> tuple[int, int, int, int]:
-        """BFS flood fill to find bounding box of a connected dark region."""
-        stack = [(start_x, start_y)]
-        min_x, min_y = start_x, start_y
-        max_x, max_y = start_x, start_y
-
-        while stack:
-            x, y = stack.pop()
-            if (x, y) in visited:
-                continue
-            if x < 0 or x >= width or y < 0 or y >= height:
-                continue
-            if pixels[x, y] >= luminance_threshold:
-                continue
-
-            visited.add((x, y))
-            min_x = min(min_x, x)
-            min_y = min(min_y, y)
-            max_x = max(max_x, x)
-            max_y = max(max_y, y)
-
-            # Check neighbors (4-connected with skip for speed)
-            for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1), (2, 0), (-2, 0), (0, 2), (0, -2)]:
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < width and 0 <= ny < height and (nx, ny) not in visited:
-                    if pixels[nx, ny] < luminance_threshold:
-                        stack.append((nx, ny))
-
-        return (min_x, min_y, max_x, max_y)
-
-    # Scan with step for speed (don't need to check every pixel)
-    step = 3
-    for y in range(0, height, step):
-        for x in range(0, width, step):
-            if (x, y) not in visited and pixels[x, y] < luminance_threshold:
-                bbox = flood_fill_bbox(x, y)
-                bw = bbox[2] - bbox[0]
-                bh = bbox[3] - bbox[1]
-                if bw >= min_size and bh >= min_size:
-                    row_ranges.append(bbox)
+    dark = np.asarray(image.convert("L")) < luminance_threshold
+    height, width = dark.shape
+
+    bboxes = [
+        bbox for bbox in _component_bboxes(dark)
+        if bbox[2] - bbox[0] >= min_size and bbox[3] - bbox[1] >= min_size
+    ]
 
     # Merge overlapping/close bounding boxes
-    merged = _merge_bboxes(row_ranges, merge_distance)
+    merged = _merge_bboxes(bboxes, merge_distance)
 
     # Filter by aspect ratio (icons are roughly square or slightly tall)
     filtered = []
@@ -140,48 +248,122 @@ def detect_icon_regions(
     return _sort_regions(padded)
 
 
-def _merge_bboxes(
-    bboxes: list[tuple[int, int, int, int]],
-    gap: int,
-) -> list[tuple[int, int, int, int]]:
-    """Merge bounding boxes that overlap or are within gap pixels of each other."""
-    if not bboxes:
-        return []
+def _component_bboxes(dark: np.ndarray) -> list[tuple[int, int, int, int]]:
+    """
+    Label connected dark regions and return their bounding boxes.
 
-    merged = list(bboxes)
-    changed = True
+    Works on horizontal runs of dark pixels rather than single pixels.
+    Runs are joined when they overlap a run one or two rows below, or
+    are separated from the next run in their row by a single pixel, and
+    components are found by union-find over those joins.
 
-    while changed:
-        changed = False
-        new_merged = []
-        used = set()
+    Args:
+        dark: Boolean (height, width) mask of content pixels
 
-        for i in range(len(merged)):
-            if i in used:
-                continue
-            x1, y1, x2, y2 = merged[i]
+    Returns:
+        (min_x, min_y, max_x, max_y) per component, inclusive, top-to-bottom
+    """
+    height, width = dark.shape
+    edges = np.diff(np.pad(dark, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    ends = np.nonzero(edges == -1)[1]  # Exclusive; same row-major order as starts
+    if len(rows) == 0:
+        return []
 
-            for j in range(i + 1, len(merged)):
-                if j in used:
-                    continue
-                ox1, oy1, ox2, oy2 = merged[j]
+    # Keys that order runs across rows, for locating the runs of another row
+    stride = width + 2
+    start_keys = rows * stride + starts
+    end_keys = rows * stride + ends
+
+    join_a = [np.flatnonzero((rows[1:] == rows[:-1]) & (starts[1:] - ends[:-1] == 1))]
+    join_b = [join_a[0] + 1]
+    for offset in (1, 2):
+        # Runs in row + offset overlapping each run: a contiguous index range
+        target = (rows + offset) * stride
+        first = np.searchsorted(end_keys, target + starts, side="right")
+        last = np.searchsorted(start_keys, target + ends, side="left")
+        counts = np.maximum(last - first, 0)
+        run_index = np.repeat(np.arange(len(rows)), counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        join_a.append(run_index)
+        join_b.append(np.repeat(first, counts) + within)
+
+    labels = _union_find(len(rows), np.concatenate(join_a), np.concatenate(join_b))
+
+    count = labels.max() + 1
+    min_x = np.full(count, width)
+    min_y = np.full(count, height)
+    max_x = np.full(count, -1)
+    max_y = np.full(count, -1)
+    np.minimum.at(min_x, labels, starts)
+    np.minimum.at(min_y, labels, rows)
+    np.maximum.at(max_x, labels, ends - 1)
+    np.maximum.at(max_y, labels, rows)
+
+    order = np.lexsort((min_x, min_y))
+    return [
+        (int(min_x[i]), int(min_y[i]), int(max_x[i]), int(max_y[i]))
+        for i in order
+    ]
+
+
+def _union_find(count: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Connected components of a graph given as edge arrays.
 
-                # Check overlap with gap tolerance
-                if (x1 - gap <= ox2 and x2 + gap >= ox1 and
-                        y1 - gap <= oy2 and y2 + gap >= oy1):
-                    x1 = min(x1, ox1)
-                    y1 = min(y1, oy1)
-                    x2 = max(x2, ox2)
-                    y2 = max(y2, oy2)
-                    used.add(j)
-                    changed = True
+    Returns:
+        Dense component label (0..k-1) for each of the count nodes
+    """
+    parent = np.arange(count)
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        differ = root_a != root_b
+        if not differ.any():
+            break
+        # Hook the larger root under the smaller one, then flatten
+        np.minimum.at(
+            parent,
+            np.maximum(root_a, root_b)[differ],
+            np.minimum(root_a, root_b)[differ],
+        )
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return np.unique(parent, return_inverse=True)[1]
 
-            new_merged.append((x1, y1, x2, y2))
-            used.add(i)
 
-        merged = new_merged
+def _merge_bboxes(
+    bboxes: list[tuple[int, int, int, int]],
+    gap: int,
+) -> list[tuple[int, int, int, int]]:
+    """
+    Merge bounding boxes that overlap or are within gap pixels of each other.
 
-    return merged
+    Sweeps boxes in x order, comparing each only with earlier boxes whose
+    right edge is within reach, and repeats until a pass merges nothing
+    (a merged box can grow into one it was not near before).
+    """
+    merged = sorted(bboxes)
+    while True:
+        result: list[tuple[int, int, int, int]] = []
+        active: list[int] = []  # Indices into result that may still reach later boxes
+
+        for x1, y1, x2, y2 in merged:
+            active = [i for i in active if result[i][2] + gap >= x1]
+            for i in active:
+                ox1, oy1, ox2, oy2 = result[i]
+                if y1 - gap <= oy2 and y2 + gap >= oy1:
+                    result[i] = (min(x1, ox1), min(y1, oy1), max(x2, ox2), max(y2, oy2))
+                    break
+            else:
+                active.append(len(result))
+                result.append((x1, y1, x2, y2))
+
+        if len(result) == len(merged):
+            return result
+        merged = sorted(result)
 
 
 def _sort_regions(
@@ -221,9 +403,38 @@ def _sort_regions(
     return result
 
 
+def render_reference_page(
+    pdf_path: Path,
+    dpi: int = 300,
+    cache_dir: Path | None = REFERENCE_CACHE_DIR,
+) -> Image.Image:
+    """
+    Render a reference PDF's first page, using the disk cache if possible.
+
+    Args:
+        pdf_path: Path to reference PDF
+        dpi: Resolution for rendering
+        cache_dir: ReferenceCache directory, or None to always render
+
+    Returns:
+        PIL Image of the rendered page
+    """
+    if cache_dir is None:
+        return render_pdf_page_to_image(pdf_path, dpi=dpi)
+
+    cache = ReferenceCache(cache_dir)
+    pdf_hash = cache.pdf_hash(pdf_path)
+    page_img = cache.get_page(pdf_hash, dpi)
+    if page_img is None:
+        page_img = render_pdf_page_to_image(pdf_path, dpi=dpi)
+        cache.put_page(pdf_hash, dpi, page_img)
+    return page_img
+
+
 def extract_reference_icons(
     pdf_path: Path,
     dpi: int = 300,
+    cache_dir: Path | None = REFERENCE_CACHE_DIR,
 ) -> dict[str, Image.Image]:
     """
     Extract individual icon images from a reference PDF.
@@ -234,13 +445,14 @@ def extract_reference_icons(
     Args:
         pdf_path: Path to reference PDF
         dpi: Resolution for rendering
+        cache_dir: ReferenceCache directory, or None to bypass the disk cache
 
     Returns:
         Dict mapping subject name -> cropped PIL Image
     """
-    cache_key = str(pdf_path)
-    if cache_key in _icon_cache:
-        return _icon_cache[cache_key]
+    memo_key = (str(pdf_path), dpi)
+    if memo_key in _icon_cache:
+        return _icon_cache[memo_key]
 
     pdf_name = pdf_path.name
     if pdf_name not in REFERENCE_REGIONS:
@@ -251,11 +463,21 @@ def extract_reference_icons(
     subjects = [subject for subject, _ in entries]
     manual_crops = {subject: crop for subject, crop in entries if crop is not None}
 
+    cache = crops_key = None
+    if cache_dir is not None:
+        cache = ReferenceCache(cache_dir)
+        crops_key = cache.crops_key(cache.pdf_hash(pdf_path), dpi, entries)
+        icons = cache.get_crops(crops_key)
+        if icons is not None:
+            logger.debug(f"{pdf_name}: loaded {len(icons)} cached crops")
+            _icon_cache[memo_key] = icons
+            return icons
+
     # Render page
-    page_img = render_pdf_page_to_image(pdf_path, dpi=dpi)
+    page_img = render_reference_page(pdf_path, dpi=dpi, cache_dir=cache_dir)
 
     # Detect regions
-    regions = detect_icon_regions(page_img)
+    regions = detect_icon_regions(page_img, **DETECTION_PARAMS)
 
     logger.info(f"{pdf_name}: detected {len(regions)} regions, expected {len(subjects)}")
 
@@ -276,14 +498,23 @@ def extract_reference_icons(
                 f"(detected {len(regions)}, need {len(subjects)})"
             )
 
-    _icon_cache[cache_key] = icons
+    if cache is not None:
+        cache.put_crops(crops_key, icons)
+    _icon_cache[memo_key] = icons
     return icons
 
 
-def extract_all_reference_icons(dpi: int = 300) -> dict[str, Image.Image]:
+def extract_all_reference_icons(
+    dpi: int = 300,
+    cache_dir: Path | None = REFERENCE_CACHE_DIR,
+) -> dict[str, Image.Image]:
     """
     Extract icons from all reference PDFs.
 
+    Args:
+        dpi: Resolution for rendering
+        cache_dir: ReferenceCache directory, or None to bypass the disk cache
+
     Returns:
         Dict mapping subject name -> cropped PIL Image
     """
@@ -295,7 +526,7 @@ def extract_all_reference_icons(dpi: int = 300) -> dict[str, Image.Image]:
             logger.warning(f"Reference PDF not found: {pdf_path}")
             continue
 
-        icons = extract_reference_icons(pdf_path, dpi=dpi)
+        icons = extract_reference_icons(pdf_path, dpi=dpi, cache_dir=cache_dir)
         all_icons.update(icons)
 
     return all_icons
@@ -324,10 +555,10 @@ def save_annotated_reference(
     subjects = [subject for subject, _ in entries]
 
     # Render page
-    page_img = render_pdf_page_to_image(pdf_path, dpi=dpi)
+    page_img = render_reference_page(pdf_path, dpi=dpi)
 
     # Detect regions
-    regions = detect_icon_regions(page_img)
+    regions = detect_icon_regions(page_img, **DETECTION_PARAMS)
 
     # Draw bounding boxes
     draw = ImageDraw.Draw(page_img)
@@ -15,6 +15,7 @@ _BACKEND_DIR = _SCRIPTS_DIR.parent
 _PROJECT_ROOT = _BACKEND_DIR.parent
 
 REFERENCE_PDF_DIR = _PROJECT_ROOT / "samples" / "icons" / "deploymentIcons"
+REFERENCE_CACHE_DIR = _SCRIPTS_DIR / "icon_tuner_output" / "reference_cache"
 
 # Maps PDF filename -> list of (subject, optional_crop_box) tuples
 # Order: left-to-right, top-to-bottom as they appear in the reference PDF
@@ -0,0 +1,156 @@
+"""
+Persistent score cache for the icon auto-tuner.
+
+Memoizes candidate scores keyed by subject, a hash of the reference
+image and the full canonicalized icon config, so repeated candidates
+(overlapping grid passes, re-tested bisection bounds, re-runs of the
+tuner) are not rendered and compared again.
+
+Entries are appended to a JSON-lines file, one {"key", "score"} object
+per line. Several processes may append to the same file; each entry is
+written with a single write call.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Callable
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Bump when rendering or similarity scoring changes so old scores are ignored.
+# 2: batched sheets render pixel-identical to single candidates
+SCORE_VERSION = 2
+
+
+def reference_hash(img: Image.Image) -> str:
+    """Content hash of a reference image."""
+    digest = hashlib.sha256(f"{img.mode}:{img.size}".encode())
+    digest.update(img.tobytes())
+    return digest.hexdigest()[:32]
+
+
+def metric_name(metric_fn: Callable[[dict], float] | None) -> str:
+    """
+    Name a scoring function for cache keys.
+
+    Args:
+        metric_fn: Scoring function, or None for the "combined" score
+
+    Returns:
+        "combined", or the function's module and qualified name
+
+    Raises:
+        ValueError: For lambdas and nested functions, whose names do not
+            identify what they compute
+    """
+    if metric_fn is None:
+        return "combined"
+    qualname = getattr(metric_fn, "__qualname__", "")
+    if not qualname or "<" in qualname:
+        raise ValueError(
+            f"Scoring function {metric_fn!r} must be a module-level function to be cached"
+        )
+    return f"{metric_fn.__module__}.{qualname}"
+
+
+class ScoreCache:
+    """
+    Memo of candidate scores, optionally backed by a JSON-lines file.
+
+    Usage:
+        cache = ScoreCache(OUTPUT_DIR / "score_cache.jsonl")
+        key = cache.key(subject, reference_hash(ref_img), config)
+        score = cache.get(key)
+    """
+
+    def __init__(self, path: Path | None = None):
+        """
+        Initialize cache, loading existing entries.
+
+        Args:
+            path: JSON-lines file to load from and append to, or None to
+                keep scores in memory only
+        """
+        self.path = path
+        self._scores: dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+        if path is not None and path.exists():
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self._scores[entry["key"]] = float(entry["score"])
+                    except (ValueError, KeyError, TypeError):
+                        continue  # Partial line from an interrupted run
+            logger.debug(f"Loaded {len(self._scores)} cached scores from {path}")
+
+    def key(
+        self,
+        subject: str,
+        ref_hash: str,
+        config: dict[str, Any],
+        metric: str = "combined",
+    ) -> str:
+        """
+        Build the cache key for a candidate.
+
+        Args:
+            subject: Deployment subject name
+            ref_hash: reference_hash() of the reference image
+            config: Full icon config the candidate renders with
+            metric: metric_name() of the scoring function
+
+        Returns:
+            Hex digest identifying the score
+        """
+        canonical = json.dumps(
+            {
+                "version": SCORE_VERSION,
+                "subject": subject,
+                "reference": ref_hash,
+                "config": config,
+                "metric": metric,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> float | None:
+        """Return a cached score or None."""
+        score = self._scores.get(key)
+        if score is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return score
+
+    def put(self, key: str, score: float) -> None:
+        """Record a score, appending it to the cache file if there is one."""
+        self._scores[key] = score
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"key": key, "score": score}) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write score cache {self.path}: {e}")
+
+    def clear(self) -> int:
+        """Forget all scores, deleting the cache file. Returns how many were removed."""
+        removed = len(self._scores)
+        self._scores.clear()
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._scores)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Report embedded-image savings from the gear image preprocessing pipeline.
+
+For every PNG under samples/icons/gearIcons, compares the deflated size
+and compression time at native resolution against the prepared image
+(resampled to the configured max DPI for the on-map compound icon size).
+
+Usage:
+    python scripts/report_gear_image_savings.py
+    python scripts/report_gear_image_savings.py --dpi 300 --ratio 0.7
+"""
+
+import argparse
+import sys
+import time
+import zlib
+from pathlib import Path
+
+# Add backend to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image
+
+from app.config import settings
+from app.services.icon_config import GEAR_ICONS_DIR
+from app.services.icon_renderer import IconRenderer
+from app.services.image_pipeline import flatten_image, prepare_image
+
+BG_COLOR = (0.22, 0.34, 0.65)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report gear image preprocessing savings")
+    parser.add_argument(
+        "--dpi", type=int, default=settings.gear_image_max_dpi,
+        help=f"Max effective DPI (default: {settings.gear_image_max_dpi})",
+    )
+    parser.add_argument(
+        "--ratio", type=float, default=1.0,
+        help="img_scale_ratio used to size the icon image (default: 1.0, the upper bound)",
+    )
+    args = parser.parse_args()
+
+    renderer = IconRenderer(GEAR_ICONS_DIR, max_image_dpi=args.dpi)
+    extent_pt = renderer.image_extent_pt(
+        {"img_scale_ratio": args.ratio}, renderer.COMPOUND_RENDER_SCALE
+    )
+    print(f"Gear icons: {GEAR_ICONS_DIR}")
+    print(f"Drawn extent: {extent_pt:.1f}pt at {args.dpi} DPI\n")
+    print(f"{'Image':<50} {'Native':>11} {'Prepared':>11} {'Native B':>10} {'Prepared B':>10} {'Saved':>7}")
+    print("-" * 104)
+
+    total_native = total_prepared = 0
+    total_native_ms = total_prepared_ms = 0.0
+
+    for path in sorted(GEAR_ICONS_DIR.rglob("*.png")):
+        with Image.open(path) as img:
+            rgb = flatten_image(img, (56, 87, 166))
+            start = time.perf_counter()
+            native_size = len(zlib.compress(rgb.tobytes()))
+            total_native_ms += (time.perf_counter() - start) * 1000
+            native_dims = f"{img.width}x{img.height}"
+
+        start = time.perf_counter()
+        prepared = prepare_image(path, BG_COLOR, extent_pt, args.dpi)
+        total_prepared_ms += (time.perf_counter() - start) * 1000
+
+        total_native += native_size
+        total_prepared += len(prepared.data)
+        saved = 100 * (1 - len(prepared.data) / native_size) if native_size else 0.0
+        name = str(path.relative_to(GEAR_ICONS_DIR))
+        prepared_dims = f"{prepared.width}x{prepared.height}"
+        print(
+            f"{name[:50]:<50} {native_dims:>11} {prepared_dims:>11} "
+            f"{native_size:>10,} {len(prepared.data):>10,} {saved:>6.1f}%"
+        )
+
+    if total_native:
+        print("-" * 104)
+        print(
+            f"Total embedded bytes: {total_native:,} native -> {total_prepared:,} prepared "
+            f"({100 * (1 - total_prepared / total_native):.1f}% smaller)"
+        )
+        print(
+            f"Per-embed deflate: {total_native_ms:.0f}ms native (paid on every embed) vs "
+            f"{total_prepared_ms:.0f}ms prepared (paid once, then cached)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,16 @@ Usage:
     python scripts/run_icon_tuner.py compare --all
     python scripts/run_icon_tuner.py tune "AP - Cisco MR36H"
     python scripts/run_icon_tuner.py tune --category APs
-    python scripts/run_icon_tuner.py tune --all
+    python scripts/run_icon_tuner.py tune --all --workers 8
+    python scripts/run_icon_tuner.py tune --category APs --strategy descent
     python scripts/run_icon_tuner.py extract-regions
     python scripts/run_icon_tuner.py extract-colors
+    python scripts/run_icon_tuner.py clear-cache [--references | --scores]
 """
 
 import argparse
 import logging
+import os
 import sys
 from pathlib import Path
 
@@ -23,9 +26,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.services.icon_config import get_icon_config, ICON_CATEGORIES
 from scripts.icon_tuner.auto_tuner import (
-    auto_tune_icon,
+    SHEET_BATCH_SIZE,
+    STRATEGIES,
     extract_dominant_circle_color,
     generate_proposed_config,
+    tune_subjects,
 )
 from scripts.icon_tuner.icon_comparator import (
     compute_similarity,
@@ -33,19 +38,23 @@ from scripts.icon_tuner.icon_comparator import (
     render_icon_to_image,
 )
 from scripts.icon_tuner.reference_extractor import (
+    ReferenceCache,
     extract_all_reference_icons,
     extract_reference_icons,
     save_annotated_reference,
 )
 from scripts.icon_tuner.region_config import (
+    REFERENCE_CACHE_DIR,
     REFERENCE_PDF_DIR,
     REFERENCE_REGIONS,
     get_all_subjects,
 )
+from scripts.icon_tuner.score_cache import ScoreCache
 
 OUTPUT_DIR = Path(__file__).parent / "icon_tuner_output"
 COMPARISONS_DIR = OUTPUT_DIR / "comparisons"
 REPORTS_DIR = OUTPUT_DIR / "reports"
+SCORE_CACHE_PATH = OUTPUT_DIR / "score_cache.jsonl"
 
 
 def setup_logging(verbose: bool = False):
@@ -176,11 +185,9 @@ def cmd_tune(args):
     print(f"Auto-tuning {len(subjects)} icon(s)...")
     ref_icons = extract_all_reference_icons()
 
-    all_results: dict[str, tuple[dict, list[dict]]] = {}
-
+    jobs: list[tuple[str, dict]] = []
     for subject in subjects:
-        ref_img = ref_icons.get(subject)
-        if ref_img is None:
+        if ref_icons.get(subject) is None:
             print(f"  SKIP {subject}: no reference image")
             continue
 
@@ -189,11 +196,22 @@ def cmd_tune(args):
             print(f"  SKIP {subject}: no config")
             continue
 
-        print(f"\n  Tuning: {subject}")
-        proposed, history = auto_tune_icon(
-            subject, ref_img, config,
-            threshold=args.threshold,
-        )
+        jobs.append((subject, config))
+
+    all_results: dict[str, tuple[dict, list[dict]]] = {}
+
+    results = tune_subjects(
+        jobs, ref_icons,
+        threshold=args.threshold,
+        workers=args.workers,
+        strategy=args.strategy,
+        cache_path=None if args.no_cache else SCORE_CACHE_PATH,
+        batch_size=args.batch_size,
+    )
+    total_evaluations = total_renders = 0
+    for subject, proposed, history, stats in results:
+        ref_img = ref_icons[subject]
+        print(f"\n  Tuned: {subject}")
 
         if history:
             baseline = history[0]["score"]
@@ -202,6 +220,12 @@ def cmd_tune(args):
             print(f"    Score: {baseline:.3f} -> {final:.3f} ({improvement:+.3f})")
         else:
             print("    No improvement found")
+        print(
+            f"    Evaluations ({args.strategy}): {stats.evaluations} "
+            f"({stats.renders} rendered, {stats.evaluations - stats.renders} cached)"
+        )
+        total_evaluations += stats.evaluations
+        total_renders += stats.renders
 
         all_results[subject] = (proposed, history)
 
@@ -223,6 +247,7 @@ def cmd_tune(args):
 
         print("\n--- Summary ---")
         print(f"Icons tuned: {len(all_results)}")
+        print(f"Evaluations: {total_evaluations} ({total_renders} rendered)")
         print(f"Proposed config saved to: {config_path}")
         print(f"Comparison images saved to: {COMPARISONS_DIR}")
 
@@ -296,6 +321,19 @@ def cmd_extract_colors(args):
     print(f"\nReport saved to: {report_path}")
 
 
+def cmd_clear_cache(args):
+    """Delete cached reference renders/crops and tuner scores."""
+    both = not (args.references or args.scores)
+
+    if args.references or both:
+        removed = ReferenceCache(REFERENCE_CACHE_DIR).clear()
+        print(f"Removed {removed} cached reference page(s)/crop set(s) from {REFERENCE_CACHE_DIR}")
+
+    if args.scores or both:
+        removed = ScoreCache(SCORE_CACHE_PATH).clear()
+        print(f"Removed {removed} cached score(s) from {SCORE_CACHE_PATH}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Icon visual verification and auto-tuning tool",
@@ -320,6 +358,22 @@ def main():
         "--threshold", type=float, default=0.85,
         help="Target combined score (default: 0.85)",
     )
+    tune_parser.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count() or 1,
+        help="Worker processes for subjects and candidate scoring (default: CPU count)",
+    )
+    tune_parser.add_argument(
+        "--strategy", choices=STRATEGIES, default="search",
+        help="search: bisection and offset grids; descent: coordinate descent (fewer renders)",
+    )
+    tune_parser.add_argument(
+        "--batch-size", type=int, default=SHEET_BATCH_SIZE,
+        help=f"Candidates rendered per sheet; 1 renders each alone (default: {SHEET_BATCH_SIZE})",
+    )
+    tune_parser.add_argument(
+        "--no-cache", action="store_true",
+        help=f"Do not read or write the persistent score cache ({SCORE_CACHE_PATH.name})",
+    )
     tune_parser.set_defaults(func=cmd_tune)
 
     # extract-regions
@@ -334,6 +388,18 @@ def main():
     )
     colors_parser.set_defaults(func=cmd_extract_colors)
 
+    # clear-cache
+    clear_parser = subparsers.add_parser(
+        "clear-cache", help="Delete cached reference renders/crops and tuner scores",
+    )
+    clear_parser.add_argument(
+        "--references", action="store_true", help="Only clear rendered pages and crops",
+    )
+    clear_parser.add_argument(
+        "--scores", action="store_true", help="Only clear the candidate score cache",
+    )
+    clear_parser.set_defaults(func=cmd_clear_cache)
+
     args = parser.parse_args()
     setup_logging(args.verbose)
 
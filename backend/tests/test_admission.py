@@ -0,0 +1,121 @@
+"""Tests for upload and conversion admission control."""
+
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionController
+from app.utils.errors import ServerBusyError
+
+
+def test_admits_up_to_concurrency_limit_in_order():
+    controller = AdmissionController(max_concurrent=2, max_queue=4, queue_timeout=5)
+    order: list[int] = []
+
+    async def job(n: int, release: asyncio.Event):
+        async with controller.admit():
+            order.append(n)
+            await release.wait()
+
+    async def main():
+        releases = [asyncio.Event() for _ in range(4)]
+        tasks = [asyncio.ensure_future(job(n, releases[n])) for n in range(4)]
+        await asyncio.sleep(0.01)
+        assert (controller.active, controller.queued) == (2, 2)
+        assert order == [0, 1]
+
+        releases[1].set()
+        await asyncio.sleep(0.01)
+        assert order == [0, 1, 2]
+
+        for release in releases:
+            release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3]
+    assert controller.active == 0 and controller.reserved_bytes == 0
+    assert controller.admitted == 4
+
+
+def test_memory_budget_limits_large_jobs():
+    controller = AdmissionController(max_concurrent=4, memory_budget_bytes=100, max_queue=4)
+
+    async def main():
+        await controller.acquire(60)
+        waiting = asyncio.ensure_future(controller.acquire(60))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()  # 120 bytes would exceed the budget
+
+        controller.release(60)
+        await waiting
+        assert controller.reserved_bytes == 60
+
+        controller.release(60)
+        await controller.acquire(500)  # Oversized, but admitted when running alone
+        controller.release(500)
+
+    asyncio.run(main())
+
+
+def test_full_queue_rejects_with_429():
+    controller = AdmissionController(max_concurrent=1, max_queue=0)
+
+    async def main():
+        await controller.acquire()
+        with pytest.raises(ServerBusyError) as exc_info:
+            await controller.acquire()
+        controller.release(0)
+        return exc_info.value
+
+    error = asyncio.run(main())
+    assert error.status_code == 429
+    assert error.retry_after >= 1
+    assert controller.stats()["rejected"] == 1
+
+
+def test_queue_timeout_rejects_with_503():
+    controller = AdmissionController(max_concurrent=1, max_queue=2, queue_timeout=0.05)
+
+    async def main():
+        await controller.acquire()
+        with pytest.raises(ServerBusyError) as exc_info:
+            await controller.acquire()
+        assert controller.queued == 0
+        controller.release(0)
+        return exc_info.value
+
+    error = asyncio.run(main())
+    assert error.status_code == 503
+    assert controller.timed_out == 1
+    assert controller.active == 0
+
+
+def test_cancelled_waiter_leaves_queue():
+    controller = AdmissionController(max_concurrent=1, max_queue=2, queue_timeout=5)
+
+    async def main():
+        await controller.acquire()
+        waiting = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert controller.queued == 0
+        controller.release(0)
+
+    asyncio.run(main())
+    assert controller.active == 0
+
+
+def test_retry_after_follows_hold_time():
+    controller = AdmissionController(max_concurrent=2, max_queue=8)
+    assert controller.retry_after() == 1
+
+    async def main():
+        await controller.acquire()
+        controller.release(0, held_seconds=10.0)
+
+    asyncio.run(main())
+    # Average hold of 10s; the new job alone drains in half a round
+    assert controller.retry_after() == 5
@@ -562,6 +562,30 @@ class TestCompoundAnnotationGroup:
             assert annots[0].info.get("subject") == "AP_Deploy"
             doc.close()
 
+    def test_stage_timer_records_stages_and_render_counts(self):
+        """Test that a passed StageTimer receives stage times and render counters."""
+        from app.utils.timing import StageTimer
+
+        mapper = MockMappingParser({"AP_Bid": "AP_Deploy"})
+        replacer = AnnotationReplacer(mapper, MockBTXLoader())
+        timer = StageTimer()
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_pdf = Path(tmpdir) / "input.pdf"
+            output_pdf = Path(tmpdir) / "output.pdf"
+
+            create_test_pdf_with_annotations(input_pdf, [
+                {"subject": "AP_Bid", "x": 100, "y": 200, "width": 50, "height": 50},
+                {"subject": "AP_Bid", "x": 300, "y": 200, "width": 50, "height": 50, "type": "/Square"},
+            ])
+
+            converted, _, _ = replacer.replace_annotations(input_pdf, output_pdf, timer=timer)
+
+        assert converted == 2
+        assert list(timer.stages) == ["read", "render", "annotation_rewrite", "write"]
+        assert timer.stages["render"] <= timer.stages["annotation_rewrite"]
+        assert timer.counters == {"simple:/Circle": 1, "simple:/Square": 1}
+
 
 class TestAnnotationReplacerIntegration:
     """Integration tests with real PDF and mapping files."""
@@ -25,6 +25,64 @@ class TestHealthEndpoint:
         assert "mapping_count" in data
         assert "toolchest_bid_icons" in data
         assert "toolchest_deployment_icons" in data
+        assert "hit_rate" in data["caches"]["icon_images"]
+        assert "queued" in data["executors"]["io"]
+        assert {"active", "queued", "rejected"} <= data["admission"].keys()
+
+
+class TestMetricsEndpoint:
+    """Test suite for /metrics endpoint."""
+
+    @staticmethod
+    def scrape() -> dict[str, float]:
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        samples = {}
+        for line in response.text.splitlines():
+            if line and not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                samples[name] = float(value)
+        return samples
+
+    def test_metrics_exposes_gauges(self):
+        """Test metrics include cache, executor, admission and disk samples."""
+        client.get("/health")  # Runs on the I/O executor
+        samples = self.scrape()
+        assert 'converter_cache_hit_ratio{cache="icon_images"}' in samples
+        assert 'converter_executor_queued{executor="io"}' in samples
+        assert "converter_admission_active" in samples
+        assert 'converter_admission_rejected_total{reason="queue_full"}' in samples
+        assert samples["converter_temp_disk_bytes"] >= 0
+
+    def test_metrics_record_uploads_and_conversions(self):
+        """Test upload sizes and recorded conversions show up in a scrape."""
+        from app.services import converter_metrics
+        from app.utils.timing import StageTimer
+
+        before = self.scrape()
+        client.post(
+            "/api/upload",
+            files={"file": ("fake.pdf", b"This is not a PDF", "application/pdf")},
+        )
+        timer = StageTimer()
+        timer.add("write", 0.02)
+        timer.count("compound:/Circle", 3)
+        converter_metrics.record_conversion(1.5, timer, 3, 1, 2048)
+        after = self.scrape()
+
+        def delta(name: str) -> float:
+            return after.get(name, 0) - before.get(name, 0)
+
+        assert delta("converter_upload_size_bytes_count") == 1
+        assert delta('converter_upload_size_bytes_bucket{le="65536"}') == 1
+        assert delta('converter_conversions_total{status="success"}') == 1
+        assert delta('converter_conversion_stage_seconds_count{stage="write"}') == 1
+        assert delta('converter_conversion_stage_seconds_bucket{stage="write",le="0.025"}') == 1
+        assert delta('converter_annotations_per_map_sum') == 4
+        assert delta('converter_annotations_total{result="skipped"}') == 1
+        assert delta('converter_icons_rendered_total{mode="compound",subtype="/Circle"}') == 3
+        assert delta("converter_output_size_bytes_sum") == 2048
 
 
 class TestRootEndpoint:
@@ -73,6 +131,23 @@ class TestUploadEndpoint:
         assert response.status_code == 400
         assert "not a valid PDF" in response.json()["detail"]
 
+    def test_upload_rejected_when_server_busy(self):
+        """Test upload returns 429 with Retry-After when the wait queue is full."""
+        from app.services.admission import conversion_admission
+
+        busy = conversion_admission.max_concurrent
+        rejected = conversion_admission.rejected
+        with patch.object(conversion_admission, "active", busy), \
+                patch.object(conversion_admission, "max_queue", 0):
+            response = client.post(
+                "/api/upload",
+                files={"file": ("map.pdf", b"%PDF-1.4 content", "application/pdf")},
+            )
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        assert "busy" in response.json()["detail"]
+        assert conversion_admission.rejected == rejected + 1
+
 
 class TestConvertEndpoint:
     """Test suite for /api/convert endpoint."""
@@ -0,0 +1,212 @@
+"""Tests for the icon auto-tuner's search strategies and scoring."""
+
+import pytest
+
+from scripts.icon_tuner.auto_tuner import (
+    TuningContext,
+    _score_candidates,
+    TuningPool,
+    binary_search_parameter,
+    coordinate_descent,
+    grid_search_offsets,
+    tune_subjects,
+)
+from scripts.icon_tuner.icon_comparator import render_icon_to_image
+from scripts.icon_tuner.score_cache import ScoreCache, metric_name, reference_hash
+
+SUBJECT = "AP - Cisco MR36H"
+
+
+@pytest.fixture(scope="module")
+def ref_img():
+    """A reference that the search should be able to find: a known override."""
+    return render_icon_to_image(SUBJECT, config_override={"img_scale_ratio": 0.8, "img_x_offset": 1.0})
+
+
+@pytest.fixture(scope="module")
+def pool(ref_img):
+    with TuningPool({SUBJECT: ref_img}, workers=2) as pool:
+        yield pool
+
+
+def test_binary_search_parallel_matches_sequential(ref_img, pool):
+    args = (SUBJECT, ref_img, {}, "img_scale_ratio", 0.3, 2.0)
+
+    sequential = binary_search_parameter(*args, steps=3)
+    parallel = binary_search_parameter(*args, steps=3, context=TuningContext(pool=pool))
+
+    assert parallel == sequential
+
+
+def test_grid_search_parallel_matches_sequential(ref_img, pool):
+    args = (SUBJECT, ref_img, {"img_scale_ratio": 0.8}, "img_x_offset", "img_y_offset", (-2.0, 2.0), (-1.0, 1.0))
+
+    sequential = grid_search_offsets(*args, coarse_step=1.0, fine_step=0.5)
+    parallel = grid_search_offsets(*args, coarse_step=1.0, fine_step=0.5, context=TuningContext(pool=pool))
+
+    assert parallel == sequential == (1.0, 0.0)
+
+
+def test_pool_scores_in_candidate_order(pool):
+    overrides = [{"img_scale_ratio": 0.8, "img_x_offset": x} for x in (-2.0, 1.0, 0.0)]
+
+    scores = pool.score(SUBJECT, overrides)
+
+    assert len(scores) == 3
+    assert scores[1] == max(scores)
+    assert pool.score(SUBJECT, overrides) == scores
+
+
+def test_pool_spreads_candidates_over_workers(pool, monkeypatch):
+    overrides = [{"img_scale_ratio": 0.8, "img_x_offset": x} for x in (-2.0, -1.0, 0.0, 1.0, 2.0)]
+    submitted = []
+    executor_map = pool._executor.map
+
+    def record_map(fn, subjects, chunks, *args):
+        submitted.extend(chunks)
+        return executor_map(fn, subjects, chunks, *args)
+
+    monkeypatch.setattr(pool._executor, "map", record_map)
+
+    scores = pool.score(SUBJECT, overrides, batch_size=64)
+
+    assert [len(chunk) for chunk in submitted] == [3, 2]
+    assert len(scores) == 5
+
+
+def test_tuning_history_does_not_depend_on_workers(ref_img):
+    # A single subject on several workers spreads its candidates over the pool
+    jobs = [(SUBJECT, {})]
+    args = ({SUBJECT: ref_img},)
+    kwargs = {"threshold": 1.0, "strategy": "descent", "batch_size": 4}
+
+    sequential = list(tune_subjects(jobs, *args, workers=1, **kwargs))
+    parallel = list(tune_subjects(jobs, *args, workers=3, **kwargs))
+
+    assert [(proposed, history) for _, proposed, history, _ in parallel] == [
+        (proposed, history) for _, proposed, history, _ in sequential
+    ]
+
+
+def test_sheet_scores_match_single_renders(ref_img):
+    overrides = [
+        {"img_scale_ratio": scale, "img_x_offset": x}
+        for scale in (0.6, 0.8, 1.0)
+        for x in (-1.0, 0.0, 1.0)
+    ]
+
+    single = _score_candidates(SUBJECT, ref_img, overrides, batch_size=1)
+    batched = _score_candidates(SUBJECT, ref_img, overrides, batch_size=4)
+
+    assert batched == single
+    assert batched.index(max(batched)) == single.index(max(single)) == 5
+
+
+def test_grid_search_batched_matches_unbatched(ref_img):
+    args = (SUBJECT, ref_img, {"img_scale_ratio": 0.8}, "img_x_offset", "img_y_offset", (-2.0, 2.0), (-1.0, 1.0))
+
+    unbatched = grid_search_offsets(*args, context=TuningContext(batch_size=1))
+    batched = grid_search_offsets(*args, context=TuningContext(batch_size=64))
+
+    assert batched == unbatched == (1.0, 0.0)
+
+
+def test_context_renders_repeated_candidates_once(ref_img):
+    context = TuningContext()
+    overrides = [{"img_x_offset": 1.0}, {"img_x_offset": 0.0}, {"img_x_offset": 1.0}]
+
+    first = context.score(SUBJECT, ref_img, {"img_scale_ratio": 0.8}, overrides)
+    again = context.score(SUBJECT, ref_img, {"img_scale_ratio": 0.8}, overrides[:1])
+
+    assert first[0] == first[2] == again[0]
+    assert context.stats[SUBJECT].evaluations == 4
+    assert context.stats[SUBJECT].renders == 2
+
+
+def test_grid_search_skips_overlapping_cells(ref_img):
+    context = TuningContext()
+    grid_search_offsets(
+        SUBJECT, ref_img, {"img_scale_ratio": 0.8}, "img_x_offset", "img_y_offset",
+        (-2.0, 2.0), (-1.0, 1.0), coarse_step=1.0, fine_step=0.5, context=context,
+    )
+
+    stats = context.stats[SUBJECT]
+    # Coarse 5x3 grid, then a 5x5 fine grid around (1, 0) sharing 9 cells with it
+    assert stats.evaluations == 40
+    assert stats.renders == 31
+
+
+def test_score_cache_persists(tmp_path, ref_img):
+    path = tmp_path / "scores.jsonl"
+    overrides = [{"img_scale_ratio": 0.8}]
+
+    scores = TuningContext(cache=ScoreCache(path)).score(SUBJECT, ref_img, {}, overrides)
+    reloaded = TuningContext(cache=ScoreCache(path))
+
+    assert reloaded.score(SUBJECT, ref_img, {}, overrides) == scores
+    assert reloaded.stats[SUBJECT].renders == 0
+    assert len(reloaded.cache) == 1
+
+
+def test_score_cache_key_depends_on_reference_and_config(ref_img):
+    cache = ScoreCache()
+    ref_hash = reference_hash(ref_img)
+    other_hash = reference_hash(ref_img.rotate(90))
+
+    key = cache.key(SUBJECT, ref_hash, {"a": 1, "b": (0.1, 0.2)})
+
+    assert key == cache.key(SUBJECT, ref_hash, {"b": [0.1, 0.2], "a": 1})
+    assert key != cache.key(SUBJECT, other_hash, {"a": 1, "b": (0.1, 0.2)})
+    assert key != cache.key(SUBJECT, ref_hash, {"a": 2, "b": (0.1, 0.2)})
+
+
+def _histogram_score(scores: dict) -> float:
+    return scores["histogram"]
+
+
+def test_metric_name_rejects_unnamed_functions(ref_img):
+    assert metric_name(None) == "combined"
+    assert metric_name(_histogram_score) == f"{__name__}._histogram_score"
+
+    with pytest.raises(ValueError):
+        metric_name(lambda scores: scores["combined"])
+    with pytest.raises(ValueError):
+        TuningContext().score(SUBJECT, ref_img, {}, [{}], lambda scores: scores["histogram"])
+
+
+def test_corrupt_cache_lines_are_skipped(tmp_path):
+    path = tmp_path / "scores.jsonl"
+    path.write_text('{"key": "a", "score": 0.5}\n{"key": "b", "sc')
+
+    cache = ScoreCache(path)
+
+    assert cache.get("a") == 0.5
+    assert cache.get("b") is None
+
+
+def test_coordinate_descent_finds_known_override(ref_img):
+    context = TuningContext()
+    point, score = coordinate_descent(
+        SUBJECT, ref_img, {},
+        {"img_scale_ratio": (0.3, 2.0), "img_x_offset": (-2.0, 2.0)},
+        start={"img_scale_ratio": 1.0, "img_x_offset": 0.0},
+        min_step_ratio=1 / 16,
+        context=context,
+    )
+
+    assert point["img_scale_ratio"] == pytest.approx(0.8, abs=0.11)
+    assert point["img_x_offset"] == pytest.approx(1.0, abs=0.26)
+    assert score > 0.95
+    assert context.stats[SUBJECT].renders < 40
+
+
+def test_tune_subjects_runs_in_job_order(ref_img):
+    # Already above threshold, so each subject stops after its baseline
+    jobs = [(SUBJECT, {}), (SUBJECT, {})]
+    results = list(tune_subjects(jobs, {SUBJECT: ref_img}, threshold=0.0, workers=2))
+
+    assert [subject for subject, _, _, _ in results] == [SUBJECT, SUBJECT]
+    for _, proposed, history, stats in results:
+        assert proposed == {}
+        assert [entry["phase"] for entry in history] == ["baseline"]
+        assert stats.evaluations == 0
@@ -0,0 +1,282 @@
+"""Tests for batch conversion service and endpoint."""
+
+import asyncio
+import io
+import json
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pymupdf
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+from app.main import app
+from app.routers.batch import _AdmittedStreamingResponse
+from app.services.admission import conversion_admission
+from app.services.batch_converter import MANIFEST_NAME, BatchConverter
+from app.services.conversion_context import ConversionContext
+from app.services.file_manager import FileManager
+from app.utils.cache import cache_stats
+from app.utils.errors import BatchTooLargeError
+from app.utils.executors import ManagedExecutor, get_executor
+from tests.test_annotation_replacer import MockBTXLoader, MockMappingParser
+
+
+def make_bid_pdf(subject: str = "AP_Bid") -> bytes:
+    """Create a one-page PDF with a single bid circle annotation."""
+    doc = pymupdf.open()
+    page = doc.new_page(width=612, height=792)
+    annot = page.add_circle_annot(pymupdf.Rect(100, 100, 120, 120))
+    info = annot.info
+    info["subject"] = subject
+    annot.set_info(info)
+    annot.update()
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+def read_zip(chunks) -> zipfile.ZipFile:
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+@pytest.fixture
+def executor():
+    executor = ManagedExecutor("batch-test", max_workers=2, register=False)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.fixture
+def batch(tmp_path: Path, executor: ManagedExecutor) -> BatchConverter:
+    context = ConversionContext(
+        mapping_parser=MockMappingParser({"AP_Bid": "AP_Deployment"}),
+        btx_loader=MockBTXLoader(),
+    )
+    return BatchConverter(
+        context, max_workers=2, manager=FileManager(tmp_path), executor=executor
+    )
+
+
+class TestBatchConverter:
+    """Tests for BatchConverter."""
+
+    def test_converts_pdfs_into_streamed_zip(self, batch: BatchConverter):
+        batch.add_pdf("zone_a.pdf", make_bid_pdf())
+        batch.add_pdf("zone_b.pdf", make_bid_pdf())
+
+        archive = read_zip(batch.iter_zip())
+
+        names = archive.namelist()
+        assert names[-1] == MANIFEST_NAME
+        assert set(names[:-1]) == {"zone_a_deployment.pdf", "zone_b_deployment.pdf"}
+        assert archive.read("zone_a_deployment.pdf").startswith(b"%PDF")
+
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+        assert manifest["total_files"] == 2
+        assert manifest["converted_files"] == 2
+        assert [r["source_file"] for r in manifest["results"]] == ["zone_a.pdf", "zone_b.pdf"]
+        assert all(r["annotations_converted"] == 1 for r in manifest["results"])
+
+    def test_conversions_run_on_the_executor(
+        self, batch: BatchConverter, executor: ManagedExecutor
+    ):
+        for zone in "abc":
+            batch.add_pdf(f"zone_{zone}.pdf", make_bid_pdf())
+
+        read_zip(batch.iter_zip())
+
+        assert executor.stats()["completed"] == 3
+        assert list(batch.manager.temp_dir.glob("converted_*.pdf")) == []
+
+    def test_missing_linearizer_reported_in_manifest(self, batch: BatchConverter):
+        batch.add_pdf("zone_a.pdf", make_bid_pdf())
+
+        with patch("app.services.output_optimizer.pikepdf", None), \
+                patch("app.services.conversion_context.settings.linearize_output", True):
+            archive = read_zip(batch.iter_zip())
+
+        entry = json.loads(archive.read(MANIFEST_NAME))["results"][0]
+        assert entry["status"] == "converted"
+        assert entry["linearized"] is False
+        assert "pikepdf" in entry["warning"]
+
+    def test_invalid_pdf_recorded_as_failure(self, batch: BatchConverter):
+        batch.add_pdf("good.pdf", make_bid_pdf())
+        batch.add_pdf("bad.pdf", b"not a pdf")
+
+        archive = read_zip(batch.iter_zip())
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+
+        assert manifest["converted_files"] == 1
+        assert manifest["failed_files"] == 1
+        bad = manifest["results"][1]
+        assert bad["status"] == "failed"
+        assert "not a valid PDF" in bad["error"]
+
+    def test_zip_input_and_duplicate_names(self, batch: BatchConverter):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("north/map.pdf", make_bid_pdf())
+            zf.writestr("south/map.pdf", make_bid_pdf())
+            zf.writestr("notes.txt", "ignored")
+        buf.seek(0)
+
+        batch.add_zip("stages.zip", buf)
+        archive = read_zip(batch.iter_zip())
+
+        assert batch.file_count == 2
+        assert sorted(archive.namelist()) == sorted(
+            ["map_deployment.pdf", "map_deployment (2).pdf", MANIFEST_NAME]
+        )
+
+    def test_max_files_enforced(self, tmp_path: Path):
+        context = ConversionContext(MockMappingParser(), MockBTXLoader())
+        batch = BatchConverter(context, max_files=1, manager=FileManager(tmp_path))
+        batch.add_pdf("one.pdf", make_bid_pdf())
+
+        with pytest.raises(BatchTooLargeError):
+            batch.add_pdf("two.pdf", make_bid_pdf())
+
+
+class TestBatchEndpoint:
+    """Tests for /api/batch/convert."""
+
+    @pytest.fixture(autouse=True)
+    def manager(self, tmp_path: Path):
+        """Store the endpoint's uploads and outputs under tmp_path."""
+        manager = FileManager(tmp_path)
+        with patch("app.services.batch_converter.file_manager", manager):
+            yield manager
+
+    def test_batch_convert_returns_zip(self, manager: FileManager):
+        client = TestClient(app)
+        response = client.post(
+            "/api/batch/convert",
+            files=[
+                ("files", ("zone_a.pdf", make_bid_pdf("Artist - Wi-Fi Access Point"), "application/pdf")),
+                ("files", ("broken.pdf", b"junk", "application/pdf")),
+            ],
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+        assert manifest["converted_files"] == 1
+        assert manifest["failed_files"] == 1
+        assert manifest["results"][0]["download_url"].startswith("/api/download/")
+        assert manager.file_count == 2  # The converted upload and its output
+
+    def test_batch_convert_reports_worker_cache_lookups(self):
+        def lookups() -> int:
+            stats = cache_stats()["icon_images"]
+            return stats["hits"] + stats["misses"]
+
+        client = TestClient(app)
+        before = lookups()
+        response = client.post(
+            "/api/batch/convert",
+            files=[("files", ("zone_a.pdf", make_bid_pdf("Artist - Wi-Fi Access Point"), "application/pdf"))],
+        )
+
+        assert response.status_code == 200
+        # The icon image was looked up in a CPU worker process
+        assert lookups() > before
+
+    def test_batch_convert_releases_admission(self):
+        client = TestClient(app)
+        admitted = conversion_admission.admitted
+        response = client.post(
+            "/api/batch/convert",
+            files=[("files", ("zone_a.pdf", make_bid_pdf(), "application/pdf"))],
+        )
+
+        assert response.status_code == 200
+        assert conversion_admission.admitted == admitted + 1
+        assert conversion_admission.active == 0
+        assert conversion_admission.reserved_bytes == 0
+
+    def test_admission_released_when_response_fails_to_start(self):
+        async def send(message):
+            raise OSError("client went away")
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def respond():
+            await conversion_admission.acquire(1024)
+            response = _AdmittedStreamingResponse(iter([b"never read"]), 1024)
+            scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+            with pytest.raises(ClientDisconnect):
+                await response(scope, receive, send)
+
+        asyncio.run(respond())
+
+        assert conversion_admission.active == 0
+        assert conversion_admission.reserved_bytes == 0
+
+    def test_admission_released_when_response_is_dropped(self):
+        async def drop():
+            await conversion_admission.acquire(1024)
+            _AdmittedStreamingResponse(iter([b"never read"]), 1024)
+            await asyncio.sleep(0)
+
+        asyncio.run(drop())
+
+        assert conversion_admission.active == 0
+        assert conversion_admission.reserved_bytes == 0
+
+    def test_batch_convert_rejected_when_server_busy(self, manager: FileManager):
+        client = TestClient(app)
+        busy = conversion_admission.max_concurrent
+        with patch.object(conversion_admission, "active", busy), \
+                patch.object(conversion_admission, "max_queue", 0):
+            response = client.post(
+                "/api/batch/convert",
+                files=[("files", ("zone_a.pdf", make_bid_pdf(), "application/pdf"))],
+            )
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        # The batch's stored uploads are deleted again
+        assert manager.file_count == 0
+        assert list(manager.temp_dir.glob("*.pdf")) == []
+
+    def test_batch_too_large_discards_uploads(self, manager: FileManager):
+        client = TestClient(app)
+        with patch("app.services.batch_converter.settings.batch_max_files", 1):
+            response = client.post(
+                "/api/batch/convert",
+                files=[
+                    ("files", ("zone_a.pdf", make_bid_pdf(), "application/pdf")),
+                    ("files", ("zone_b.pdf", make_bid_pdf(), "application/pdf")),
+                ],
+            )
+
+        assert response.status_code == 400
+        assert manager.file_count == 0
+        assert list(manager.temp_dir.glob("*.pdf")) == []
+
+    def test_batch_stream_runs_on_io_executor(self):
+        io = get_executor("io")
+        submitted = io.stats()["submitted"]
+        client = TestClient(app)
+        response = client.post(
+            "/api/batch/convert",
+            files=[("files", ("zone_a.pdf", make_bid_pdf(), "application/pdf"))],
+        )
+
+        assert response.status_code == 200
+        # Context load and intake, then at least one chunk, the end and close()
+        assert io.stats()["submitted"] >= submitted + 5
+
+    def test_batch_convert_without_pdfs(self):
+        client = TestClient(app)
+        response = client.post(
+            "/api/batch/convert",
+            files=[("files", ("notes.txt", b"hello", "text/plain"))],
+        )
+        assert response.status_code == 400
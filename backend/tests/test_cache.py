@@ -0,0 +1,84 @@
+"""Tests for byte-bounded LRU cache."""
+
+from app.utils.cache import (
+    ByteLRUCache,
+    HitCounter,
+    cache_stats,
+    counting_lookups,
+    merge_cache_counts,
+)
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = ByteLRUCache("t", max_bytes=10, register=False)
+    cache.put("a", "A", 4)
+    cache.put("b", "B", 4)
+    assert cache.get("a") == "A"  # a is now most recent
+
+    cache.put("c", "C", 4)
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.total_bytes == 8
+    assert cache.evictions == 1
+
+
+def test_replace_updates_accounting():
+    cache = ByteLRUCache("t", max_bytes=10, register=False)
+    cache.put("a", "A", 4)
+    cache.put("a", "A2", 6)
+
+    assert len(cache) == 1
+    assert cache.total_bytes == 6
+
+
+def test_oversized_value_not_stored():
+    cache = ByteLRUCache("t", max_bytes=10, register=False)
+    cache.put("big", "X", 11)
+
+    assert "big" not in cache
+    assert cache.total_bytes == 0
+
+
+def test_stats_and_registry():
+    cache = ByteLRUCache("test_registry_cache", max_bytes=100)
+    cache.put("a", "A", 10)
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache_stats()["test_registry_cache"]
+    assert stats["entries"] == 1
+    assert stats["bytes"] == 10
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_hit_counter_registered():
+    counter = HitCounter("test_hit_counter")
+    counter.hit()
+    counter.hit()
+    counter.miss()
+
+    stats = cache_stats()["test_hit_counter"]
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_rate"] == 0.6667
+
+
+def test_counting_lookups_and_merge():
+    cache = ByteLRUCache("test_counted_cache", max_bytes=10)
+    cache.put("a", "A", 6)
+    cache.get("before")
+
+    with counting_lookups() as changes:
+        cache.get("a")
+        cache.get("missing")
+        cache.put("b", "B", 6)
+
+    assert changes["test_counted_cache"] == {"hits": 1, "misses": 1, "evictions": 1}
+    assert "test_hit_counter" not in changes
+
+    # As if reported by a worker process's copy of the cache
+    merge_cache_counts({**changes, "unknown_cache": {"hits": 1}})
+    stats = cache_stats()["test_counted_cache"]
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 2)
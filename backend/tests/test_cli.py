@@ -0,0 +1,96 @@
+"""Tests for the bulk conversion CLI."""
+
+import json
+from pathlib import Path
+
+from app import cli
+from tests.test_batch_converter import make_bid_pdf
+
+
+def test_bulk_convert_directory_and_resume(tmp_path: Path):
+    input_dir = tmp_path / "maps"
+    (input_dir / "north").mkdir(parents=True)
+    (input_dir / "zone_a.pdf").write_bytes(make_bid_pdf("Artist - Wi-Fi Access Point"))
+    (input_dir / "north" / "stage.pdf").write_bytes(make_bid_pdf("Artist - Wi-Fi Access Point"))
+    output_dir = tmp_path / "out"
+
+    exit_code = cli.main([str(input_dir), str(output_dir), "--workers", "2"])
+
+    assert exit_code == 0
+    assert (output_dir / "zone_a_deployment.pdf").exists()
+    assert (output_dir / "north" / "stage_deployment.pdf").exists()
+    summary = json.loads((output_dir / "summary.json").read_text())
+    assert summary["totals"]["converted"] == 2
+    assert all(f["annotations_converted"] == 1 for f in summary["files"])
+
+    # Second run resumes: nothing is reconverted
+    exit_code = cli.main([str(input_dir), str(output_dir), "--workers", "1"])
+
+    assert exit_code == 0
+    summary = json.loads((output_dir / "summary.json").read_text())
+    assert summary["totals"]["resumed"] == 2
+    assert summary["totals"]["converted"] == 0
+
+
+def test_output_dir_inside_input_dir_is_not_converted(tmp_path: Path):
+    input_dir = tmp_path / "maps"
+    input_dir.mkdir()
+    (input_dir / "zone_a.pdf").write_bytes(make_bid_pdf("Artist - Wi-Fi Access Point"))
+    output_dir = input_dir / "converted"
+
+    assert cli.main([str(input_dir), str(output_dir), "--workers", "1"]) == 0
+    assert cli.main([str(input_dir), str(output_dir), "--workers", "1", "--no-resume"]) == 0
+
+    summary = json.loads((output_dir / "summary.json").read_text())
+    assert summary["totals"]["files"] == 1
+    assert not (output_dir / "converted").exists()
+
+
+_convert_file = cli._convert_file
+
+
+def _convert_and_remove_source(source: str, output: str) -> dict:
+    row = _convert_file(source, output)
+    Path(source).unlink()
+    return row
+
+
+def test_source_removed_mid_run_does_not_abort(tmp_path: Path, monkeypatch):
+    input_dir = tmp_path / "maps"
+    input_dir.mkdir()
+    (input_dir / "zone_a.pdf").write_bytes(make_bid_pdf("Artist - Wi-Fi Access Point"))
+    (input_dir / "zone_b.pdf").write_bytes(make_bid_pdf("Artist - Wi-Fi Access Point"))
+    output_dir = tmp_path / "out"
+    monkeypatch.setattr(cli, "_convert_file", _convert_and_remove_source)
+
+    assert cli.main([str(input_dir), str(output_dir), "--workers", "1"]) == 0
+
+    summary = json.loads((output_dir / "summary.json").read_text())
+    assert summary["totals"]["converted"] == 2
+    state = (output_dir / cli.STATE_FILENAME).read_text().splitlines()
+    assert all(json.loads(line)["source_key"] for line in state)
+
+
+def test_fingerprint_covers_output_options():
+    fingerprint = cli.reference_fingerprint()
+
+    assert cli.reference_fingerprint() == fingerprint
+    assert cli.reference_fingerprint(compact=True) != cli.reference_fingerprint(compact=False)
+    assert cli.reference_fingerprint(linearize=True) != cli.reference_fingerprint(linearize=False)
+    assert cli.reference_fingerprint(suffix="_v2") != fingerprint
+
+
+def test_bulk_convert_failure_sets_exit_code(tmp_path: Path):
+    input_dir = tmp_path / "maps"
+    input_dir.mkdir()
+    (input_dir / "broken.pdf").write_bytes(b"not a pdf")
+    summary_path = tmp_path / "report.csv"
+
+    exit_code = cli.main([
+        str(input_dir), str(tmp_path / "out"), "--workers", "1", "--summary", str(summary_path),
+    ])
+
+    assert exit_code == 1
+    lines = summary_path.read_text().splitlines()
+    assert lines[0].startswith("source,output,status")
+    assert ",failed," in lines[1]
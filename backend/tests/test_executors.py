@@ -0,0 +1,139 @@
+"""Tests for managed executors."""
+
+import asyncio
+import math
+import threading
+import time
+
+import pytest
+
+from app.utils.executors import ManagedExecutor, executor_stats, get_executor
+
+
+def test_run_returns_result_and_counts():
+    executor = ManagedExecutor("t", max_workers=2, register=False)
+    try:
+        result = asyncio.run(executor.run(pow, 2, 10))
+    finally:
+        executor.shutdown()
+
+    assert result == 1024
+    stats = executor.stats()
+    assert stats["kind"] == "thread"
+    assert stats["submitted"] == 1
+    assert stats["completed"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["failed"] == 0
+
+
+def test_submit_from_sync_code_is_counted():
+    executor = ManagedExecutor("t", max_workers=2, register=False)
+    try:
+        futures = [executor.submit(pow, 2, n) for n in range(4)]
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        executor.shutdown()
+
+    assert results == [1, 2, 4, 8]
+    stats = executor.stats()
+    assert stats["submitted"] == 4
+    assert stats["completed"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_failures_propagate_and_are_counted():
+    executor = ManagedExecutor("t", max_workers=1, register=False)
+
+    def fail():
+        raise ValueError("boom")
+
+    try:
+        with pytest.raises(ValueError, match="boom"):
+            asyncio.run(executor.run(fail))
+    finally:
+        executor.shutdown()
+
+    stats = executor.stats()
+    assert stats["failed"] == 1
+    assert stats["completed"] == 0
+    assert stats["in_flight"] == 0
+
+
+def test_queue_depth_and_wait_time():
+    executor = ManagedExecutor("t", max_workers=1, register=False)
+    release = threading.Event()
+    seen: dict = {}
+
+    def block():
+        release.wait(5)
+
+    async def main():
+        tasks = [asyncio.ensure_future(executor.run(block)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        seen.update(executor.stats())
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(*tasks)
+
+    try:
+        asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+    # One task running on the single worker, two waiting for it
+    assert seen["in_flight"] == 3
+    assert seen["queued"] == 2
+
+    stats = executor.stats()
+    assert stats["completed"] == 3
+    assert stats["max_wait_ms"] >= 90
+    assert stats["avg_wait_ms"] > 0
+
+
+def test_event_loop_stays_responsive():
+    executor = ManagedExecutor("t", max_workers=1, register=False)
+
+    async def main():
+        job = asyncio.ensure_future(executor.run(time.sleep, 0.2))
+        started = time.monotonic()
+        await asyncio.sleep(0.01)  # Would wait for the sleep if it blocked the loop
+        elapsed = time.monotonic() - started
+        await job
+        return elapsed
+
+    try:
+        elapsed = asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+    assert elapsed < 0.15
+
+
+def test_process_pool_runs_in_worker_process():
+    executor = ManagedExecutor("t", max_workers=1, processes=True, register=False)
+    try:
+        result = asyncio.run(executor.run(math.factorial, 10))
+    finally:
+        executor.shutdown()
+
+    assert result == 3628800
+    assert executor.stats()["kind"] == "process"
+    assert executor.stats()["completed"] == 1
+
+
+def test_standard_executors_are_registered(monkeypatch):
+    from app.config import settings
+
+    io = get_executor("io")
+    assert get_executor("io") is io
+    assert "io" in executor_stats()
+
+    with pytest.raises(KeyError):
+        get_executor("missing")
+
+    # With no CPU workers, CPU work shares the I/O pool
+    monkeypatch.setattr(settings, "cpu_workers", 0)
+    from app.utils import executors
+
+    monkeypatch.delitem(executors._registry, "cpu", raising=False)
+    assert get_executor("cpu") is io
@@ -147,3 +147,71 @@ class TestFileManager:
         # after sanitizing the leading dots
         result = FileManager._sanitize_filename("..test.pdf")
         assert ".." not in result or result == "_test.pdf"
+
+    def test_cleanup_expired_removes_only_due_files(self):
+        """Test heap-based cleanup deletes files whose deadline has passed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = FileManager(Path(temp_dir))
+            stored = manager.store_upload(b"PDF content", "test.pdf")
+
+            assert manager.cleanup_expired() == 0
+            assert stored.file_path.exists()
+
+            removed = manager.cleanup_expired(now=datetime.now() + timedelta(hours=2))
+
+            assert removed == 1
+            assert not stored.file_path.exists()
+            assert manager.get_file(stored.file_id) is None
+            assert manager.total_bytes == 0
+
+    def test_cleanup_skips_files_already_removed(self):
+        """Test stale heap entries for lazily expired files are ignored."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = FileManager(Path(temp_dir))
+            stored = manager.store_upload(b"PDF content", "test.pdf")
+            manager._cleanup_file(stored.file_id)
+
+            removed = manager.cleanup_expired(now=datetime.now() + timedelta(hours=2))
+
+            assert removed == 0
+
+    def test_seconds_until_next_expiry(self):
+        """Test scheduler delay tracks the earliest deadline."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = FileManager(Path(temp_dir))
+            # Nothing tracked: a new file cannot expire sooner than retention
+            assert manager.seconds_until_next_expiry() == 3600
+
+            manager.store_upload(b"PDF content", "test.pdf")
+            delay = manager.seconds_until_next_expiry(now=datetime.now() + timedelta(minutes=30))
+
+            assert 1790 < delay <= 1800
+            assert manager.seconds_until_next_expiry(
+                now=datetime.now() + timedelta(hours=2)
+            ) == 0
+
+    def test_disk_cap_evicts_oldest_first(self):
+        """Test exceeding the disk cap evicts the oldest files first."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = FileManager(Path(temp_dir), max_disk_mb=1)
+            chunk = b"x" * (400 * 1024)
+
+            first = manager.store_upload(chunk, "first.pdf")
+            second = manager.store_upload(chunk, "second.pdf")
+            third = manager.store_upload(chunk, "third.pdf")
+
+            assert manager.get_file(first.file_id) is None
+            assert not first.file_path.exists()
+            assert manager.get_file(second.file_id) is not None
+            assert manager.get_file(third.file_id) is not None
+            assert manager.total_bytes == 2 * len(chunk)
+
+    def test_disk_cap_never_evicts_new_file(self):
+        """Test a single file larger than the cap is still stored."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = FileManager(Path(temp_dir), max_disk_mb=1)
+            older = manager.store_upload(b"small", "older.pdf")
+            big = manager.store_upload(b"x" * (2 * 1024 * 1024), "big.pdf")
+
+            assert manager.get_file(older.file_id) is None
+            assert manager.get_file(big.file_id) is not None
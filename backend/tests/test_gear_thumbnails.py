@@ -0,0 +1,56 @@
+"""Tests for the gear image thumbnail cache."""
+
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from app.services.gear_thumbnails import GearThumbnailCache
+
+
+@pytest.fixture
+def gear_dir(tmp_path: Path) -> Path:
+    root = tmp_path / "gear"
+    for category, name, color in [("APs", "a.png", "red"), ("APs", "b.png", "blue"), ("Misc", "c.png", "green")]:
+        (root / category).mkdir(parents=True, exist_ok=True)
+        Image.new("RGBA", (200, 100), color).save(root / category / name)
+    (root / "APs" / "notes.txt").write_text("ignored")
+    return root
+
+
+@pytest.fixture
+def thumbnails(gear_dir: Path, tmp_path: Path) -> GearThumbnailCache:
+    return GearThumbnailCache(gear_dir, tmp_path / "thumbs", size=64)
+
+
+def test_images_are_listed_with_digests(thumbnails: GearThumbnailCache):
+    images = thumbnails.images()
+
+    assert [img.path for img in images] == ["APs/a.png", "APs/b.png", "Misc/c.png"]
+    assert len({img.digest for img in images}) == 3
+
+
+def test_warm_renders_missing_thumbnails_once(thumbnails: GearThumbnailCache):
+    assert thumbnails.warm(workers=2) == 3
+    assert thumbnails.warm(workers=2) == 0
+
+    path, _ = thumbnails.thumbnail("APs/a.png")
+    with Image.open(path) as img:
+        assert img.size == (64, 32)
+
+
+def test_changed_image_gets_new_thumbnail(thumbnails: GearThumbnailCache, gear_dir: Path):
+    first_path, first_digest = thumbnails.thumbnail("Misc/c.png")
+
+    Image.new("RGBA", (50, 100), "black").save(gear_dir / "Misc" / "c.png")
+    second_path, second_digest = thumbnails.thumbnail("Misc/c.png")
+
+    assert second_digest != first_digest
+    assert second_path != first_path
+    with Image.open(second_path) as img:
+        assert img.size == (32, 64)
+
+
+def test_paths_outside_gear_dir_are_rejected(thumbnails: GearThumbnailCache):
+    assert thumbnails.thumbnail("../thumbs") is None
+    assert thumbnails.thumbnail("APs/missing.png") is None
@@ -0,0 +1,147 @@
+"""Tests for the icon tuner's similarity metrics."""
+
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from scripts.icon_tuner.icon_comparator import (
+    compute_histogram_similarity,
+    compute_nmae,
+    compute_region_similarity,
+    compute_similarity,
+    create_comparison_image,
+)
+
+TOLERANCE = 1e-9
+
+
+def make_icon(seed: int, size: tuple[int, int] = (120, 170), bg=(235, 235, 235)) -> Image.Image:
+    """Draw a random icon-like image: gray background, circle, label boxes."""
+    rng = random.Random(seed)
+    img = Image.new("RGB", size, bg)
+    draw = ImageDraw.Draw(img)
+    w, h = size
+    color = tuple(rng.randrange(256) for _ in range(3))
+    draw.ellipse((rng.randrange(5, 15), rng.randrange(20, 35), w - rng.randrange(5, 15), h - 10), fill=color)
+    draw.rectangle((w // 3, 2, 2 * w // 3, rng.randrange(18, 26)), outline="black", fill="white")
+    draw.rectangle((w // 4, h // 2, 3 * w // 4, h // 2 + rng.randrange(15, 40)), fill=(30, 30, 30))
+    return img
+
+
+# Pure-Python reference implementations the vectorized metrics replaced
+
+
+def reference_normalize(img, bg_color=(255, 255, 255)):
+    result = img.convert("RGB").copy()
+    pixels = result.load()
+    for y in range(result.height):
+        for x in range(result.width):
+            r, g, b = pixels[x, y]
+            lum = 0.299 * r + 0.587 * g + 0.114 * b
+            if lum > 200 and max(r, g, b) - min(r, g, b) < 30:
+                pixels[x, y] = bg_color
+    return result
+
+
+def reference_trim(img, threshold=240):
+    gray = img.convert("L")
+    w, h = gray.size
+    pixels = gray.load()
+    min_x, min_y, max_x, max_y = w, h, 0, 0
+    for y in range(h):
+        for x in range(w):
+            if pixels[x, y] < threshold:
+                min_x, min_y = min(min_x, x), min(min_y, y)
+                max_x, max_y = max(max_x, x), max(max_y, y)
+    if max_x <= min_x or max_y <= min_y:
+        return img
+    return img.crop((max(0, min_x - 2), max(0, min_y - 2), min(w, max_x + 2), min(h, max_y + 2)))
+
+
+def reference_nmae(img1, img2):
+    n1 = reference_trim(reference_normalize(img1))
+    n2 = reference_trim(reference_normalize(img2))
+    size = (max(n1.width, n2.width, 64), max(n1.height, n2.height, 64))
+    p1 = n1.resize(size, Image.LANCZOS).convert("RGB").tobytes()
+    p2 = n2.resize(size, Image.LANCZOS).convert("RGB").tobytes()
+    return sum(abs(a - b) for a, b in zip(p1, p2)) / (255.0 * len(p1)) if p1 else 0.0
+
+
+def reference_histogram(img1, img2):
+    n1 = reference_trim(reference_normalize(img1))
+    n2 = reference_trim(reference_normalize(img2))
+    h1 = n1.resize((64, 64), Image.LANCZOS).convert("RGB").histogram()
+    h2 = n2.resize((64, 64), Image.LANCZOS).convert("RGB").histogram()
+    return sum(min(a, b) for a, b in zip(h1, h2)) / sum(h1)
+
+
+def reference_regions(img1, img2):
+    n1 = reference_trim(reference_normalize(img1))
+    n2 = reference_trim(reference_normalize(img2))
+    w, h = max(n1.width, n2.width, 64), max(n1.height, n2.height, 64)
+    r1 = n1.resize((w, h), Image.LANCZOS)
+    r2 = n2.resize((w, h), Image.LANCZOS)
+    regions = {
+        "id_box": (0.0, 0.0, 1.0, 0.15),
+        "circle": (0.0, 0.10, 1.0, 0.95),
+        "brand_zone": (0.1, 0.15, 0.9, 0.35),
+        "image_zone": (0.1, 0.30, 0.9, 0.70),
+        "model_zone": (0.1, 0.70, 0.9, 0.90),
+    }
+    scores = {}
+    for name, (x1, y1, x2, y2) in regions.items():
+        box = (int(x1 * w), int(y1 * h), int(x2 * w), int(y2 * h))
+        scores[name] = 1.0 - reference_nmae(r1.crop(box), r2.crop(box))
+    return scores
+
+
+PAIRS = [
+    (make_icon(1), make_icon(2, size=(121, 175), bg=(255, 255, 255))),
+    (make_icon(3), make_icon(3)),
+    (make_icon(4, size=(90, 140)), make_icon(5, size=(130, 160))),
+]
+
+
+@pytest.mark.parametrize("ref, gen", PAIRS)
+def test_metrics_match_reference_implementation(ref, gen):
+    assert compute_nmae(ref, gen) == pytest.approx(reference_nmae(ref, gen), abs=TOLERANCE)
+    assert compute_histogram_similarity(ref, gen) == pytest.approx(
+        reference_histogram(ref, gen), abs=TOLERANCE
+    )
+    expected_regions = reference_regions(ref, gen)
+    assert compute_region_similarity(ref, gen) == pytest.approx(expected_regions, abs=TOLERANCE)
+
+    scores = compute_similarity(ref, gen)
+    expected_avg = sum(expected_regions.values()) / len(expected_regions)
+    expected_combined = (
+        0.3 * (1.0 - reference_nmae(ref, gen))
+        + 0.2 * reference_histogram(ref, gen)
+        + 0.5 * expected_avg
+    )
+    assert scores["region_scores"] == pytest.approx(expected_regions, abs=TOLERANCE)
+    assert scores["combined"] == pytest.approx(expected_combined, abs=TOLERANCE)
+
+
+def test_identical_images_score_perfectly():
+    img = make_icon(7)
+    scores = compute_similarity(img, img.copy())
+
+    assert scores["nmae"] == 0.0
+    assert scores["histogram"] == 1.0
+    assert scores["combined"] == pytest.approx(1.0)
+
+
+def test_blank_images():
+    blank = Image.new("RGB", (40, 40), (240, 240, 240))
+    assert compute_nmae(blank, blank) == 0.0
+
+
+def test_comparison_image_diff_panel():
+    img = make_icon(8)
+    canvas = create_comparison_image(img, img.copy(), "AP - Test", compute_similarity(img, img))
+
+    assert canvas.size == (3 * 120 + 20, 170 + 50)
+    # Identical inputs leave the diff panel (rightmost) black
+    diff_panel = canvas.crop((2 * 130, 50, canvas.width, canvas.height))
+    assert diff_panel.getextrema() == ((0, 0), (0, 0), (0, 0))
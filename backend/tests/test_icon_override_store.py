@@ -1,10 +1,14 @@
 """Tests for IconOverrideStore."""
 
+import json
+import multiprocessing
+import threading
 from pathlib import Path
 
 import pytest
 
 from app.services.icon_override_store import IconOverrideStore
+from app.utils.errors import RevisionConflictError
 
 
 @pytest.fixture
@@ -104,3 +108,163 @@ def test_build_full_config(store: IconOverrideStore):
     assert config["img_scale_ratio"] == 0.9
     assert config["category"] == "APs"
     assert config["subject"] == "AP - Cisco MR36H"
+
+
+@pytest.fixture
+def io_counter(store: IconOverrideStore, monkeypatch):
+    calls = {"read": 0, "write": 0}
+    original_read, original_write = store._read_file, store._write_file
+
+    def read():
+        calls["read"] += 1
+        return original_read()
+
+    def write(data):
+        calls["write"] += 1
+        original_write(data)
+
+    monkeypatch.setattr(store, "_read_file", read)
+    monkeypatch.setattr(store, "_write_file", write)
+    return calls
+
+
+def test_apply_to_multiple_reads_and_writes_once(store: IconOverrideStore, io_counter):
+    store.set_icon("AP - Cisco MR36H", {"category": "APs", "img_scale_ratio": 0.5})
+    io_counter.update(read=0, write=0)
+
+    count = store.apply_to_multiple(["AP - Cisco MR36H", "AP - Cisco MR78", "Custom"], {"brand_font_size": 2.0})
+
+    assert count == 3
+    assert io_counter["read"] <= 1
+    assert io_counter["write"] == 1
+    icons = store.load()["icons"]
+    assert icons["AP - Cisco MR36H"]["img_scale_ratio"] == 0.5  # Existing override kept
+    assert icons["AP - Cisco MR78"]["category"] == "APs"
+    assert all(icon["brand_font_size"] == 2.0 for icon in icons.values())
+    assert all("subject" not in icon and "source" not in icon for icon in icons.values())
+
+
+def test_get_all_configs_reads_once(store: IconOverrideStore, io_counter):
+    store.set_icon("Custom Icon", {"category": "Misc"})
+    store._state.snapshot = store._state.view = None  # Force a read from disk
+    io_counter.update(read=0, write=0)
+
+    configs = store.get_all_configs()
+    store.get_all_configs()
+
+    assert io_counter["read"] == 1
+    sources = {c["subject"]: c["source"] for c in configs}
+    assert sources["AP - Cisco MR36H"] == "python"
+    assert sources["Custom Icon"] == "custom"
+    assert all(c for c in configs)
+
+
+def test_revisions_and_conflicts(store: IconOverrideStore):
+    assert store.get_revision("SW - Test") == 0
+    assert store.set_icon("SW - Test", {"category": "Switches"}, expected_revision=0) == 1
+
+    with pytest.raises(RevisionConflictError) as exc:
+        store.set_icon("SW - Test", {"category": "Misc"}, expected_revision=0)
+    assert exc.value.actual == 1
+    assert store.get_icon("SW - Test")["category"] == "Switches"
+
+    config, revision = store.update_icon("SW - Test", {"brand_text": "X"}, expected_revision=1)
+    assert (config["brand_text"], revision) == ("X", 2)
+    with pytest.raises(RevisionConflictError):
+        store.delete_icon("SW - Test", expected_revision=1)
+    assert store.delete_icon("SW - Test", expected_revision=2) is True
+    assert store.get_revision("SW - Test") == 3  # Kept so a re-created icon cannot reuse it
+
+
+def test_concurrent_updates_are_not_lost(tmp_path: Path):
+    path = tmp_path / "overrides.json"
+
+    def worker(n: int):
+        store = IconOverrideStore(path)
+        for i in range(10):
+            store.update_icon(f"Icon {n}", {"category": "Misc", "brand_font_size": float(i)})
+            store.update_icon("Shared", {"category": "Misc", f"field_{n}_{i}": i})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    data = json.loads(path.read_text())
+    assert all(data["icons"][f"Icon {n}"]["brand_font_size"] == 9.0 for n in range(6))
+    assert len([k for k in data["icons"]["Shared"] if k.startswith("field_")]) == 60
+    assert data["_meta"]["revisions"]["Shared"] == 60
+
+
+def _process_writer(path: Path, n: int) -> None:
+    store = IconOverrideStore(path)
+    for i in range(10):
+        store.update_icon("Shared", {"category": "Misc", f"field_{n}_{i}": i})
+
+
+def test_concurrent_processes_do_not_lose_updates(tmp_path: Path):
+    path = tmp_path / "overrides.json"
+    context = multiprocessing.get_context("fork")
+    procs = [context.Process(target=_process_writer, args=(path, n)) for n in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    icon = IconOverrideStore(path).get_icon("Shared")
+    assert len([k for k in icon if k.startswith("field_")]) == 30
+
+
+def test_coalesced_writes(tmp_path: Path, monkeypatch):
+    path = tmp_path / "overrides.json"
+    store = IconOverrideStore(path, flush_delay=60)
+    writes = []
+    original_write = store._write_file
+    monkeypatch.setattr(store, "_write_file", lambda data: (writes.append(1), original_write(data)))
+
+    for i in range(5):
+        store.update_icon("Icon A", {"category": "Misc", "img_scale_ratio": 0.5 + i / 10})
+    store.set_icon("Icon B", {"category": "Misc"})
+
+    # Visible to readers (any store on the file) before it is written
+    assert not path.exists() and writes == []
+    assert IconOverrideStore(path).get_icon("Icon A")["img_scale_ratio"] == 0.9
+    assert store.get_revision("Icon A") == 5
+
+    # Another process writes meanwhile; the flush merges onto its content
+    path.write_text(json.dumps({"_meta": {"version": 1}, "icons": {"Other": {"category": "APs"}}}))
+    store.flush()
+
+    assert len(writes) == 1
+    data = json.loads(path.read_text())
+    assert set(data["icons"]) == {"Icon A", "Icon B", "Other"}
+    assert data["_meta"]["revisions"] == {"Icon A": 5, "Icon B": 1}
+
+
+def _conditional_writer(path: Path, expected_revision: int, results) -> None:
+    store = IconOverrideStore(path, flush_delay=60)
+    try:
+        results.put(store.set_icon("Icon A", {"category": "APs"}, expected_revision=expected_revision))
+    except RevisionConflictError as e:
+        results.put(("conflict", e.actual))
+
+
+def test_conditional_writes_conflict_across_coalescing_processes(tmp_path: Path):
+    path = tmp_path / "overrides.json"
+    store = IconOverrideStore(path, flush_delay=60)
+    store.set_icon("Icon B", {"category": "Misc"})
+    assert store.set_icon("Icon A", {"category": "Misc"}, expected_revision=0) == 1
+
+    # A fresh process only sees the file, so the edit must already be on disk
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    proc = context.Process(target=_conditional_writer, args=(path, 0, results))
+    proc.start()
+    outcome = results.get(timeout=60)
+    proc.join()
+
+    assert outcome == ("conflict", 1)
+    data = json.loads(path.read_text())
+    assert data["icons"]["Icon A"]["category"] == "Misc"
+    assert set(data["icons"]) == {"Icon A", "Icon B"}
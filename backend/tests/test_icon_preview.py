@@ -0,0 +1,99 @@
+"""Tests for icon preview rasterization."""
+
+import io
+
+import pymupdf
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import ArrayObject, DictionaryObject, FloatObject, NameObject
+
+from app.config import settings
+from app.services.icon_config import get_icon_config
+from app.services.icon_preview import (
+    PREVIEW_PADDING_X,
+    PREVIEW_PADDING_Y,
+    rasterize_icon,
+    rasterize_icon_sheet,
+)
+from app.services.icon_renderer import IconRenderer
+from app.utils.cache import ByteLRUCache
+
+SUBJECT = "AP - Cisco MR36H"
+
+
+@pytest.fixture
+def renderer() -> IconRenderer:
+    return IconRenderer(
+        settings.gear_icons_dir, image_cache=ByteLRUCache("test", 1 << 24, register=False)
+    )
+
+
+def rasterize_via_pdf(renderer: IconRenderer, config: dict, scale: float):
+    """Reference path: write the icon as an annotation, reopen and render."""
+    width = renderer.CANON_W + 2 * PREVIEW_PADDING_X
+    height = renderer.CANON_H + 2 * PREVIEW_PADDING_Y
+    rect = [PREVIEW_PADDING_X, PREVIEW_PADDING_Y, width - PREVIEW_PADDING_X, height - PREVIEW_PADDING_Y]
+
+    writer = PdfWriter()
+    writer.add_blank_page(width, height)
+    annot = DictionaryObject()
+    annot[NameObject("/Type")] = NameObject("/Annot")
+    annot[NameObject("/Subtype")] = NameObject("/Circle")
+    annot[NameObject("/Rect")] = ArrayObject([FloatObject(v) for v in rect])
+    ap = DictionaryObject()
+    ap[NameObject("/N")] = renderer.render_icon(writer, SUBJECT, rect, config=config)
+    annot[NameObject("/AP")] = ap
+    writer.pages[0][NameObject("/Annots")] = ArrayObject([writer._add_object(annot)])
+
+    buf = io.BytesIO()
+    writer.write(buf)
+    with pymupdf.open(stream=buf.getvalue(), filetype="pdf") as doc:
+        pix = doc[0].get_pixmap(matrix=pymupdf.Matrix(scale, scale), alpha=False)
+        return pix.samples
+
+
+@pytest.mark.parametrize("alpha_mode", ["smask", "flatten"])
+def test_direct_rasterizer_matches_pdf_round_trip(renderer, alpha_mode):
+    renderer.image_alpha_mode = alpha_mode
+    config = get_icon_config(SUBJECT)
+
+    img = rasterize_icon(renderer, SUBJECT, config, scale=300 / 72)
+
+    assert img.tobytes() == rasterize_via_pdf(renderer, config, 300 / 72)
+
+
+def test_explicit_config_and_icon_size(renderer):
+    config = get_icon_config(SUBJECT)
+    base = rasterize_icon(renderer, SUBJECT, config, scale=4.0)
+    recolored = rasterize_icon(renderer, SUBJECT, {**config, "circle_color": (1.0, 0.0, 0.0)}, scale=4.0)
+    large = rasterize_icon(renderer, SUBJECT, config, scale=4.0, icon_size=(50.0, 60.0))
+
+    assert base.size == recolored.size == (116, 168)
+    assert base.tobytes() != recolored.tobytes()
+    assert large.size == (216, 288)
+
+
+def test_unrenderable_subject_returns_none(renderer):
+    assert rasterize_icon(renderer, "Unknown - Nonexistent Icon", {}) is None
+
+
+def test_sheet_pages_match_single_renders(renderer):
+    base = get_icon_config(SUBJECT)
+    configs = [
+        {**base, "img_x_offset": x, "model_y_offset": y, "circle_color": (x / 4 + 0.5, 0.3, 0.6)}
+        for x in (-2.0, -1.0, 0.0, 0.5, 1.5)
+        for y in (0.0, 0.5, 1.0, 1.5, 2.0)
+    ]
+
+    images = rasterize_icon_sheet(renderer, SUBJECT, configs, scale=300 / 72)
+
+    assert len(images) == 25
+    for config, image in zip(configs, images):
+        single = rasterize_icon(renderer, SUBJECT, config, scale=300 / 72)
+        assert image.size == single.size
+        assert image.tobytes() == single.tobytes()
+
+
+def test_sheet_unrenderable_and_empty(renderer):
+    assert rasterize_icon_sheet(renderer, SUBJECT, []) == []
+    assert rasterize_icon_sheet(renderer, "Unknown - Nonexistent Icon", [{}, {}]) == [None, None]
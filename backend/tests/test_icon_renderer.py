@@ -15,6 +15,7 @@ from app.services.icon_config import (
     get_model_text,
 )
 from app.services.icon_renderer import IconRenderer
+from app.utils.cache import ByteLRUCache
 
 
 class TestIconConfig:
@@ -184,12 +185,13 @@ class TestIconRenderer:
         img = Image.new("RGB", (100, 100), color="blue")
         img.save(aps_dir / "AP - Cisco MR36H.png")
 
-        return IconRenderer(tmp_path)
+        cache = ByteLRUCache("test_icon_images", 1024 * 1024, register=False)
+        return IconRenderer(tmp_path, image_cache=cache)
 
     def test_init(self, renderer_with_test_image):
         """Test renderer initialization."""
         assert renderer_with_test_image.gear_icons_dir is not None
-        assert renderer_with_test_image._image_cache == {}
+        assert len(renderer_with_test_image._image_cache) == 0
 
     def test_can_render_with_image(self, renderer_with_test_image):
         """Test can_render returns True when image exists."""
@@ -248,15 +250,17 @@ class TestIconRenderer:
             "APs/AP - Cisco MR36H.png", bg_color
         )
 
-        # Check cache populated
-        cache_key = f"APs/AP - Cisco MR36H.png:{bg_color}"
-        assert cache_key in renderer_with_test_image._image_cache
+        # Check cache populated, with RGB bytes accounted
+        cache = renderer_with_test_image._image_cache
+        assert len(cache) == 1
+        assert cache.total_bytes == 100 * 100 * 3
 
         # Second load should use cache
         data2, w2, h2 = renderer_with_test_image.load_image(
             "APs/AP - Cisco MR36H.png", bg_color
         )
 
+        assert cache.hits == 1
         assert data1 == data2
         assert w1 == w2
         assert h1 == h2
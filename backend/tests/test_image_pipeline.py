@@ -0,0 +1,149 @@
+"""Tests for gear image preprocessing pipeline."""
+
+import zlib
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from app.services.image_pipeline import PreparedImageCache, prepare_image, target_pixels
+
+
+@pytest.fixture
+def gear_png(tmp_path: Path) -> Path:
+    """A 400x200 RGBA gear image with a transparent right half."""
+    img = Image.new("RGBA", (400, 200), (255, 0, 0, 255))
+    img.paste((0, 0, 0, 0), (200, 0, 400, 200))
+    path = tmp_path / "gear.png"
+    img.save(path)
+    return path
+
+
+def test_target_pixels():
+    assert target_pixels(72, 300) == 300
+    assert target_pixels(10, 600) == 84  # ceil(83.33)
+    assert target_pixels(0.01, 72) == 1
+
+
+def test_downsamples_to_max_dpi_preserving_aspect(gear_png: Path):
+    prepared = prepare_image(gear_png, (0.0, 0.0, 1.0), extent_pt=12, max_dpi=600)
+
+    assert prepared.resampled
+    assert (prepared.source_width, prepared.source_height) == (400, 200)
+    assert (prepared.width, prepared.height) == (100, 50)
+
+    raw = zlib.decompress(prepared.data)
+    assert len(raw) == 100 * 50 * 3
+    # Transparent half is flattened onto the blue background
+    img = Image.frombytes("RGB", (100, 50), raw)
+    assert img.getpixel((10, 25)) == (255, 0, 0)
+    assert img.getpixel((90, 25)) == (0, 0, 255)
+
+
+def test_never_upsamples(gear_png: Path):
+    prepared = prepare_image(gear_png, (0.0, 0.0, 0.0), extent_pt=72, max_dpi=600)
+
+    assert not prepared.resampled
+    assert (prepared.width, prepared.height) == (400, 200)
+
+
+def test_zero_dpi_keeps_native_resolution(gear_png: Path):
+    prepared = prepare_image(gear_png, (0.0, 0.0, 0.0), extent_pt=1, max_dpi=0)
+
+    assert (prepared.width, prepared.height) == (400, 200)
+
+
+def test_renderer_caches_prepared_images(gear_png: Path):
+    from app.services.icon_renderer import IconRenderer
+
+    renderer = IconRenderer(gear_png.parent, max_image_dpi=300)
+    config = {"img_scale_ratio": 0.7}
+    extent = renderer.image_extent_pt(config, renderer.COMPOUND_RENDER_SCALE)
+
+    first = renderer.prepare_image("gear.png", (0.0, 0.0, 0.0), extent)
+    second = renderer.prepare_image("gear.png", (0.0, 0.0, 0.0), extent)
+
+    assert first is second
+    assert max(first.width, first.height) == target_pixels(extent, 300)
+
+
+def test_keep_alpha_produces_smask(gear_png: Path):
+    prepared = prepare_image(gear_png, None, extent_pt=72, max_dpi=0)
+
+    assert prepared.smask is not None
+    alpha = zlib.decompress(prepared.smask)
+    assert len(alpha) == 400 * 200
+    assert alpha[0] == 255 and alpha[399] == 0
+
+
+def test_opaque_image_has_no_smask(tmp_path: Path):
+    path = tmp_path / "opaque.png"
+    Image.new("RGB", (10, 10), "white").save(path)
+
+    assert prepare_image(path, None, extent_pt=72, max_dpi=0).smask is None
+
+
+def test_smask_mode_shares_one_image_across_colors(gear_png: Path):
+    from pypdf import PdfWriter
+
+    from app.services.icon_renderer import IconRenderer
+
+    writer = PdfWriter()
+    smask = IconRenderer(gear_png.parent, image_alpha_mode="smask")
+    red = smask.embed_prepared_image(writer, smask.prepare_image("gear.png", (1, 0, 0), 14))
+    blue = smask.embed_prepared_image(writer, smask.prepare_image("gear.png", (0, 0, 1), 14))
+
+    assert red == blue
+    assert "/SMask" in red.get_object()
+
+    flatten = IconRenderer(gear_png.parent, image_alpha_mode="flatten")
+    red = flatten.embed_prepared_image(writer, flatten.prepare_image("gear.png", (1, 0, 0), 14))
+    blue = flatten.embed_prepared_image(writer, flatten.prepare_image("gear.png", (0, 0, 1), 14))
+
+    assert red != blue
+    assert "/SMask" not in red.get_object()
+
+
+class TestPreparedImageCache:
+    """Tests for the on-disk prepared image cache."""
+
+    def test_round_trip(self, gear_png: Path, tmp_path: Path):
+        cache = PreparedImageCache(tmp_path / "cache")
+        prepared = prepare_image(gear_png, None, extent_pt=12, max_dpi=600)
+        key = cache.key(gear_png.read_bytes(), None, 100)
+
+        assert cache.get(key) is None
+        cache.put(key, prepared)
+
+        assert cache.get(key) == prepared
+        assert cache.clear() == 1
+
+    def test_key_depends_on_content_and_params(self, gear_png: Path, tmp_path: Path):
+        cache = PreparedImageCache(tmp_path)
+        png = gear_png.read_bytes()
+
+        assert cache.key(png, None, 100) != cache.key(png, None, 50)
+        assert cache.key(png, None, 100) != cache.key(png, (0, 0, 1), 100)
+        assert cache.key(png, None, 100) != cache.key(png + b"x", None, 100)
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path: Path):
+        cache = PreparedImageCache(tmp_path)
+        (tmp_path / "abc.bin").write_bytes(b"not json\n")
+
+        assert cache.get("abc") is None
+
+    def test_cold_renderer_skips_decode(self, gear_png: Path, tmp_path: Path, monkeypatch):
+        from app.services import icon_renderer
+        from app.services.icon_renderer import IconRenderer
+
+        cache_dir = tmp_path / "cache"
+        warm = IconRenderer(gear_png.parent, image_cache_dir=cache_dir)
+        expected = warm.prepare_image("gear.png", (0, 0, 1), 14)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("PNG decoded despite warm disk cache")
+
+        monkeypatch.setattr(icon_renderer, "prepare_image", fail)
+        cold = IconRenderer(gear_png.parent, image_cache_dir=cache_dir)
+
+        assert cold.prepare_image("gear.png", (1, 0, 0), 14) == expected
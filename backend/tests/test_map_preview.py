@@ -0,0 +1,130 @@
+"""Tests for converted map preview tiles."""
+
+from functools import partial
+from pathlib import Path
+
+import pymupdf
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.main import app
+from app.routers import preview
+from app.services.file_manager import FileManager, file_manager
+from app.services.map_preview import TilePyramid
+
+
+def make_map_pdf(width: float = 1224, height: float = 792) -> bytes:
+    doc = pymupdf.open()
+    page = doc.new_page(width=width, height=height)
+    page.draw_rect(pymupdf.Rect(10, 10, 200, 200), color=(1, 0, 0), fill=(1, 0, 0))
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+@pytest.fixture
+def pyramid(tmp_path: Path) -> TilePyramid:
+    pdf_path = tmp_path / "map.pdf"
+    pdf_path.write_bytes(make_map_pdf())
+    return TilePyramid(pdf_path, tmp_path / "tiles", tile_size=256, max_zoom=2.0, overview_size=512)
+
+
+class TestTilePyramid:
+    """Tests for TilePyramid geometry and rendering."""
+
+    def test_levels(self, pyramid: TilePyramid):
+        # 1224pt * 2 = 2448px -> level 0 fits one tile, max level ceil(log2(2448/256)) = 4
+        assert pyramid.max_level(0) == 4
+        level0 = pyramid.level_info(0, 0)
+        assert max(level0.width, level0.height) <= 256
+        assert (level0.columns, level0.rows) == (1, 1)
+        deepest = pyramid.level_info(0, 4)
+        assert deepest.scale == 2.0
+        assert (deepest.columns, deepest.rows) == (10, 7)
+
+    def test_tile_rendered_lazily_and_cached(self, pyramid: TilePyramid):
+        path = pyramid.tile(0, 4, 0, 0)
+
+        assert path.exists()
+        with Image.open(path) as img:
+            assert img.size == (256, 256)
+            assert img.getpixel((100, 100))[:3] == (255, 0, 0)  # Red square at 20-400px
+
+        mtime = path.stat().st_mtime_ns
+        assert pyramid.tile(0, 4, 0, 0).stat().st_mtime_ns == mtime
+
+    def test_edge_tile_is_clipped(self, pyramid: TilePyramid):
+        with Image.open(pyramid.tile(0, 4, 9, 6)) as img:
+            assert img.size == (2448 - 9 * 256, 1584 - 6 * 256)
+
+    def test_overview_and_bounds(self, pyramid: TilePyramid):
+        with Image.open(pyramid.overview(0)) as img:
+            assert max(img.size) == 512
+
+        with pytest.raises(IndexError):
+            pyramid.tile(0, 4, 10, 0)
+        with pytest.raises(IndexError):
+            pyramid.tile(0, 5, 0, 0)
+        with pytest.raises(IndexError):
+            pyramid.overview(1)
+
+
+def test_derived_data_removed_with_file(tmp_path: Path):
+    manager = FileManager(tmp_path)
+    metadata = manager.store_upload(make_map_pdf(), "map.pdf")
+    derived = manager.derived_dir(metadata.file_id)
+    TilePyramid(metadata.file_path, derived / "tiles").overview(0)
+    assert derived.exists()
+
+    manager._cleanup_file(metadata.file_id)
+
+    assert not derived.exists()
+
+
+def test_tiles_count_toward_disk_cap(tmp_path: Path):
+    manager = FileManager(tmp_path)
+    metadata = manager.store_upload(make_map_pdf(), "map.pdf")
+    deleted = []
+    manager.add_delete_listener(deleted.append)
+    pyramid = TilePyramid(
+        metadata.file_path,
+        manager.derived_dir(metadata.file_id) / "tiles",
+        on_write=partial(manager.add_derived_bytes, metadata.file_id),
+    )
+
+    overview = pyramid.overview(0)
+    pyramid.overview(0)  # Cached; not counted again
+
+    assert manager.total_bytes == metadata.file_size + overview.stat().st_size
+    manager._cleanup_file(metadata.file_id)
+    assert manager.total_bytes == 0
+    assert deleted == [metadata.file_id]
+
+
+def test_preview_endpoints():
+    client = TestClient(app)
+    metadata = file_manager.store_upload(make_map_pdf(), "map.pdf")
+
+    info = client.get(f"/api/preview/{metadata.file_id}")
+    assert info.status_code == 200
+    data = info.json()
+    assert data["page_count"] == 1
+    assert data["pages"][0]["levels"][0]["columns"] == 1
+
+    tile_url = data["tile_url"].format(page=0, level=0, x=0, y=0)
+    tile = client.get(tile_url)
+    assert tile.status_code == 200
+    assert tile.headers["content-type"] == "image/png"
+
+    cached = client.get(tile_url, headers={"If-None-Match": tile.headers["etag"]})
+    assert cached.status_code == 304
+
+    assert client.get(data["overview_url"].format(page=0)).status_code == 200
+    assert client.get(data["tile_url"].format(page=0, level=99, x=0, y=0)).status_code == 404
+    assert client.get("/api/preview/missing-id").status_code == 404
+
+    # One pyramid serves every request for the file until it is deleted
+    assert metadata.file_id in preview._pyramids
+    file_manager._cleanup_file(metadata.file_id)
+    assert metadata.file_id not in preview._pyramids
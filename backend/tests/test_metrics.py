@@ -0,0 +1,40 @@
+"""Tests for Prometheus text-format metrics."""
+
+from app.utils.metrics import Counter, Histogram, MetricFamily, _format_family
+
+
+def test_counter_series_by_label():
+    counter = Counter("t_events_total", "Events.", ["kind"], register=False)
+    counter.inc(kind="a")
+    counter.inc(2, kind="b")
+    counter.inc(kind="a")
+
+    assert counter.value(kind="a") == 2
+    assert _format_family(counter.collect()) == [
+        "# HELP t_events_total Events.",
+        "# TYPE t_events_total counter",
+        't_events_total{kind="a"} 2',
+        't_events_total{kind="b"} 2',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("t_size_bytes", "Sizes.", [10, 100], register=False)
+    for value in (5, 50, 60, 500):
+        histogram.observe(value)
+
+    lines = _format_family(histogram.collect())
+    assert lines[2:] == [
+        't_size_bytes_bucket{le="10"} 1',
+        't_size_bytes_bucket{le="100"} 3',
+        't_size_bytes_bucket{le="+Inf"} 4',
+        "t_size_bytes_sum 615",
+        "t_size_bytes_count 4",
+    ]
+
+
+def test_label_values_are_escaped():
+    family = MetricFamily("t_gauge", "gauge", "Gauge.")
+    family.add(0.5, subject='AP "Cisco"\\x')
+
+    assert _format_family(family)[-1] == 't_gauge{subject="AP \\"Cisco\\"\\\\x"} 0.5'
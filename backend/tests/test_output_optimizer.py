@@ -0,0 +1,95 @@
+"""Tests for output post-processing stages."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pymupdf
+import pytest
+
+from app.services.conversion_context import ConversionContext
+from app.services.output_optimizer import compact_pdf, is_linearized, linearize_pdf
+from tests.test_annotation_replacer import MockBTXLoader, MockMappingParser
+from tests.test_batch_converter import make_bid_pdf
+
+
+def convert_sample(tmp_path: Path, compact: bool) -> Path:
+    input_pdf = tmp_path / "bid.pdf"
+    input_pdf.write_bytes(make_bid_pdf())
+    output_pdf = tmp_path / f"out_{compact}.pdf"
+    context = ConversionContext(
+        MockMappingParser({"AP_Bid": "AP_Deployment"}), MockBTXLoader()
+    )
+    context.convert(input_pdf, output_pdf, compact=compact)
+    return output_pdf
+
+
+def test_compact_uses_object_streams_and_shrinks(tmp_path: Path):
+    output_pdf = convert_sample(tmp_path, compact=False)
+    original = output_pdf.read_bytes()
+
+    size_before, size_after = compact_pdf(output_pdf)
+
+    compacted = output_pdf.read_bytes()
+    assert size_before == len(original)
+    assert size_after == len(compacted) < size_before
+    assert b"/ObjStm" in compacted
+    assert b"/XRef" in compacted
+    assert not output_pdf.with_name(output_pdf.name + ".tmp").exists()
+
+
+def test_compact_preserves_annotations(tmp_path: Path):
+    plain = convert_sample(tmp_path, compact=False)
+    compact = convert_sample(tmp_path, compact=True)
+
+    with pymupdf.open(plain) as a, pymupdf.open(compact) as b:
+        plain_annots = [(x.info["subject"], tuple(x.rect)) for x in a[0].annots()]
+        compact_annots = [(x.info["subject"], tuple(x.rect)) for x in b[0].annots()]
+
+    assert compact_annots == plain_annots
+    assert compact.stat().st_size < plain.stat().st_size
+
+
+def test_linearize_after_compact(tmp_path: Path):
+    pytest.importorskip("pikepdf")
+    output_pdf = convert_sample(tmp_path, compact=True)
+    assert not is_linearized(output_pdf)
+
+    assert linearize_pdf(output_pdf) is True
+
+    assert is_linearized(output_pdf)
+    with pymupdf.open(output_pdf) as doc:
+        assert len(list(doc[0].annots())) > 0
+
+
+def test_failed_linearize_leaves_no_temp_file(tmp_path: Path):
+    pikepdf = pytest.importorskip("pikepdf")
+    output_pdf = convert_sample(tmp_path, compact=False)
+    original = output_pdf.read_bytes()
+
+    def save_partially(self, path, **kwargs):
+        Path(path).write_bytes(b"partial")
+        raise OSError("No space left on device")
+
+    with patch.object(pikepdf.Pdf, "save", save_partially):
+        with pytest.raises(OSError):
+            linearize_pdf(output_pdf)
+
+    assert output_pdf.read_bytes() == original
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_convert_reports_missing_linearizer(tmp_path: Path):
+    input_pdf = tmp_path / "bid.pdf"
+    input_pdf.write_bytes(make_bid_pdf())
+    context = ConversionContext(
+        MockMappingParser({"AP_Bid": "AP_Deployment"}), MockBTXLoader()
+    )
+
+    # PyMuPDF >= 1.25 cannot write linearized files, so nothing can linearize
+    with patch("app.services.output_optimizer.pikepdf", None):
+        *_, linearized = context.convert(input_pdf, tmp_path / "a.pdf", linearize=True)
+    *_, not_requested = context.convert(input_pdf, tmp_path / "b.pdf", linearize=False)
+
+    assert linearized is False
+    assert not is_linearized(tmp_path / "a.pdf")
+    assert not_requested is None
@@ -0,0 +1,158 @@
+"""Tests for reference icon region detection."""
+
+import random
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from scripts.icon_tuner import reference_extractor
+from scripts.icon_tuner.reference_extractor import (
+    ReferenceCache,
+    _component_bboxes,
+    _merge_bboxes,
+    detect_icon_regions,
+    extract_reference_icons,
+)
+from scripts.icon_tuner.region_config import REFERENCE_PDF_DIR
+
+NEIGHBORS = [(1, 0), (-1, 0), (0, 1), (0, -1), (2, 0), (-2, 0), (0, 2), (0, -2)]
+
+
+def flood_fill_bboxes(dark: np.ndarray) -> list[tuple[int, int, int, int]]:
+    """Pixel-by-pixel flood fill with the detector's connectivity."""
+    height, width = dark.shape
+    seen = np.zeros_like(dark)
+    bboxes = []
+    for y in range(height):
+        for x in range(width):
+            if not dark[y, x] or seen[y, x]:
+                continue
+            seen[y, x] = True
+            stack = [(x, y)]
+            box = [x, y, x, y]
+            while stack:
+                cx, cy = stack.pop()
+                box = [min(box[0], cx), min(box[1], cy), max(box[2], cx), max(box[3], cy)]
+                for dx, dy in NEIGHBORS:
+                    nx, ny = cx + dx, cy + dy
+                    if 0 <= nx < width and 0 <= ny < height and dark[ny, nx] and not seen[ny, nx]:
+                        seen[ny, nx] = True
+                        stack.append((nx, ny))
+            bboxes.append(tuple(box))
+    return bboxes
+
+
+def pairwise_merge(bboxes, gap):
+    """Merge boxes until no two are within gap, by repeated pairwise checks."""
+    boxes = list(bboxes)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                if a[0] - gap <= b[2] and a[2] + gap >= b[0] and a[1] - gap <= b[3] and a[3] + gap >= b[1]:
+                    boxes[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del boxes[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    return boxes
+
+
+@pytest.mark.parametrize("density", [0.05, 0.3, 0.6])
+def test_component_bboxes_match_flood_fill(density):
+    rng = np.random.default_rng(int(density * 100))
+    dark = rng.random((60, 80)) < density
+
+    assert sorted(_component_bboxes(dark)) == sorted(flood_fill_bboxes(dark))
+
+
+def test_component_connectivity():
+    dark = np.zeros((10, 12), dtype=bool)
+    dark[1, 1:4] = True
+    dark[1, 5:7] = True  # One-pixel gap: joined
+    dark[3, 2] = True  # One row skipped: joined
+    dark[4, 5] = True  # Diagonal only: separate
+    dark[8, 8:10] = True
+
+    assert _component_bboxes(dark) == [(1, 1, 6, 3), (5, 4, 5, 4), (8, 8, 9, 8)]
+    assert _component_bboxes(np.zeros((5, 5), dtype=bool)) == []
+
+
+def test_merge_bboxes_matches_pairwise_merge():
+    rng = random.Random(0)
+    for _ in range(200):
+        boxes = []
+        for _ in range(rng.randrange(1, 30)):
+            x, y = rng.randrange(300), rng.randrange(300)
+            boxes.append((x, y, x + rng.randrange(1, 40), y + rng.randrange(1, 40)))
+
+        assert sorted(_merge_bboxes(boxes, 5)) == sorted(pairwise_merge(boxes, 5))
+
+
+def test_merge_bboxes_chains_through_grown_boxes():
+    # The first two merge into a box that only then reaches the third
+    boxes = [(14, 0, 18, 4), (0, 0, 10, 10), (12, 8, 20, 20)]
+
+    assert _merge_bboxes(boxes, 3) == [(0, 0, 20, 20)]
+
+
+def test_detect_icon_regions_orders_rows():
+    img = Image.new("RGB", (400, 300), "white")
+    draw = ImageDraw.Draw(img)
+    for x, y in [(250, 20), (30, 30), (140, 160), (30, 170)]:
+        draw.ellipse((x, y, x + 60, y + 70), outline="black", width=3)
+    draw.line((300, 200, 390, 200), fill="black", width=2)  # Too flat to be an icon
+
+    regions = detect_icon_regions(img)
+
+    assert [(x1 + 10, y1 + 10) for x1, y1, _, _ in regions] == [(30, 30), (250, 20), (30, 170), (140, 160)]
+
+
+@pytest.fixture
+def reference_pdf():
+    path = REFERENCE_PDF_DIR / "cameras.pdf"
+    if not path.exists():
+        pytest.skip("Reference PDFs not available")
+    return path
+
+
+def test_extracted_crops_are_cached_on_disk(tmp_path, reference_pdf, monkeypatch):
+    reference_extractor._icon_cache.clear()
+    icons = extract_reference_icons(reference_pdf, dpi=72, cache_dir=tmp_path)
+    assert icons
+    assert len(list((tmp_path / "pages").glob("*.png"))) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("reference page was rendered again")
+
+    reference_extractor._icon_cache.clear()
+    monkeypatch.setattr(reference_extractor, "render_pdf_page_to_image", fail)
+    cached = extract_reference_icons(reference_pdf, dpi=72, cache_dir=tmp_path)
+
+    assert list(cached) == list(icons)
+    for subject, img in icons.items():
+        assert cached[subject].tobytes() == img.tobytes()
+    reference_extractor._icon_cache.clear()
+
+
+def test_reference_cache_keys_and_clear(tmp_path, reference_pdf):
+    cache = ReferenceCache(tmp_path)
+    pdf_hash = cache.pdf_hash(reference_pdf)
+    entries = [("Camera", None)]
+
+    key = cache.crops_key(pdf_hash, 300, entries)
+    assert key != cache.crops_key(pdf_hash, 150, entries)
+    assert key != cache.crops_key(pdf_hash, 300, [("Camera", (0, 0, 10, 10))])
+    assert key != cache.crops_key("0" * 32, 300, entries)
+
+    cache.put_page(pdf_hash, 300, Image.new("RGB", (8, 8)))
+    cache.put_crops(key, {"Camera": Image.new("RGB", (4, 4), "red")})
+    assert cache.get_crops(key)["Camera"].getpixel((0, 0)) == (255, 0, 0)
+
+    assert cache.clear() == 2
+    assert cache.get_page(pdf_hash, 300) is None
+    assert cache.get_crops(key) is None
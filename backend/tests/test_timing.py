@@ -0,0 +1,45 @@
+"""Tests for conversion stage timing."""
+
+import pickle
+import time
+
+from app.utils.timing import StageTimer
+
+
+def test_stages_accumulate_in_first_entry_order():
+    timer = StageTimer()
+    with timer.stage("load"):
+        time.sleep(0.01)
+    with timer.stage("render"):
+        pass
+    with timer.stage("load"):
+        time.sleep(0.01)
+
+    assert list(timer.stages) == ["load", "render"]
+    assert timer.stages["load"] >= 0.02
+    assert timer.stages_ms()["load"] >= 20
+
+
+def test_stage_recorded_when_block_raises():
+    timer = StageTimer()
+    try:
+        with timer.stage("write"):
+            raise OSError("disk full")
+    except OSError:
+        pass
+
+    assert "write" in timer.stages
+
+
+def test_merge_survives_pickling():
+    worker = StageTimer()
+    worker.add("write", 0.5)
+    worker.count("compound:/Circle", 3)
+
+    timer = StageTimer()
+    timer.add("queue_wait", 0.1)
+    timer.count("compound:/Circle")
+    timer.merge(pickle.loads(pickle.dumps(worker)))
+
+    assert timer.stages_ms() == {"queue_wait": 100.0, "write": 500.0}
+    assert timer.counters == {"compound:/Circle": 4}
@@ -14,13 +14,18 @@ def client(tmp_path):
 
     # Override the store to use temp path
     original_file = settings.icon_overrides_file
+    original_thumbnail_dir = settings.gear_thumbnail_dir
     settings.icon_overrides_file = tmp_path / "test_overrides.json"
-    tuner_mod._store = None  # Reset singleton
+    settings.gear_thumbnail_dir = tmp_path / "thumbnails"
+    tuner_mod._store = None  # Reset singletons
+    tuner_mod._thumbnails = None
 
     yield TestClient(app)
 
     settings.icon_overrides_file = original_file
+    settings.gear_thumbnail_dir = original_thumbnail_dir
     tuner_mod._store = None
+    tuner_mod._thumbnails = None
 
 
 def test_list_icons(client):
@@ -63,6 +68,27 @@ def test_save_icon(client):
     assert resp2.json()["img_scale_ratio"] == 0.9
 
 
+def test_save_icon_if_match(client):
+    url = "/api/tuner/icons/AP - Cisco MR36H"
+    resp = client.get(url)
+    assert resp.headers["etag"] == '"0"'
+    assert resp.json()["revision"] == 0
+
+    resp = client.put(url, json={"img_scale_ratio": 0.9}, headers={"If-Match": '"0"'})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] == '"1"'
+    assert resp.json()["revision"] == 1
+
+    # A second editor still holding revision 0 is rejected
+    resp = client.put(url, json={"img_scale_ratio": 0.5}, headers={"If-Match": '"0"'})
+    assert resp.status_code == 412
+    assert client.get(url).json()["img_scale_ratio"] == 0.9
+
+    assert client.put(url, json={"img_scale_ratio": 0.5}, headers={"If-Match": "bogus"}).status_code == 400
+    assert client.delete(url, headers={"If-Match": '"0"'}).status_code == 412
+    assert client.delete(url, headers={"If-Match": '"1"'}).status_code == 204
+
+
 def test_create_icon(client):
     resp = client.post(
         "/api/tuner/icons",
@@ -128,7 +154,23 @@ def test_list_gear_images(client):
     data = resp.json()
     assert len(data) > 0
     assert "filename" in data[0]
-    assert "thumbnail" in data[0]
+    assert data[0]["thumbnail_url"].startswith("/api/tuner/gear-thumbnails/")
+
+
+def test_gear_thumbnail_served_with_etag(client):
+    image = client.get("/api/tuner/gear-images?category=APs").json()[0]
+
+    resp = client.get(image["thumbnail_url"])
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/png"
+    etag = resp.headers["etag"]
+    assert etag.strip('"').startswith(image["thumbnail_url"].rsplit("v=", 1)[1])
+
+    resp = client.get(image["thumbnail_url"], headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    assert client.get("/api/tuner/gear-thumbnails/APs/missing.png").status_code == 404
+    assert client.get("/api/tuner/gear-thumbnails/..%2F..%2Fconfig.py").status_code == 404
 
 
 def test_list_gear_images_by_category(client):
@@ -139,3 +181,44 @@ def test_list_gear_images_by_category(client):
         assert item["category"] == "APs"
 
 
+def test_preview_renders_png_with_etag(client):
+    resp = client.get(
+        "/api/tuner/preview",
+        params={"subject": "AP - Cisco MR36H", "scale": 4},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/png"
+    assert resp.content.startswith(b"\x89PNG")
+    etag = resp.headers["etag"]
+
+    # Same config -> 304
+    resp2 = client.get(
+        "/api/tuner/preview",
+        params={"subject": "AP - Cisco MR36H", "scale": 4},
+        headers={"If-None-Match": etag},
+    )
+    assert resp2.status_code == 304
+
+    # Candidate override -> different etag and pixels
+    resp3 = client.get(
+        "/api/tuner/preview",
+        params={
+            "subject": "AP - Cisco MR36H",
+            "scale": 4,
+            "config": '{"circle_color": [1.0, 0.0, 0.0]}',
+        },
+    )
+    assert resp3.status_code == 200
+    assert resp3.headers["etag"] != etag
+    assert resp3.content != resp.content
+
+
+def test_preview_errors(client):
+    resp = client.get("/api/tuner/preview", params={"subject": "Nonexistent Icon"})
+    assert resp.status_code == 404
+
+    resp = client.get(
+        "/api/tuner/preview",
+        params={"subject": "AP - Cisco MR36H", "config": '{"img_scale_ratio": "big"}'},
+    )
+    assert resp.status_code == 400
@@ -79,7 +79,8 @@ export function ImagePickerModal({ isOpen, onClose, onSelect }: ImagePickerModal
                   className="flex flex-col items-center gap-1 p-2 rounded-lg hover:bg-gray-100 dark:hover:bg-gray-700 transition-colors"
                 >
                   <img
-                    src={`data:image/png;base64,${img.thumbnail}`}
+                    src={img.thumbnail_url}
+                    loading="lazy"
                     alt={img.filename}
                     className="w-16 h-16 object-contain"
                   />
@@ -0,0 +1,53 @@
+import { useEffect, useState } from 'react';
+import type { IconConfig } from '../../../types/tuner';
+import { previewUrl } from '../../../lib/tunerApi';
+
+interface RenderPreviewProps {
+  subject: string;
+  config: IconConfig;
+}
+
+// Wait for slider drags to settle before requesting a new render
+const PREVIEW_DEBOUNCE_MS = 150;
+
+export function RenderPreview({ subject, config }: RenderPreviewProps) {
+  const [src, setSrc] = useState<string | null>(null);
+  const [failed, setFailed] = useState(false);
+
+  useEffect(() => {
+    // Only config fields are sent; the rest describe the stored icon
+    const overrides: Partial<IconConfig> = { ...config };
+    delete overrides.subject;
+    delete overrides.source;
+    delete overrides.id_preview;
+    delete overrides.revision;
+
+    const timer = setTimeout(() => {
+      setSrc(previewUrl(subject, overrides));
+      setFailed(false);
+    }, PREVIEW_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [subject, config]);
+
+  return (
+    <div className="bg-white dark:bg-gray-800 rounded-lg border border-gray-200 dark:border-gray-700">
+      <h3 className="text-sm font-semibold text-gray-900 dark:text-white px-3 py-2 border-b border-gray-200 dark:border-gray-700">
+        PDF Render
+      </h3>
+      <div className="flex justify-center p-3 bg-white">
+        {failed ? (
+          <p className="text-xs text-gray-500">Preview unavailable</p>
+        ) : (
+          src && (
+            <img
+              src={src}
+              alt={`Rendered ${subject}`}
+              className="max-w-full"
+              onError={() => setFailed(true)}
+            />
+          )
+        )}
+      </div>
+    </div>
+  );
+}
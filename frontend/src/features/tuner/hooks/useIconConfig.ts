@@ -22,8 +22,8 @@ export function useIconConfig(subject: string | null) {
 export function useSaveIcon() {
   const queryClient = useQueryClient();
   return useMutation({
-    mutationFn: ({ subject, config }: { subject: string; config: Partial<IconConfig> }) =>
-      saveIcon(subject, config),
+    mutationFn: ({ subject, config, revision }: { subject: string; config: Partial<IconConfig>; revision?: number }) =>
+      saveIcon(subject, config, revision),
     onSuccess: (_data, variables) => {
       queryClient.invalidateQueries({ queryKey: ['tuner', 'icons'] });
       queryClient.invalidateQueries({ queryKey: ['tuner', 'icon', variables.subject] });
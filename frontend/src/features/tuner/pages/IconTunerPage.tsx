@@ -8,6 +8,7 @@ import { PropertiesPanel } from '../components/PropertiesPanel';
 import { FrameProperties } from '../components/FrameProperties';
 import { LayerStackPanel } from '../components/LayerStackPanel';
 import { ApplyToAllModal } from '../components/ApplyToAllModal';
+import { RenderPreview } from '../components/RenderPreview';
 import { Toolbar } from '../components/Toolbar';
 import { useIconList, useIconConfig, useSaveIcon } from '../hooks/useIconConfig';
 import { useHistory } from '../hooks/useHistory';
@@ -73,6 +74,7 @@ export function IconTunerPage() {
       const result = await saveIconMutation.mutateAsync({
         subject: currentSubject,
         config,
+        revision: savedConfig?.revision,
       });
       setSavedConfig(result);
       setSuccessMessage('Icon configuration saved successfully');
@@ -80,7 +82,7 @@ export function IconTunerPage() {
     } catch (err) {
       setErrorMessage(err instanceof Error ? err.message : 'Save failed');
     }
-  }, [config, currentSubject, saveIconMutation]);
+  }, [config, currentSubject, savedConfig, saveIconMutation]);
 
   const handleReset = useCallback(() => {
     if (!currentSubject || !savedConfig) return;
@@ -251,6 +253,7 @@ export function IconTunerPage() {
 
             {/* Right Sidebar */}
             <div className="w-80 space-y-4 shrink-0">
+              {currentSubject && <RenderPreview subject={currentSubject} config={config} />}
               <FrameProperties
                 config={config}
                 onConfigChange={updateConfig}
@@ -41,11 +41,20 @@ export async function fetchIcon(subject: string): Promise<IconConfig> {
   }
 }
 
-export async function saveIcon(subject: string, config: Partial<IconConfig>): Promise<IconConfig> {
+/**
+ * Save an icon config. Pass the revision the edit started from to have the
+ * server reject the save (412) if someone else saved the icon since.
+ */
+export async function saveIcon(
+  subject: string,
+  config: Partial<IconConfig>,
+  revision?: number,
+): Promise<IconConfig> {
   try {
     const response = await api.put<IconConfig>(
       `/api/tuner/icons/${encodeSubject(subject)}`,
       config,
+      revision !== undefined ? { headers: { 'If-Match': `"${revision}"` } } : undefined,
     );
     return response.data;
   } catch (error) {
@@ -102,4 +111,15 @@ export async function applyToAll(request: ApplyToAllRequest): Promise<ApplyToAll
   }
 }
 
-
+/**
+ * URL of a server-rendered PNG preview of `subject` with `config` overrides applied.
+ * Suitable for an <img src>; the browser revalidates it with the response ETag.
+ */
+export function previewUrl(subject: string, config: Partial<IconConfig> = {}, scale = 4): string {
+  const params = new URLSearchParams({
+    subject,
+    scale: String(scale),
+    config: JSON.stringify(config),
+  });
+  return `/api/tuner/preview?${params.toString()}`;
+}
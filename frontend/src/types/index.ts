@@ -20,6 +20,12 @@ export interface ConversionRequest {
   output_filename?: string;
 }
 
+// Per-stage breakdown of a conversion's processing time
+export interface ConversionTimings {
+  stages_ms: Record<string, number>;
+  render_counts: Record<string, number>;
+}
+
 // Response from POST /api/convert/{upload_id}
 export interface ConversionResponse {
   upload_id: string;
@@ -35,6 +41,8 @@ export interface ConversionResponse {
   processing_time_ms: number;
   download_url: string;
   message: string;
+  timings?: ConversionTimings;
+  linearized?: boolean | null; // false when requested but no linearizer is installed
 }
 
 // Response from GET /health
@@ -34,6 +34,7 @@ export interface IconConfig {
   layer_order: LayerId[];
   id_preview: string;
   source: 'python' | 'json_override' | 'custom';
+  revision: number;
 }
 
 export type LayerId = 'gear_image' | 'brand_text' | 'model_text';
@@ -52,7 +53,7 @@ export interface GearImageInfo {
   filename: string;
   category: string;
   path: string;
-  thumbnail: string;
+  thumbnail_url: string;
 }
 
 export interface CategoryInfo {